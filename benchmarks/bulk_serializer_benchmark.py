@@ -0,0 +1,75 @@
+"""
+Microbenchmark comparing the former str()/replace() construction of bulk bodies with the BulkSerializer.
+
+Run it from the repository root:
+    python benchmarks/bulk_serializer_benchmark.py
+"""
+import os
+import sys
+import timeit
+
+# Add the application directory to the sys.path list, so the backend package can be imported
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'application', 'res'))
+from backend.bulk_serializer import BulkSerializer, encode_documents, orjson
+
+INDEX_NAME = 'amoscore'
+DOCUMENTS = 1000
+TAGS_PER_DOCUMENT = 150
+REPETITIONS = 10
+
+
+def create_test_data() -> list[(dict, id)]:
+    """ Creates documents that look like the output of modify_data """
+    data = []
+    for i in range(DOCUMENTS):
+        doc = {f"Tag_{t}": f"value {t} of file {i}" for t in range(TAGS_PER_DOCUMENT)}
+        doc['FileSize'] = float(i * 1024)
+        doc['FileInodeChangeDate'] = "2023-06-01T12:00:00"
+        doc['SourceFile'] = f"/data/files/file_{i}.jpg"
+        doc['timestamp'] = "2023-07-01T02:00:00"
+        data.append((doc, doc['SourceFile']))
+    return data
+
+
+def legacy_bulk_request(index_name: str, data: list[(dict, id)]) -> str:
+    """ The former implementation of OpenSearchManager.perform_bulk """
+    create_operation = {
+        "create": {"_index": index_name}
+    }
+
+    bulk_data = []
+    for doc, id in data:
+        if not id == "default_id":
+            create_operation['create']['_id'] = id
+        bulk_data.append(str(create_operation))
+        bulk_data.append(str(doc))
+    return "\n".join(bulk_data).replace("'", "\"")
+
+
+def serializer_bulk_request(serializer: BulkSerializer, index_name: str, data: list[(dict, id)]) -> bytes:
+    """ The bulk body created by the BulkSerializer """
+    return serializer.join(serializer.encode_entries(index_name, data))
+
+
+def main():
+    data = create_test_data()
+    serializer = BulkSerializer()
+    encoded_data = encode_documents(data)
+
+    benchmarks = {
+        'legacy str()/replace()': lambda: legacy_bulk_request(INDEX_NAME, data),
+        'serializer (dicts)': lambda: serializer_bulk_request(serializer, INDEX_NAME, data),
+        'serializer (retry, pre-encoded)': lambda: serializer_bulk_request(serializer, INDEX_NAME, encoded_data),
+    }
+
+    print(f"Encoder: {'orjson' if orjson is not None else 'json'}, "
+          f"{DOCUMENTS} documents with {TAGS_PER_DOCUMENT} tags each")
+    baseline = None
+    for name, function in benchmarks.items():
+        seconds = min(timeit.repeat(function, number=1, repeat=REPETITIONS))
+        baseline = baseline or seconds
+        print(f"{name:<35} {seconds * 1000:8.2f} ms  ({baseline / seconds:5.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark comparing the former per-value type dispatch of modify_data with the precompiled ConverterTable.
+
+Run it from the repository root:
+    python benchmarks/modify_data_benchmark.py
+"""
+import os
+import sys
+import time
+from datetime import datetime
+
+# Add the import-script directory to the sys.path list, so the converters module can be imported
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'src', 'application', 'res', 'import-script'))
+from converters import ConverterTable
+
+FILES = 5000
+TAGS_PER_TYPE = 50
+CURRENT_TIME = "2023-07-01T02:00:00"
+
+
+def create_test_data() -> tuple[list[dict], dict]:
+    """ Creates files as returned by a MetaDataHub request and the corresponding metadata tags """
+    metadata_tags = {"SourceFile": "text"}
+    for t in range(TAGS_PER_TYPE):
+        metadata_tags[f"Text_Tag_{t}"] = "text"
+        metadata_tags[f"Num_Tag_{t}"] = "float"
+        metadata_tags[f"Date_Tag_{t}"] = "date"
+
+    mdh_data = []
+    for i in range(FILES):
+        metadata = [{"name": "SourceFile", "value": f"/data/file_{i}.jpg"}]
+        for t in range(TAGS_PER_TYPE):
+            metadata.append({"name": f"Text.Tag.{t}", "value": f"value {t}"})
+            metadata.append({"name": f"Num.Tag.{t}", "value": str(i * t)})
+            metadata.append({"name": f"Date.Tag.{t}", "value": "2023-06-01 12:00:00"})
+        mdh_data.append({"metadata": metadata})
+    return mdh_data, metadata_tags
+
+
+def legacy_modify_data(mdh_data: list[dict], metadata_tags: dict, current_time: str) -> list[(dict, id)]:
+    """ The former implementation of modify_data """
+    modified_data = []
+    for file_data in mdh_data:
+        metadata = file_data.get("metadata", [])
+        file_info = {}
+        id = None
+        for meta in metadata:
+            name = str(meta.get("name")).replace(".", "_")
+            value = meta.get("value")
+            if name in metadata_tags:
+                if name == "SourceFile":
+                    id = str(value)
+                if metadata_tags[name] == 'date':
+                    date = datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+                    value = date.strftime("%Y-%m-%dT%H:%M:%S")
+                elif metadata_tags[name] == 'float':
+                    value = float(value)
+                else:
+                    value = str(value)
+                if name and value:
+                    file_info[name] = value
+        file_info['timestamp'] = current_time
+        modified_data.append((file_info, id))
+    return modified_data
+
+
+def measure(name: str, function) -> float:
+    """ Runs the function once and prints the converted documents per second """
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    print(f"{name:<25} {len(result) / seconds:12.0f} documents/s")
+    return result
+
+
+def main():
+    mdh_data, metadata_tags = create_test_data()
+    print(f"{FILES} files with {3 * TAGS_PER_TYPE + 1} tags each")
+
+    legacy_result = measure("legacy modify_data", lambda: legacy_modify_data(mdh_data, metadata_tags, CURRENT_TIME))
+    converter_table = ConverterTable(metadata_tags=metadata_tags)
+    table_result = measure("converter table", lambda: converter_table.convert(mdh_data, CURRENT_TIME))
+
+    assert legacy_result == table_result, "The converter table produced different documents"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark of the parallel bulk requests of the import with the default page and batch sizes. The cluster is
+simulated by a fixed latency per request and a cost per document, so the benchmark runs without OpenSearch.
+
+Run it from the repository root:
+    python benchmarks/parallel_bulk_benchmark.py
+"""
+import os
+import sys
+import time
+
+# Add the application and the import-script directory to the sys.path list
+RES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'application', 'res')
+sys.path.append(RES_DIR)
+sys.path.append(os.path.join(RES_DIR, 'import-script'))
+from backend.opensearch_api import OpenSearchManager
+from bulk_batching import AdaptiveBulkBatcher
+
+PAGES = 10
+PAGE_SIZE = 1000  # default page_size
+MAX_DOCUMENTS = 1000  # default bulk_max_documents
+REQUEST_SECONDS = 0.02  # latency of a bulk request
+DOCUMENT_SECONDS = 0.0002  # indexing time of a document
+WORKER_COUNTS = (1, 2, 4, 8)
+
+
+class SimulatedManager(OpenSearchManager):
+    """ Manager whose bulk requests take the simulated time instead of being sent """
+
+    def __init__(self):
+        pass
+
+    def perform_bulk(self, index_name: str, data: list, op_type: str = 'create') -> dict:
+        time.sleep(REQUEST_SECONDS + DOCUMENT_SECONDS * len(data))
+        return {'errors': False, 'items': []}
+
+
+def upload_pages(os_manager: OpenSearchManager, pages: list, thread_count: int):
+    """ Uploads the pages like upload_data of the import pipeline """
+    batcher = AdaptiveBulkBatcher(entry_size=lambda entry: len(entry[0]), max_documents=MAX_DOCUMENTS)
+    for data in pages:
+        chunks = batcher.batches(data, parallel=thread_count)
+        if thread_count > 1:
+            responses = os_manager.perform_parallel_bulk('amoscore', chunks, thread_count=thread_count)
+        else:
+            responses = ((os_manager.perform_bulk('amoscore', chunk), chunk) for chunk in chunks)
+        for response, _ in responses:
+            batcher.record_response(response)
+
+
+def main():
+    pages = [[(b'{"FileName":"file.jpg"}', f"{page}/{i}") for i in range(PAGE_SIZE)] for page in range(PAGES)]
+    os_manager = SimulatedManager()
+    print(f"{PAGES} pages of {PAGE_SIZE} documents, {REQUEST_SECONDS * 1000:.0f} ms per request and "
+          f"{DOCUMENT_SECONDS * 1000:.1f} ms per document")
+    baseline = None
+    for thread_count in WORKER_COUNTS:
+        start = time.perf_counter()
+        upload_pages(os_manager, pages, thread_count)
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        print(f"{thread_count} bulk workers {seconds:8.2f} s  ({baseline / seconds:5.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
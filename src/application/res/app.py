@@ -4,12 +4,15 @@ from flask import Flask
 from flask import render_template
 from flask import request
 from flask import session
+from flask import Response, stream_with_context
 from flask_bootstrap import Bootstrap5
 from flask_wtf import FlaskForm, CSRFProtect
 from wtforms import StringField, SelectField, FieldList, FormField, Form, SubmitField, IntegerField, validators
 from wtforms.validators import DataRequired
 from backend.opensearch_api import OpenSearchManager
 from backend.os_dashboard_api import OSDashboardManager
+from backend.search_cache import SearchCache
+from backend.export import EXPORT_FORMATS, export_csv, export_ndjson
 from backend.configuration import get_config_values
 import pandas as pd
 import urllib
@@ -23,6 +26,12 @@ options = get_config_values()
 index_name = options['index_name']  # Name of the index
 search_size = options['search_size']  # Size or limit of search results
 localhost = options['localhost']  # Host or IP address of the local server
+schema_cache_seconds = options['schema_cache_seconds']  # Time the mapping of the index is cached
+priority_fields = [field for field in options['priority_fields'] if field]  # Fields ranked higher by the simple search
+search_cache_size = options['search_cache_size']  # Amount of cached search responses
+search_cache_check_seconds = options['search_cache_check_seconds']  # Time between the checks for a new import
+export_columns = [column for column in options['export_columns'] if column]  # Default columns of an export
+export_batch_size = options['export_batch_size']  # Amount of files read from OpenSearch per request of an export
 
 # Flask Application Setup
 app = Flask(__name__)
@@ -36,7 +45,12 @@ csrf = CSRFProtect(app)
 os_dashboard_manager: OSDashboardManager = OSDashboardManager(localhost=localhost)
 
 # OpenSearchManager Initialization
-os_manager: OpenSearchManager = OpenSearchManager(localhost=localhost, search_size=search_size)
+os_manager: OpenSearchManager = OpenSearchManager(localhost=localhost, search_size=search_size,
+                                                  schema_ttl=schema_cache_seconds)
+
+# SearchCache Initialization, the cached responses are dropped after an import changed the index
+search_cache = SearchCache(get_generation=lambda: os_manager.get_index_generation(index_name),
+                           max_entries=search_cache_size, check_seconds=search_cache_check_seconds)
 
 
 # SimpleSearchForm Definition
@@ -46,11 +60,12 @@ class SimpleSearchForm(FlaskForm):
     # values for pagination
     currentPageSS = IntegerField('currentPageSS')
     resultsPerPageSS = IntegerField('resultsPerPageSS')
+    cursorSS = StringField('cursorSS')  # continues the search after the last hit of the previous page
 
 
 class AdvancedEntryForm(FlaskForm):
     # Get all available fields for the specified index
-    all_fields = os_manager.get_all_fields(index_name=index_name)
+    all_fields = list(os_manager.get_searchable_fields(index_name=index_name))
     # Dropdown menu for selecting a metadata tag
     metadata_tag = SelectField('Metadata tag', choices=all_fields)
     # Dropdown menu for selecting a condition for the metadata tag
@@ -91,6 +106,37 @@ class AdvancedSearchForm(FlaskForm):
     # values for pagination
     currentPage = IntegerField('currentPage')
     resultsPerPage = IntegerField('resultsPerPage')
+    cursor = StringField('cursor')  # continues the search after the last hit of the previous page
+
+
+def getSearchInfo(advancedSearchForm):
+    # Initialize a list to store the criteria, a metadata tag can have several criteria (e.g. a range)
+    search_info = []
+
+    # Iterate over each entry in the advanced search form
+    for entry in advancedSearchForm.entry.data:
+        parameter_name = entry['metadata_tag']
+        search_content = entry['value']
+        operator = entry['condition']
+        weight = entry['weight']
+
+        # Store the search information in the list
+        search_info.append({
+            'field': parameter_name,
+            'search_content': search_content,
+            'operator': operator,
+            'weight': weight
+        })
+    return search_info
+
+
+def isLastPage(result, current_page, results_per_page):
+    # a page with fewer hits than requested has no cursor to a next page
+    if result.get('next_cursor') is None:
+        return True
+    # the total is only counted exactly up to 10,000 hits
+    total = result['hits']['total']
+    return total.get('relation', 'eq') == 'eq' and total['value'] <= (current_page + 1) * results_per_page
 
 
 def renderResult(input, current_page, results_per_page):
@@ -140,11 +186,15 @@ def search():
     advancedSearchResult = ""
 
     # Extract field names and data types from 'amoscore' and convert to JSON string
-    field_names_data_types = os_manager.extract_metadata_dict('amoscore')
+    field_names_data_types = os_manager.get_searchable_fields(index_name)
     json_dict = json.dumps(field_names_data_types)
 
+    # Statistics of the fields (amount of files, range and most frequent values) from the catalog of the import
+    catalog_dict = json.dumps(os_manager.get_field_catalog(index_name))
+
     # init if the result page is the last page to show
     last_page = True
+    next_cursor = ""
 
     # Handle simple search form submission
     if simpleSearchForm.validate_on_submit():
@@ -157,14 +207,16 @@ def search():
         resultsPerPage = simpleSearchForm.resultsPerPageSS.data
 
         # Perform simple search using the default index name
-        resultTmp = os_manager.simple_search(index_name, searchValue, page=int(simpleSearchForm.currentPageSS.data),
-                                             page_size=int(simpleSearchForm.resultsPerPageSS.data))
+        page = int(simpleSearchForm.currentPageSS.data)
+        page_size = int(simpleSearchForm.resultsPerPageSS.data)
+        cursor = simpleSearchForm.cursorSS.data or None
+        cache_key = SearchCache.get_key('simple', index_name, page, page_size, search_text=searchValue, cursor=cursor)
+        resultTmp = search_cache.get(cache_key, lambda: os_manager.simple_search(
+            index_name, searchValue, page=page, page_size=page_size, priority_fields=priority_fields, cursor=cursor))
+        next_cursor = resultTmp.get('next_cursor') or ""
 
         # check if this page will be the last page because there are no more results for next pages
-        if resultTmp['hits']['total']['value'] <= (currentPage+1) * resultsPerPage:
-            last_page = True
-        else:
-            last_page = False
+        last_page = isLastPage(resultTmp, currentPage, resultsPerPage)
 
         # Set the last_form session variable to 'simple'
         session['last_form'] = 'simple'
@@ -178,38 +230,25 @@ def search():
     # Handle advanced search form submission
     if advancedSearchForm.validate_on_submit():
         print("advacnedSearch")
-        # Initialize a dictionary to store search information
-        search_info = {}
-
         # Get the current page and the amount of results per page from the form
         currentPage = advancedSearchForm.currentPage.data
         resultsPerPage = advancedSearchForm.resultsPerPage.data
 
-
-        # Iterate over each entry in the advanced search form
-        for entry in advancedSearchForm.entry.data:
-            parameter_name = entry['metadata_tag']
-            search_content = entry['value']
-            operator = entry['condition']
-            weight = entry['weight']
-
-            # Store the search information in the dictionary
-            search_info[parameter_name] = {
-                'search_content': search_content,
-                'operator': operator,
-                'weight': weight
-            }
+        # Get the criteria of the advanced search
+        search_info = getSearchInfo(advancedSearchForm)
 
         # Perform advanced search using the default index name and the search information
-        resultTmp = os_manager.advanced_search(index_name=index_name,
-                                               search_info=search_info, page=int(advancedSearchForm.currentPage.data),
-                                               page_size=int(advancedSearchForm.resultsPerPage.data))
+        page = int(advancedSearchForm.currentPage.data)
+        page_size = int(advancedSearchForm.resultsPerPage.data)
+        cursor = advancedSearchForm.cursor.data or None
+        cache_key = SearchCache.get_key('advanced', index_name, page, page_size, search_info=search_info,
+                                        cursor=cursor)
+        resultTmp = search_cache.get(cache_key, lambda: os_manager.advanced_search(
+            index_name=index_name, search_info=search_info, page=page, page_size=page_size, cursor=cursor))
+        next_cursor = resultTmp.get('next_cursor') or ""
 
         # check if this will be the last page to render
-        if resultTmp['hits']['total']['value'] <= (currentPage+1) * resultsPerPage:
-            last_page = True
-        else:
-            last_page = False
+        last_page = isLastPage(resultTmp, currentPage, resultsPerPage)
 
         # Set the last_form session variable to 'advanced'
         session['last_form'] = 'advanced'
@@ -225,7 +264,8 @@ def search():
     print(session['last_form'])
     return render_template('search.html', simpleSearchForm=simpleSearchForm, simpleSearchResult=simpleSearchResult,
                            advancedSearchForm=advancedSearchForm, advancedSearchResult=advancedSearchResult,
-                           last_form=session.get('last_form'), json_dict=json_dict, last_page=last_page)
+                           last_form=session.get('last_form'), json_dict=json_dict, catalog_dict=catalog_dict,
+                           last_page=last_page, next_cursor=next_cursor)
 
 
 # @app.route('/search/simple')
@@ -237,6 +277,32 @@ def search():
 #    search_info = json.loads(urllib.parse.unquote(request.args.get('searchString'))) #ToDo use Flask Forms
 #    return os_manager.advanced_search(config.get('Opensearch_Dashboard', 'default_index_name'), search_info) #Hardcoded indexname
 
+@app.route('/export', methods=['POST'])
+def export():
+    # Export all results of the advanced search, not only the rendered page
+    advancedSearchForm = AdvancedSearchForm()
+    if not advancedSearchForm.validate_on_submit():
+        return "Invalid search.", 400
+
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return f"Unknown export format '{export_format}'.", 400
+    columns = [column for column in request.args.get('columns', ';'.join(export_columns)).split(';') if column]
+    if not columns and export_format == 'csv':
+        columns = list(os_manager.get_searchable_fields(index_name))  # a CSV file needs fixed columns
+
+    # The same query as the advanced search, the hits are read in batches and streamed to the response
+    query = os_manager.build_advanced_query(index_name, getSearchInfo(advancedSearchForm))
+    batches = os_manager.scan(index_name, query, source_fields=columns, batch_size=export_batch_size) \
+        if query is not None else iter([])
+    if export_format == 'csv':
+        content = export_csv(batches, columns)
+    else:
+        content = export_ndjson(batches)
+    return Response(stream_with_context(content), mimetype=EXPORT_FORMATS[export_format],
+                    headers={'Content-Disposition': f'attachment; filename={index_name}_export.{export_format}'})
+
+
 @app.route('/search/advanced_v2')
 def advanced_search_v2():
     # Render the index1.html template for advanced search version 2
@@ -0,0 +1,164 @@
+import hashlib
+import json
+
+try:
+    import orjson  # fast JSON encoder that serializes directly to bytes
+except ImportError:
+    orjson = None
+
+CONTENT_HASH_BYTES = 12  # size of the content hash, it is stored as hex string of twice the length
+
+
+def encode_document(doc: dict) -> bytes:
+    """
+    Serializes a document to compact JSON bytes.
+
+    :param doc: The document to be serialized.
+    :return: The JSON representation of the document as UTF-8 encoded bytes.
+    """
+    if orjson is not None:
+        return orjson.dumps(doc)
+    return json.dumps(doc, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_documents(data: list[(dict, id)]) -> list[(bytes, id)]:
+    """
+    Serializes the documents of a list of (document, id) tuples, so they can be sent (and resent) without
+    being serialized again.
+
+    :param data: A list of tuples containing a document and its id.
+    :return: A list of tuples containing the serialized document and its id.
+    """
+    return [(encode_document(doc), id) for doc, id in data]
+
+
+def encode_document_with_hash(doc: dict, excluded_field: str = 'timestamp') -> bytes:
+    """
+    Serializes a document and adds a compact hash of its content as 'content_hash' field. The excluded field
+    (the time of the import) changes with every import and is therefore not part of the hash.
+
+    :param doc: The document to be serialized.
+    :param excluded_field: Field that is not part of the hash (default = 'timestamp').
+    :return: The JSON representation of the document with the 'content_hash' as last field.
+    """
+    content = dict(doc)
+    excluded_value = content.pop(excluded_field, None)
+    encoded_content = encode_document(content)
+    content_hash = hashlib.blake2b(encoded_content, digest_size=CONTENT_HASH_BYTES).hexdigest()
+
+    # append the excluded field and the hash without serializing the document again
+    suffix = b''
+    if excluded_value is not None:
+        suffix += b'"' + excluded_field.encode('utf-8') + b'":' + encode_document(excluded_value) + b','
+    suffix += b'"content_hash":"' + content_hash.encode('ascii') + b'"}'
+    if encoded_content == b'{}':
+        return b'{' + suffix
+    return encoded_content[:-1] + b',' + suffix
+
+
+def encode_documents_with_hash(data: list[(dict, id)]) -> list[(bytes, id)]:
+    """
+    Serializes the documents of a list of (document, id) tuples and adds the hash of their content.
+
+    :param data: A list of tuples containing a document and its id.
+    :return: A list of tuples containing the serialized document and its id.
+    """
+    return [(encode_document_with_hash(doc), id) for doc, id in data]
+
+
+def get_content_hash(doc: bytes) -> str:
+    """
+    Get the content hash of a document serialized by encode_document_with_hash, without parsing the document.
+
+    :param doc: The serialized document.
+    :return: The content hash.
+    """
+    return doc[-(CONTENT_HASH_BYTES * 2 + 2):-2].decode('ascii')
+
+
+class BulkSerializer:
+    """
+    Creates NDJSON bodies for the bulk API. The constant part of the action lines is encoded only once per index
+    and operation type, documents can either be passed as dictionaries or as already serialized bytes.
+    """
+
+    def __init__(self, op_type: str = 'create'):
+        """
+        Creates a new bulk serializer.
+
+        :param op_type: The bulk operation used for every document, e.g. 'create' or 'index' (default = 'create').
+        """
+        self.op_type = op_type
+        self._action_prefixes = {}  # cache of the encoded action prefix per index
+
+    def _get_action_prefix(self, index_name: str) -> bytes:
+        """
+        Get the encoded beginning of an action line for an index, e.g. '{"create":{"_index":"amoscore"'.
+
+        :param index_name: The name of the index.
+        :return: The encoded action prefix.
+        """
+        prefix = self._action_prefixes.get(index_name)
+        if prefix is None:
+            prefix = b'{"' + self.op_type.encode('utf-8') + b'":{"_index":' + encode_document(index_name)
+            self._action_prefixes[index_name] = prefix
+        return prefix
+
+    def encode_action(self, index_name: str, id: str) -> bytes:
+        """
+        Encodes the action line of a single document.
+
+        :param index_name: The name of the index to which the document will be added.
+        :param id: The id of the document ("default_id" or None to let OpenSearch generate an id).
+        :return: The encoded action line without line break.
+        """
+        prefix = self._get_action_prefix(index_name)
+        if id is None or id == "default_id":
+            return prefix + b'}}'
+        return prefix + b',"_id":' + encode_document(str(id)) + b'}}'
+
+    def encode_entry(self, index_name: str, doc, id: str) -> bytes:
+        """
+        Encodes the action line and the document line of a single document.
+
+        :param index_name: The name of the index to which the document will be added.
+        :param doc: The document, either as a dictionary or as already serialized bytes.
+        :param id: The id of the document.
+        :return: The two encoded NDJSON lines, each terminated by a line break.
+        """
+        if not isinstance(doc, bytes):
+            doc = encode_document(doc)
+        return self.encode_action(index_name, id) + b'\n' + doc + b'\n'
+
+    def get_entry_size(self, index_name: str, doc, id: str) -> int:
+        """
+        Get the amount of bytes a single document takes in the body of a bulk request.
+
+        :param index_name: The name of the index to which the document will be added.
+        :param doc: The document, either as a dictionary or as already serialized bytes.
+        :param id: The id of the document.
+        :return: The size of the action and the document line in bytes.
+        """
+        if not isinstance(doc, bytes):
+            doc = encode_document(doc)
+        return len(self.encode_action(index_name, id)) + len(doc) + 2
+
+    def encode_entries(self, index_name: str, data: list[(any, id)]) -> list[bytes]:
+        """
+        Encodes the entries of multiple documents.
+
+        :param index_name: The name of the index to which the documents will be added.
+        :param data: A list of tuples containing a document (dictionary or serialized bytes) and its id.
+        :return: A list of the encoded entries.
+        """
+        return [self.encode_entry(index_name, doc, id) for doc, id in data]
+
+    @staticmethod
+    def join(entries: list[bytes]) -> bytes:
+        """
+        Joins encoded entries to the body of a bulk request.
+
+        :param entries: A list of encoded entries.
+        :return: The NDJSON body as a single buffer.
+        """
+        return b''.join(entries)
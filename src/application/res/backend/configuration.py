@@ -28,16 +28,57 @@ def get_config_values():
         'only_selected_tags': False,
         'only_new_data': True,
         'file_types': "",
+        'page_size': 1000,
+        'queue_depth': 2,
+        'bulk_workers': 4,
+        'bulk_max_documents': 1000,
+        'bulk_target_bytes': 5242880,
+        'transform_workers': 1,
+        'transform_min_batch': 500,
+        'retry_attempts': 3,
+        'retry_backoff_seconds': 1,
+        'dead_letter_file': 'dead_letter.ndjson',
+        'checkpoint_file': 'recovery.json',
+        'sync_overlap_seconds': 300,
+        'write_mode': 'create',
+        'bulk_load_mode': True,
+        'force_merge_segments': 0,
+        'reindex_source': 'mdh',
+        'reindex_slices': 'auto',
+        'keep_index_versions': 2,
+        'schema_cache_seconds': 60,
+        'ngram_fields': True,
+        'priority_fields': "FileName^3",
+        'keyword_ignore_above': 256,
+        'type_inference_sample': 1000,
+        'explicit_tags': 0,
+        'field_catalog': True,
+        'search_cache_size': 256,
+        'search_cache_check_seconds': 5,
+        'export_columns': 'SourceFile;FileName;FileSize;FileType;FileInodeChangeDate',
+        'export_batch_size': 1000,
     }
 
+    # Options that are parsed as integers
+    integer_options = ('limit', 'search_size', 'page_size', 'queue_depth', 'bulk_workers',
+                       'bulk_max_documents', 'bulk_target_bytes', 'transform_workers', 'transform_min_batch',
+                       'retry_attempts', 'retry_backoff_seconds', 'sync_overlap_seconds', 'force_merge_segments',
+                       'keep_index_versions', 'schema_cache_seconds', 'keyword_ignore_above',
+                       'type_inference_sample', 'explicit_tags', 'search_cache_size',
+                       'search_cache_check_seconds', 'export_batch_size')
+
+    # Options that are parsed as booleans
+    boolean_options = ('localhost', 'only_new_data', 'only_selected_tags', 'bulk_load_mode', 'ngram_fields',
+                       'field_catalog')
+
     # Retrieve values from the config file, with fallback to default values
     options = {}
     for key, value in fallback_values.items():
-        if key == 'selected_tags':
+        if key == 'selected_tags' or key == 'priority_fields' or key == 'export_columns':
             options[key] = config.get('General', key, fallback=value).split(";")
-        elif key == 'limit' or key == 'search_size':
+        elif key in integer_options:
             options[key] = config.getint('General', key, fallback=value)
-        elif key == 'localhost' or key == 'only_new_data' or key == 'only_selected_tags':
+        elif key in boolean_options:
             options[key] = get_boolean_option('General', key, fallback=value)
         elif key == 'file_types':
             options[key] = config.get('General', key, fallback=value).split(";")
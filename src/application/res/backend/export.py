@@ -0,0 +1,59 @@
+import csv
+import io
+
+from backend.bulk_serializer import encode_document
+
+# Formats of the export and their MIME types
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def get_source_value(source: dict, column: str) -> any:
+    """
+    Get the value of a column from the source of a document, columns of the long tail tags are addressed by their
+    path, e.g. 'other_tags.XMP_Creator'.
+
+    :param source: The source of the document.
+    :param column: The name of the column.
+    :return: The value, or None if the document has no value for the column.
+    """
+    if column in source:
+        return source[column]
+    value = source
+    for key in column.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def export_csv(batches, columns: list[str]):
+    """
+    Converts hits into CSV, the header is returned before the first batch is searched.
+
+    :param batches: An iterable of the lists of hits, e.g. returned by OpenSearchManager.scan.
+    :param columns: The columns of the CSV file.
+    :return: A generator of the CSV lines, one string per batch.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for hits in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([get_source_value(hit['_source'], column) for column in columns] for hit in hits)
+        yield buffer.getvalue()
+
+
+def export_ndjson(batches):
+    """
+    Converts hits into NDJSON, one document per line.
+
+    :param batches: An iterable of the lists of hits, e.g. returned by OpenSearchManager.scan.
+    :return: A generator of the NDJSON lines, one buffer per batch.
+    """
+    for hits in batches:
+        yield b''.join(encode_document(hit['_source']) + b'\n' for hit in hits)
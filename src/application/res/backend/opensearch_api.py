@@ -1,14 +1,104 @@
+import base64
 import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from opensearchpy import OpenSearch
 from opensearchpy.exceptions import ConnectionError, NotFoundError, TransportError, RequestError
 from enum import Enum
 import json
+import re
 from dotenv import load_dotenv
 import os
+from backend.bulk_serializer import BulkSerializer
 
 
 # from helper_class import Operator
 
+SYNC_STATE_SUFFIX = '_sync_state'  # suffix of the index storing the sync state of an index
+GENERATION_ID = '_index_generation'  # id of the document in the sync state index that counts the imports
+FIELD_CATALOG_SUFFIX = '_field_catalog'  # suffix of the index storing the statistics of the fields of an index
+
+# mapping of the field catalog, the statistics (min, max and top values of different datatypes) are only stored
+FIELD_CATALOG_MAPPING = {
+    'dynamic': False,
+    'properties': {
+        'field': {'type': 'keyword'},
+        'type': {'type': 'keyword'},
+        'doc_count': {'type': 'long'},
+        'updated': {'type': 'date'},
+    }
+}
+MAX_CATALOG_FIELDS = 10000  # the whole catalog is read with a single search
+# id of the catalog document that records if the catalog covers all documents of the index, only a catalog that was
+# built by a full import (or copied from such a catalog) is complete
+FIELD_CATALOG_META_ID = '_catalog'
+# operators of the advanced search that match the documents without a value for the field
+NEGATIVE_OPERATORS = ('tag_not_exists', 'field_is_empty', 'is_not_equal', 'not_contains')
+VERSION_SUFFIX = '_v'  # versioned indices behind an alias are named '<alias>_v<version>', e.g. 'amoscore_v2'
+VERSION_COMPLETE_META = 'version_complete'  # flag in the _meta of a versioned index that was built completely
+
+# index settings while a large amount of documents is loaded: no periodic refreshes, no replicas to copy
+# the documents to, and the translog is synced in the background instead of after every bulk request
+BULK_LOAD_SETTINGS = {
+    'refresh_interval': '-1',
+    'number_of_replicas': 0,
+    'translog.durability': 'async',
+}
+
+# text fields get a sub-field that is split into trigrams, so substrings are found by a phrase query on the
+# trigrams instead of a wildcard query that scans all terms of the field
+NGRAM_SUBFIELD = 'ngram'
+NGRAM_ANALYZER = 'ngram_analyzer'
+NGRAM_SIZE = 3
+NGRAM_ANALYSIS = {
+    'tokenizer': {
+        'trigram_tokenizer': {'type': 'ngram', 'min_gram': NGRAM_SIZE, 'max_gram': NGRAM_SIZE, 'token_chars': []}
+    },
+    'analyzer': {
+        NGRAM_ANALYZER: {'type': 'custom', 'tokenizer': 'trigram_tokenizer', 'filter': ['lowercase']}
+    }
+}
+
+# text fields also get a keyword sub-field for exact matches, sorting and aggregations on doc values
+KEYWORD_SUBFIELD = 'keyword'
+
+# numeric datatypes, they are searched with term and range queries
+NUMERIC_TYPES = {'long', 'integer', 'short', 'byte', 'double', 'float', 'half_float', 'scaled_float', 'unsigned_long'}
+DEFAULT_SCALING_FACTOR = 100  # scaling factor of scaled_float fields without a given factor
+
+# flat_object field that stores the values of the rarely used tags (the long tail), its sub-fields are searched
+# with keyword semantics, e.g. 'other_tags.XMP_Creator'. The names of the tags are stored in the mapping's _meta
+LONG_TAIL_FIELD = 'other_tags'
+LONG_TAIL_DATATYPE = 'keyword'  # datatype the sub-fields of the long tail field are searched with
+
+# weight of the advanced search criteria that do not influence the ranking, they are executed in filter context
+DEFAULT_WEIGHT = 1
+
+# range operators of the advanced search, used to combine the ranges of a field
+LOWER_BOUNDS = ('gt', 'gte')
+UPPER_BOUNDS = ('lt', 'lte')
+
+# point in time of the paged searches, the next page has to be requested within this time to see the same documents
+PIT_KEEP_ALIVE = '5m'
+# keyword field with doc values that receives the id of each file (the 'SourceFile' tag) via copy_to, documents with
+# the same score are ordered by it in the paged searches. Sorting by _id would load its values as fielddata onto the
+# heap, _id has no doc values. Indices created before the field existed are still sorted by _id until they are rebuilt
+ID_TAG = 'SourceFile'
+ID_FIELD = 'file_id'
+ID_IGNORE_ABOVE = 8191  # longest id (in characters) that fits into the doc values (32766 bytes)
+SCROLL_KEEP_ALIVE = '2m'  # time the scroll of an export is kept between two batches
+
+# response of a search that can not match any document, it is returned without sending the query
+EMPTY_RESPONSE = {'took': 0, 'timed_out': False, 'hits': {'total': {'value': 0, 'relation': 'eq'}, 'max_score': None,
+                                                          'hits': []}}
+
+# catch-all field that receives the values of all text fields via copy_to, the simple search only queries this field
+ALL_TEXT_FIELD = 'all_text'
+# fields that are added to every document by the import, they are not metadata tags and not shown as search fields
+INTERNAL_FIELDS = ('timestamp', 'content_hash', ALL_TEXT_FIELD, ID_FIELD)
+
+
 class OpenSearchManager:
     """
      Class for managing the connection to OpenSearch and perform simple and advanced search.
@@ -16,7 +106,7 @@ class OpenSearchManager:
      on your specific requirements.
      """
 
-    def __init__(self, localhost: bool = False, search_size=10):
+    def __init__(self, localhost: bool = False, search_size=10, pool_size: int = 10, schema_ttl: float = 60):
         """
         Create a new OpenSearchManager for handling the connection to OpenSearch.
 
@@ -24,10 +114,20 @@ class OpenSearchManager:
                           the docker container.
                           If not set to True, it will automatically connect to the docker container.
         :param search_size: A integer variable, which specifies, how much search results should be displayed.
+        :param pool_size: The maximum amount of connections the client keeps open to the OpenSearch node. This
+                          limits how many requests (e.g. parallel bulk requests) can be sent at the same time.
+        :param schema_ttl: Seconds the mapping of an index is cached before it is fetched again, so mapping changes
+                           of other processes (e.g. the import) become visible (default = 60).
         """
 
         self._set_host(localhost)  # set the host for the OpenSearch connection
         self.search_size = search_size
+        self._pool_size = pool_size
+        self._serializers = {}  # encoders for the bodies of bulk requests per operation type
+        self._schema_ttl = schema_ttl
+        self._schema_cache = {}  # index name -> (expiry time, mapped properties, field -> datatype)
+        self._presence_cache = {}  # (index name, field name) -> (expiry time, at least one document has a value)
+        self._catalog_cache = {}  # index name -> (expiry time, field name -> catalog entry, complete)
         self._connect_to_open_search()
 
     def _set_host(self, localhost: bool):
@@ -56,7 +156,8 @@ class OpenSearchManager:
             verify_certs=False,  # Disable verification of certificates
             ssl_assert_hostname=False,  # Disable verification of hostname
             ssl_show_warn=False,  # Disable SSL warnings
-            retry_on_timeout=True  # Enable the client to reconnect after a timeout
+            retry_on_timeout=True,  # Enable the client to reconnect after a timeout
+            maxsize=self._pool_size  # Connections that can be shared by parallel requests
         )
 
         # Wait until the node is ready before performing an import
@@ -92,8 +193,7 @@ class OpenSearchManager:
             list[str]: A list of field names of the corresponding index.
         """
         try:
-            index_mapping = self._client.indices.get_mapping(index=index_name)
-            properties = index_mapping[index_name]["mappings"]["properties"]
+            properties = self._get_index_properties(index_name)
             fields = list(properties.keys())
             return fields
 
@@ -112,9 +212,12 @@ class OpenSearchManager:
              str: A string containing the name of the corresponding datatype.
          """
         try:
-            mapping = self._client.indices.get_mapping(index=index_name)
-            datatype = mapping[index_name]['mappings']['properties'][field_name]['type']
-            return datatype
+            field_types = self.get_field_types(index_name)
+            if field_name not in field_types and field_name.startswith(LONG_TAIL_FIELD + '.') \
+                    and field_name[len(LONG_TAIL_FIELD) + 1:] in self.get_long_tail_tags(index_name):
+                return LONG_TAIL_DATATYPE
+            datatype = field_types[field_name]
+            return datatype if datatype is not None else ""
 
         except Exception as e:
             print(
@@ -124,6 +227,7 @@ class OpenSearchManager:
 
     def extract_metadata_dict(self, index_name: str) -> dict:
         """Extract field names and data types from the mapping dictionary and create a new dictionary.
+        The internal fields of the import (e.g. the content hash) are not included.
 
         Args:
             index_name (str): The name of the index to retrieve metadata from.
@@ -131,15 +235,237 @@ class OpenSearchManager:
         Returns:
             dict: A new dictionary with field names as keys and data types as values.
         """
-        metadata_dict = {}
+        return {field_name: data_type for field_name, data_type in self.get_field_types(index_name).items()
+                if field_name not in INTERNAL_FIELDS}
+
+    def get_searchable_fields(self, index_name: str) -> dict:
+        """Get all fields that can be searched, including the tags of the long tail as sub-fields of the
+        flat_object field (e.g. 'other_tags.XMP_Creator').
+
+        Args:
+            index_name (str): The name of the index or alias.
+
+        Returns:
+            dict: A dictionary with field names as keys and data types as values.
+        """
+        fields = self.extract_metadata_dict(index_name)
+        fields.pop(LONG_TAIL_FIELD, None)
+        for tag in self.get_long_tail_tags(index_name):
+            fields[f"{LONG_TAIL_FIELD}.{tag}"] = LONG_TAIL_DATATYPE
+        return fields
+
+    def get_long_tail_tags(self, index_name: str) -> list[str]:
+        """Get the tags that are stored in the flat_object field instead of fields of their own.
+
+        Args:
+            index_name (str): The name of the index or alias.
+
+        Returns:
+            list[str]: The names of the tags.
+        """
+        return self._get_schema(index_name)[3].get('long_tail_tags', [])
+
+    def get_field_types(self, index_name: str) -> dict:
+        """Get the datatype of every field of an index from the schema cache. The returned dictionary is shared
+        by all callers and must not be modified.
+
+        Args:
+            index_name (str): The name of the index or alias.
+
+        Returns:
+            dict: A dictionary with field names as keys and data types as values.
+        """
+        return self._get_schema(index_name)[2]
+
+    def _get_index_properties(self, index_name: str) -> dict:
+        """Get the mapped properties of an index from the schema cache.
+
+        Args:
+            index_name (str): The name of the index or alias.
+
+        Returns:
+            dict: The properties of the mapping.
+        """
+        return self._get_schema(index_name)[1]
+
+    def _get_schema(self, index_name: str) -> tuple:
+        """Get the cached schema of an index, the mapping is fetched with a single request if it is not cached
+        or expired. The index can also be addressed by an alias, the response of OpenSearch is keyed by the name
+        of the physical index in that case.
+
+        Args:
+            index_name (str): The name of the index or alias.
+
+        Returns:
+            tuple: The expiry time, the mapped properties, a dictionary of the field datatypes and the _meta of
+                the mapping.
+        """
+        schema = self._schema_cache.get(index_name)
+        if schema is None or schema[0] < time.monotonic():
+            mapping = self._client.indices.get_mapping(index=index_name)
+            mappings = next(iter(mapping.values()))['mappings']
+            properties = mappings['properties']
+            field_types = {field_name: field_info.get('type') for field_name, field_info in properties.items()}
+            schema = (time.monotonic() + self._schema_ttl, properties, field_types, mappings.get('_meta', {}))
+            self._schema_cache[index_name] = schema
+        return schema
+
+    def invalidate_schema(self, index_name: str = None):
+        """Removes cached mappings, so the next lookup fetches the current mapping.
+
+        Args:
+            index_name (str): The name of the index or alias (default = None --> all indices, e.g. because an
+                alias was swapped).
+        """
+        if index_name is None:
+            self._schema_cache.clear()
+            self._presence_cache.clear()
+            self._catalog_cache.clear()
+        else:
+            self._schema_cache.pop(index_name, None)
+            self._catalog_cache.pop(index_name, None)
+            for key in [key for key in self._presence_cache if key[0] == index_name]:
+                del self._presence_cache[key]
+
+    def get_present_fields(self, index_name: str, field_names: list[str]) -> set[str]:
+        """Get the fields for which at least one document has a value. The presence of the fields is cached like
+        the mapping, the fields that are not cached are checked with a single request containing one filter
+        aggregation per field. Fields that are not mapped are not present without a request.
+
+        If the import maintains a field catalog that covers all documents of the index, the presence is read from
+        the catalog instead. If the presence can not be checked, the fields are treated as present.
+
+        Args:
+            index_name (str): The name of the index or alias.
+            field_names (list[str]): The names of the fields.
+
+        Returns:
+            set[str]: The names of the present fields.
+        """
+        now = time.monotonic()
+        searchable_fields = self.get_searchable_fields(index_name)
+        catalog, complete = self._get_cached_field_catalog(index_name)
+        present_fields = set()
+        unknown_fields = []
+        for field_name in field_names:
+            if field_name not in searchable_fields:
+                continue
+            if complete:
+                if catalog.get(field_name, {}).get('doc_count', 0) > 0:
+                    present_fields.add(field_name)
+                continue
+            presence = self._presence_cache.get((index_name, field_name))
+            if presence is None or presence[0] < now:
+                unknown_fields.append(field_name)
+            elif presence[1]:
+                present_fields.add(field_name)
+        if not unknown_fields:
+            return present_fields
+
+        try:
+            # the aggregations are keyed by position, since field names may contain characters like '.'
+            query = {
+                "size": 0,
+                "aggs": {
+                    "presence": {
+                        "filters": {
+                            "filters": {str(i): {"exists": {"field": field_name}}
+                                        for i, field_name in enumerate(unknown_fields)}
+                        }
+                    }
+                }
+            }
+            buckets = self._client.search(body=query, index=index_name)['aggregations']['presence']['buckets']
+        except Exception as e:
+            print(f"Error occurred while checking the fields {unknown_fields} in index '{index_name}': {str(e)}")
+            return present_fields.union(unknown_fields)  # the criteria of the fields are kept
+
+        expiry = time.monotonic() + self._schema_ttl
+        for i, field_name in enumerate(unknown_fields):
+            present = buckets[str(i)]['doc_count'] > 0
+            self._presence_cache[(index_name, field_name)] = (expiry, present)
+            if present:
+                present_fields.add(field_name)
+        return present_fields
+
+    def get_field_catalog(self, index_name: str) -> dict:
+        """Get the field catalog of an index, which is maintained by the import. It contains the datatype, the
+        amount of documents with a value, the minimum and maximum (numeric and date fields) and the most frequent
+        values (text and keyword fields) of each field. The catalog is read with a single request and cached like
+        the mapping.
+
+        Args:
+            index_name (str): The name of the index or alias.
+
+        Returns:
+            dict: A dictionary with field names as keys and catalog entries as values, empty if the index has no
+                catalog (e.g. it was imported by an older version).
+        """
+        return self._get_cached_field_catalog(index_name)[0]
+
+    def is_field_catalog_complete(self, index_name: str) -> bool:
+        """Checks if the field catalog of an index covers all of its documents, so fields that are missing in the
+        catalog have no values.
+
+        Args:
+            index_name (str): The name of the index or alias.
+
+        Returns:
+            bool: True, if the catalog was built by a full import of the index.
+        """
+        return self._get_cached_field_catalog(index_name)[1]
+
+    def _get_cached_field_catalog(self, index_name: str) -> tuple[dict, bool]:
+        """Get the field catalog of an index and whether it is complete, both are cached like the mapping."""
+        cached = self._catalog_cache.get(index_name)
+        if cached is not None and cached[0] >= time.monotonic():
+            return cached[1], cached[2]
+        try:
+            response = self._client.search(index=self.resolve_index(index_name) + FIELD_CATALOG_SUFFIX,
+                                           body={'size': MAX_CATALOG_FIELDS, 'query': {'match_all': {}}})
+            catalog = {hit['_id']: hit['_source'] for hit in response['hits']['hits']}
+        except NotFoundError:
+            catalog = {}
+        complete = catalog.pop(FIELD_CATALOG_META_ID, {}).get('complete', False)
+        self._catalog_cache[index_name] = (time.monotonic() + self._schema_ttl, catalog, complete)
+        return catalog, complete
 
-        mapping_dict = self._client.indices.get_mapping(index=index_name)
-        properties = mapping_dict[index_name]['mappings']['properties']
-        for field_name, field_info in properties.items():
-            data_type = field_info.get('type')
-            metadata_dict[field_name] = data_type
+    def update_field_catalog(self, index_name: str, catalog: dict, complete: bool = None):
+        """Stores the entries of the field catalog of an index, the catalog index is created if it does not exist.
 
-        return metadata_dict
+        Args:
+            index_name (str): The name of the index (or alias) the files are imported into.
+            catalog (dict): A dictionary with field names as keys and catalog entries as values.
+            complete (bool): Whether the catalog covers all documents of the index (default = None --> unchanged).
+        """
+        catalog_index = self.resolve_index(index_name) + FIELD_CATALOG_SUFFIX
+        if not self.index_exists(catalog_index):
+            self._client.indices.create(index=catalog_index, body={'mappings': FIELD_CATALOG_MAPPING})
+        serializer = self._get_serializer('index')
+        entries = [serializer.encode_entry(catalog_index, entry, field_name) for field_name, entry in catalog.items()]
+        if complete is not None:
+            entries.append(serializer.encode_entry(catalog_index, {'complete': complete}, FIELD_CATALOG_META_ID))
+        if entries:
+            self._client.bulk(body=serializer.join(entries), refresh=True)
+        self._catalog_cache.pop(index_name, None)
+
+    def delete_field_catalog(self, index_name: str):
+        """Deletes the field catalog of a physical index.
+
+        Args:
+            index_name (str): The name of the physical index (aliases are not resolved).
+        """
+        self._client.indices.delete(index=index_name + FIELD_CATALOG_SUFFIX, ignore_unavailable=True)
+        self._catalog_cache.clear()
+
+    def copy_field_catalog(self, source_index: str, dest_index: str):
+        """Copies the field catalog of an index to another index, e.g. after its documents were copied.
+
+        Args:
+            source_index (str): The name of the index (or alias) the catalog is copied from.
+            dest_index (str): The name of the index the catalog is copied to.
+        """
+        self._copy_companion_index(source_index, dest_index, FIELD_CATALOG_SUFFIX)
 
     def field_exists(self, index_name: str, field_name: str) -> bool:
         """Check if a field exists or if at least one document has a value for it.
@@ -210,32 +536,43 @@ class OpenSearchManager:
         except TransportError:
             return 0
 
-    def create_index(self, index_name: str):
+    def create_index(self, index_name: str, settings: dict = None):
         """Create a new index with non-default settings.
 
         Args:
             index_name (str): The name of the new index.
+            settings (dict): Additional index settings, e.g. {'number_of_replicas': 0} (default = None --> 4 shards
+                and the default settings of the node).
 
         """
+        index_settings = {'number_of_shards': 4, 'analysis': NGRAM_ANALYSIS}
+        if settings:
+            index_settings.update(settings)
+
         # The body of the new index creation
         index_body = {
             'settings': {
-                'index': {
-                    'number_of_shards': 4
-                }
+                'index': index_settings
             },
             'mappings': {
                 'properties':
                     {
                         'timestamp': {'type': 'date', "format": "strict_date_hour_minute_second||epoch_millis"},
+                        # hash of the file's metadata, it is only read to detect changed files
+                        'content_hash': {'type': 'keyword', 'index': False, 'doc_values': False},
+                        # id of the file, it is only sorted by
+                        ID_FIELD: {'type': 'keyword', 'index': False, 'ignore_above': ID_IGNORE_ABOVE},
+                        ALL_TEXT_FIELD: {'type': 'text',
+                                         'fields': {NGRAM_SUBFIELD: {'type': 'text', 'analyzer': NGRAM_ANALYZER}}},
                     },
             }
 
         }
 
-        if index_name not in self.get_all_indices():
-            # Check if the index already exists
+        if not self.index_exists(index_name):
+            # Check if the index (or an alias with this name) already exists
             response = self._client.indices.create(index=index_name, body=index_body)
+            self.invalidate_schema()
             if response["acknowledged"]:
                 print(f"Index '{index_name}' created successfully.")
             else:
@@ -244,11 +581,22 @@ class OpenSearchManager:
         else:
             print(f"Index '{index_name}' already exists.")
 
-    def update_index(self, index_name: str, data_types: dict) -> any:
+    def update_index(self, index_name: str, data_types: dict, ngram_fields: bool = True,
+                     keyword_ignore_above: int = 256, field_parameters: dict = None,
+                     long_tail_tags: list = None) -> any:
         """ This function adds properties (datatypes for fields) to an existing index
 
         :param index_name: The name of the index that will be updated
         :param data_types: A dictionary containing all fields and their corresponding datatypes
+        :param ngram_fields: Add a trigram sub-field to new text fields for fast substring searches. It is only
+                             added if the index was created with the trigram analyzer (default = True).
+        :param keyword_ignore_above: Values of new text fields up to this length are also indexed in a keyword
+                                     sub-field, longer values are only searchable as text
+                                     (default = 256, 0 --> no keyword sub-field).
+        :param field_parameters: Additional mapping parameters of single fields, e.g.
+                                 {'ExposureTime': {'scaling_factor': 1000}} for a scaled_float field (default = None).
+        :param long_tail_tags: Tags that get no field of their own, they are stored in the flat_object field
+                               'other_tags' (default = None).
         :return: Returns a OpenSearch response of the index update action
         """
         # create a mapping body for the new properties
@@ -256,48 +604,495 @@ class OpenSearchManager:
 
         try:
             # get all existing properties of this index
-            response = self._client.indices.get_mapping(index_name)
+            properties = self._get_index_properties(index_name)
+            ngram_fields = ngram_fields and self._has_ngram_analyzer(index_name)
+            copy_to_all_text = ALL_TEXT_FIELD in properties
 
             for key, datatype in data_types.items():  # iterate over all item pairs in data_types
                 # if this field is not already in the properties, add it
-                if key not in response[index_name]['mappings']['properties']:
+                if key not in properties:
                     if datatype == "date":
                         # Special handling for datetime types
                         property = {"type": datatype, "format": "strict_date_hour_minute_second||epoch_millis"}
+                    elif datatype == "text" and key != ALL_TEXT_FIELD:
+                        property = {"type": datatype, "fields": {}}
+                        if ngram_fields:
+                            property["fields"][NGRAM_SUBFIELD] = {"type": "text", "analyzer": NGRAM_ANALYZER}
+                        if keyword_ignore_above:
+                            property["fields"][KEYWORD_SUBFIELD] = {"type": "keyword",
+                                                                    "ignore_above": keyword_ignore_above}
+                        if not property["fields"]:
+                            del property["fields"]
+                        if copy_to_all_text:
+                            property["copy_to"] = ALL_TEXT_FIELD  # the simple search finds the value in the catch-all
                     else:
                         property = {"type": datatype}
+                    if field_parameters and key in field_parameters:
+                        property.update(field_parameters[key])
+                    elif datatype == "scaled_float":
+                        property["scaling_factor"] = DEFAULT_SCALING_FACTOR  # the mapping requires a factor
+                    if key == ID_TAG and ID_FIELD in properties:
+                        # the id of the file is copied into the keyword field the paged searches are sorted by
+                        property["copy_to"] = [property["copy_to"], ID_FIELD] if "copy_to" in property else ID_FIELD
                     mapping_body['properties'][key] = property
-            return self._client.indices.put_mapping(index=index_name, body=mapping_body)
+
+            if long_tail_tags:
+                if LONG_TAIL_FIELD not in properties:
+                    mapping_body['properties'][LONG_TAIL_FIELD] = {"type": "flat_object"}
+                # _meta is replaced by put_mapping, so the tags of earlier updates are kept
+                meta = dict(self._get_schema(index_name)[3])
+                meta['long_tail_tags'] = sorted(set(meta.get('long_tail_tags', [])) | set(long_tail_tags))
+                mapping_body['_meta'] = meta
+            response = self._client.indices.put_mapping(index=index_name, body=mapping_body)
+            # the mapping can be cached by the name of the index and of its alias
+            self.invalidate_schema()
+            return response
 
         except NotFoundError:
             print(f"Index '{index_name}' not found.")
         except KeyError:
             print(f"No mapping found for index '{index_name}.'")
 
-    def perform_bulk(self, index_name: str, data: list[(dict, id)]) -> object:
+    def _has_ngram_analyzer(self, index_name: str) -> bool:
+        """Check if an index was created with the trigram analyzer, analyzers can not be added to an existing index.
+
+        Args:
+            index_name (str): The name of the index or alias.
+
+        Returns:
+            bool: True if text fields of the index can get a trigram sub-field.
+        """
+        analyzer_key = f'analysis.analyzer.{NGRAM_ANALYZER}.tokenizer'
+        return self._get_index_settings(index_name, [analyzer_key])[analyzer_key] is not None
+
+    def get_ngram_field(self, index_name: str, field_name: str) -> any:
+        """Get the trigram sub-field of a text field.
+
+        Args:
+            index_name (str): The name of the index or alias.
+            field_name (str): The name of the text field.
+
+        Returns:
+            any: The name of the sub-field (e.g. 'FileName.ngram'), or None if the field has no trigram sub-field.
+        """
+        return self._get_sub_field(index_name, field_name, NGRAM_SUBFIELD)
+
+    def get_keyword_field(self, index_name: str, field_name: str) -> any:
+        """Get the keyword sub-field of a text field.
+
+        Args:
+            index_name (str): The name of the index or alias.
+            field_name (str): The name of the text field.
+
+        Returns:
+            any: The name of the sub-field (e.g. 'FileName.keyword'), or None if the field has no keyword sub-field.
+        """
+        return self._get_sub_field(index_name, field_name, KEYWORD_SUBFIELD)
+
+    def get_field_parameters(self, index_name: str) -> dict:
+        """Get the additional mapping parameters of the fields that need them to be created, e.g. the scaling
+        factor of scaled_float fields, so the fields can be created with the same mapping in another index.
+
+        Args:
+            index_name (str): The name of the index or alias.
+
+        Returns:
+            dict: A dictionary containing the parameters of each field that has any.
+        """
+        return {field_name: {'scaling_factor': field_info['scaling_factor']}
+                for field_name, field_info in self._get_index_properties(index_name).items()
+                if 'scaling_factor' in field_info}
+
+    def get_sortable_field(self, index_name: str, field_name: str) -> any:
+        """Get the field that can be used to sort or aggregate by a field, using its doc values.
+
+        Args:
+            index_name (str): The name of the index or alias.
+            field_name (str): The name of the field.
+
+        Returns:
+            any: The name of the field or its keyword sub-field, or None if the field has no doc values
+                 (e.g. a text field without keyword sub-field).
+        """
+        data_type = self.get_field_types(index_name).get(field_name)
+        if data_type == 'text':
+            return self.get_keyword_field(index_name, field_name)
+        if data_type is None or data_type == 'flat_object':
+            return None
+        return field_name
+
+    def _get_sub_field(self, index_name: str, field_name: str, sub_field: str) -> any:
+        """Get the name of a sub-field (multi-field) of a field, or None if the field has no such sub-field"""
+        field_info = self._get_index_properties(index_name).get(field_name, {})
+        if sub_field in field_info.get('fields', {}):
+            return f"{field_name}.{sub_field}"
+        return None
+
+    def index_exists(self, index_name: str) -> bool:
+        """Check if an index or an alias exists.
+
+        Args:
+            index_name (str): The name of the index or alias.
+
+        Returns:
+            bool: True if an index or an alias with this name exists.
+        """
+        return self._client.indices.exists(index=index_name)
+
+    def resolve_index(self, index_name: str) -> str:
+        """Get the physical index behind an alias.
+
+        Args:
+            index_name (str): The name of an alias or an index.
+
+        Returns:
+            str: The name of the index the alias points to, or the given name if it is not an alias.
+        """
+        indices = self.get_alias_indices(index_name)
+        return indices[0] if len(indices) == 1 else index_name
+
+    def get_alias_indices(self, alias: str) -> list[str]:
+        """Get the indices an alias points to.
+
+        Args:
+            alias (str): The name of the alias.
+
+        Returns:
+            list[str]: The names of the indices, an empty list if no alias with this name exists.
+        """
+        try:
+            return list(self._client.indices.get_alias(name=alias).keys())
+        except NotFoundError:
+            return []
+
+    def get_index_versions(self, alias: str, complete_only: bool = False) -> list[int]:
+        """Get the versions of the versioned indices of an alias ('<alias>_v<version>').
+
+        Args:
+            alias (str): The name of the alias.
+            complete_only (bool): Whether only the versions that were marked as complete are returned, a rebuild
+                that failed leaves an incomplete version (default = False).
+
+        Returns:
+            list[int]: The existing versions in ascending order.
+        """
+        pattern = re.compile(re.escape(alias + VERSION_SUFFIX) + r'(\d+)$')
+        try:
+            indices = self._client.indices.get(index=alias + VERSION_SUFFIX + '*')
+        except NotFoundError:
+            return []
+        versions = []
+        for index_name, index_info in indices.items():
+            match = pattern.match(index_name)
+            if match is None:
+                continue
+            if complete_only and not index_info.get('mappings', {}).get('_meta', {}).get(VERSION_COMPLETE_META):
+                continue
+            versions.append(int(match.group(1)))
+        return sorted(versions)
+
+    def mark_version_complete(self, index_name: str):
+        """Marks a versioned index as completely built in the _meta of its mapping, only complete versions are
+        kept for a rollback.
+
+        Args:
+            index_name (str): The name of the versioned index.
+        """
+        # _meta is replaced by put_mapping, so the other entries are kept
+        self.invalidate_schema(index_name)
+        meta = dict(self._get_schema(index_name)[3], **{VERSION_COMPLETE_META: True})
+        self._client.indices.put_mapping(index=index_name, body={'_meta': meta})
+        self.invalidate_schema()
+
+    @staticmethod
+    def get_versioned_index_name(alias: str, version: int) -> str:
+        """Get the name of a versioned index of an alias, e.g. 'amoscore_v2'."""
+        return f"{alias}{VERSION_SUFFIX}{version}"
+
+    def swap_alias(self, alias: str, index_name: str) -> any:
+        """Points an alias to a new index with a single atomic request, searches never see a missing index.
+        An existing physical index with the name of the alias (an index created before versioned indices were
+        used) is deleted in the same request, its documents have to be copied into the new index before.
+
+        Args:
+            alias (str): The name of the alias.
+            index_name (str): The name of the index the alias will point to.
+
+        Returns:
+            any: The OpenSearch response.
+        """
+        actions = [{'remove': {'index': index, 'alias': alias}} for index in self.get_alias_indices(alias)]
+        if not actions and self.index_exists(alias):
+            actions.append({'remove_index': {'index': alias}})
+        actions.append({'add': {'index': index_name, 'alias': alias}})
+        response = self._client.indices.update_aliases(body={'actions': actions})
+        self.invalidate_schema()
+        return response
+
+    def reindex(self, source_index: str, dest_index: str, slices: any = 'auto', poll_seconds: int = 10) -> dict:
+        """Copies all documents of an index into another index with a sliced reindex, the slices are processed in
+        parallel by the cluster. The reindex runs as a task, so it is not limited by the timeout of a request.
+
+        Args:
+            source_index (str): The name of the index (or alias) the documents are copied from.
+            dest_index (str): The name of the index the documents are copied into.
+            slices (any): Amount of parallel slices, 'auto' uses one slice per shard (default = 'auto').
+            poll_seconds (int): Seconds between the checks whether the reindex finished (default = 10).
+
+        Returns:
+            dict: The response of the finished reindex task.
+        """
+        body = {
+            'source': {'index': source_index},
+            'dest': {'index': dest_index, 'op_type': 'create'},
+            'conflicts': 'proceed'
+        }
+        task_id = self._client.reindex(body=body, slices=slices, wait_for_completion=False)['task']
+        while True:
+            task = self._client.tasks.get(task_id=task_id)
+            if task['completed']:
+                response = task.get('response', {})
+                if task.get('error') or response.get('failures'):
+                    raise RuntimeError(f"Reindex from '{source_index}' to '{dest_index}' failed: "
+                                       f"{task.get('error') or response['failures'][:10]}")
+                return response
+            status = task['task']['status']
+            print(f"Reindexed {status.get('created', 0)} of {status.get('total', 0)} documents ...")
+            time.sleep(poll_seconds)
+
+    def delete_index(self, index_name: str):
+        """Deletes an index, its sync state and its field catalog.
+
+        Args:
+            index_name (str): The name of the index.
+        """
+        self._client.indices.delete(index=index_name)
+        self.invalidate_schema()
+        self.delete_sync_state(index_name)
+        self.delete_field_catalog(index_name)
+        print(f"Index '{index_name}' deleted.")
+
+    def delete_sync_state(self, index_name: str):
+        """Deletes the sync states of a physical index, e.g. after the index was replaced by an alias.
+
+        Args:
+            index_name (str): The name of the physical index (aliases are not resolved).
+        """
+        self._client.indices.delete(index=index_name + SYNC_STATE_SUFFIX, ignore_unavailable=True)
+
+    def copy_sync_state(self, source_index: str, dest_index: str):
+        """Copies the sync states of all file types of an index to another index, e.g. after its documents were
+        copied, so the next import continues at the same high-watermark.
+
+        Args:
+            source_index (str): The name of the index (or alias) the sync states are copied from.
+            dest_index (str): The name of the index the sync states are copied to.
+        """
+        self._copy_companion_index(source_index, dest_index, SYNC_STATE_SUFFIX)
+
+    def _copy_companion_index(self, source_index: str, dest_index: str, suffix: str):
+        """Copies a small index that belongs to an index (e.g. its sync states) to the index of another index.
+
+        Args:
+            source_index (str): The name of the index (or alias) the documents are copied from.
+            dest_index (str): The name of the index the documents are copied to.
+            suffix (str): The suffix of the companion index, e.g. '_sync_state'.
+        """
+        source_companion_index = self.resolve_index(source_index) + suffix
+        if not self.index_exists(source_companion_index):
+            return
+        if suffix == FIELD_CATALOG_SUFFIX and not self.index_exists(dest_index + suffix):
+            self._client.indices.create(index=dest_index + suffix, body={'mappings': FIELD_CATALOG_MAPPING})
+        body = {'source': {'index': source_companion_index}, 'dest': {'index': dest_index + suffix}}
+        self._client.reindex(body=body, refresh=True)
+
+    @contextmanager
+    def bulk_load_mode(self, index_name: str, max_num_segments: int = 0):
+        """
+        Context manager that prepares an index for loading a large amount of documents, e.g. the initial import.
+        Refreshes and replicas are disabled and the translog is synced asynchronously while the context is active.
+        The previous settings are restored and the index is refreshed when the context is left, even if an error
+        occurred. The index is only force-merged if the load finished without error.
+
+        :param index_name: The name of the index.
+        :param max_num_segments: Amount of segments per shard the index is force-merged to after the load
+                                 (default = 0 --> no force merge).
+        """
+        previous_settings = self._get_index_settings(index_name, BULK_LOAD_SETTINGS.keys())
+        self._client.indices.put_settings(index=index_name, body={'index': BULK_LOAD_SETTINGS})
+        print(f"Bulk-load mode enabled for index '{index_name}'.")
+        completed = False
+        try:
+            yield
+            completed = True
+        finally:
+            # settings that were not set before are reset to the default of the node by passing None
+            self._client.indices.put_settings(index=index_name, body={'index': previous_settings})
+            self._client.indices.refresh(index=index_name)
+            print(f"Bulk-load mode disabled for index '{index_name}', settings restored.")
+            if completed and max_num_segments:
+                self._client.indices.forcemerge(index=index_name, max_num_segments=max_num_segments,
+                                                request_timeout=3600)
+
+    def _get_index_settings(self, index_name: str, keys) -> dict:
+        """
+        Get the explicitly set values of some index settings.
+
+        :param index_name: The name of the index.
+        :param keys: The names of the settings without the 'index.' prefix, e.g. 'refresh_interval'.
+        :return: A dictionary containing the value of each setting, or None if the setting is not set.
+        """
+        response = self._client.indices.get_settings(index=index_name, flat_settings=True)
+        settings = next(iter(response.values()))['settings']
+        return {key: settings.get('index.' + key) for key in keys}
+
+    def refresh_index(self, index_name: str):
+        """
+        Makes all indexed documents of an index visible for searches and counts.
+
+        :param index_name: The name of the index.
+        """
+        self._client.indices.refresh(index=index_name)
+
+    def perform_bulk(self, index_name: str, data: list[(any, id)], op_type: str = 'create') -> object:
         """
         Insert multiple documents into OpenSearch via the bulk API.
+        If OpenSearch rejects the request because it is too large (413), the documents are split in half
+        and sent again, until every part is accepted. No document is dropped silently, documents that can not be
+        sent are reported as failed items in the response.
 
         :param index_name: The name of the index to which the new data will be added.
-        :param data: A list of dictionaries containing the new data and its values in the right format.
-        :return: The response of the bulk request.
+        :param data: A list of tuples containing a document and its id. The documents can either be dictionaries
+                     or bytes that were already serialized with bulk_serializer.encode_documents.
+        :param op_type: The bulk operation, 'create' only adds new documents, 'index' also overwrites existing
+                        documents (default = 'create').
+        :return: The (merged) response of the bulk request(s).
         """
-        create_operation = {
-            "create": {"_index": index_name}
-        }
+        entries = self._get_serializer(op_type).encode_entries(index_name, data)
+        return self._perform_encoded_bulk(entries, data)
+
+    def _get_serializer(self, op_type: str) -> BulkSerializer:
+        """
+        Get the bulk serializer of an operation type.
+
+        :param op_type: The bulk operation, e.g. 'create' or 'index'.
+        :return: The serializer.
+        """
+        serializer = self._serializers.get(op_type)
+        if serializer is None:
+            serializer = self._serializers.setdefault(op_type, BulkSerializer(op_type=op_type))
+        return serializer
 
-        bulk_data = []
-        for doc, id in data:
-            if not id == "default_id":
-                create_operation['create']['_id'] = id
-            bulk_data.append(str(create_operation))
-            bulk_data.append(str(doc))
-        bulk_request = "\n".join(bulk_data).replace("'", "\"")
+    def _perform_encoded_bulk(self, entries: list[bytes], data: list[(any, id)]) -> dict:
+        """
+        Sends already encoded bulk entries, a rejected request is bisected without encoding the entries again.
+
+        :param entries: A list of encoded bulk entries.
+        :param data: The list of (document, id) tuples the entries belong to.
+        :return: The (merged) response of the bulk request(s).
+        """
         try:
-            return self._client.bulk(body=bulk_request)
-        except TransportError:
-            print("Bulk data oversteps the amount of allowed bytes")
-            return None
+            return self._client.bulk(body=BulkSerializer.join(entries))
+        except TransportError as e:
+            if e.status_code == 413 and len(entries) > 1:
+                # Bulk data oversteps the amount of allowed bytes, so bisect the data and retry both halves
+                middle = len(entries) // 2
+                first_response = self._perform_encoded_bulk(entries[:middle], data[:middle])
+                second_response = self._perform_encoded_bulk(entries[middle:], data[middle:])
+                response = self._merge_bulk_responses(first_response, second_response)
+                response['split_requests'] += 1
+                return response
+            print(f"Bulk request with {len(entries)} documents failed: {e.error}")
+            return self._get_failed_bulk_response(data, e)
+
+    def get_bulk_entry_size(self, index_name: str, doc: any, id: str, op_type: str = 'create') -> int:
+        """
+        Get the amount of bytes a single document takes in the body of a bulk request.
+
+        :param index_name: The name of the index to which the document will be added.
+        :param doc: The document, either as a dictionary or as already serialized bytes.
+        :param id: The id of the document.
+        :param op_type: The bulk operation (default = 'create').
+        :return: The size of the action and the document line in bytes.
+        """
+        return self._get_serializer(op_type).get_entry_size(index_name, doc, id)
+
+    def get_content_hashes(self, index_name: str, ids: list[str]) -> dict:
+        """
+        Get the stored content hashes of multiple documents with a single request.
+
+        :param index_name: The name of the index.
+        :param ids: The ids of the documents.
+        :return: A dictionary containing the content hash of each existing document by its id.
+        """
+        if not ids:
+            return {}
+        try:
+            response = self._client.mget(index=index_name, body={'ids': ids}, _source_includes=['content_hash'])
+        except NotFoundError:
+            return {}
+        return {doc['_id']: doc['_source'].get('content_hash') for doc in response['docs'] if doc.get('found')}
+
+    @staticmethod
+    def _merge_bulk_responses(first_response: dict, second_response: dict) -> dict:
+        """
+        Merges the responses of two bulk requests into a single response.
+
+        :param first_response: The response of the first bulk request.
+        :param second_response: The response of the second bulk request.
+        :return: A bulk response containing the items of both responses in order.
+        """
+        return {
+            'took': first_response.get('took', 0) + second_response.get('took', 0),
+            'errors': first_response['errors'] or second_response['errors'],
+            'items': first_response['items'] + second_response['items'],
+            'split_requests': first_response.get('split_requests', 0) + second_response.get('split_requests', 0)
+        }
+
+    @staticmethod
+    def _get_failed_bulk_response(data: list[(dict, id)], error: TransportError) -> dict:
+        """
+        Creates a bulk response in which every document of a failed bulk request is marked as failed item,
+        so the documents can be handled like any other failed import.
+
+        :param data: A list of tuples containing the documents and their ids.
+        :param error: The error that was raised by the bulk request.
+        :return: A bulk response containing a failed item for each document.
+        """
+        status = error.status_code if isinstance(error.status_code, int) else 503
+        error_type = 'request_entity_too_large' if status == 413 else str(error.error)
+        return {
+            'took': 0,
+            'errors': True,
+            'items': [
+                {'create': {'_id': id, 'status': status, 'error': {'type': error_type, 'reason': str(error)}}}
+                for _, id in data
+            ]
+        }
+
+    def perform_parallel_bulk(self, index_name: str, chunks, thread_count: int = 4, op_type: str = 'create'):
+        """
+        Insert chunks of documents into OpenSearch via several bulk requests that are executed in parallel.
+        All worker threads share the connection pool of this manager's client.
+
+        :param index_name: The name of the index to which the new data will be added.
+        :param chunks: An iterable of chunks, each chunk is a list of tuples containing a document and its id.
+        :param thread_count: The amount of bulk requests that are executed at the same time.
+        :param op_type: The bulk operation (default = 'create').
+        :return: A generator yielding a tuple of the bulk response and the corresponding chunk for each chunk,
+                 in the same order as the chunks were given.
+        """
+        with ThreadPoolExecutor(max_workers=thread_count, thread_name_prefix='bulk') as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append((executor.submit(self.perform_bulk, index_name, chunk, op_type), chunk))
+                # limit the amount of chunks waiting in memory for a free worker
+                if len(pending) >= 2 * thread_count:
+                    future, finished_chunk = pending.popleft()
+                    yield future.result(), finished_chunk
+            while pending:
+                future, finished_chunk = pending.popleft()
+                yield future.result(), finished_chunk
 
     def add_to_index(self, index_name: str, body: dict, id: int) -> object:
         """
@@ -311,15 +1106,25 @@ class OpenSearchManager:
         response = self._execute_indexing(index_name, body, id)
         return response
 
-    def simple_search(self, index_name: str, search_text: str, page: int = 0, page_size: int = 10) -> any:
+    def simple_search(self, index_name: str, search_text: str, page: int = 0, page_size: int = 10,
+                      priority_fields: list[str] = None, cursor: str = None) -> any:
         """
         A function that performs a simple search in OpenSearch.
+        If the index has a catch-all field, only this field and the priority fields are searched, otherwise
+        every text field is searched.
 
         :param index_name: The name of the index in which the search should be performed.
         :param search_text: The search text that will be searched for.
+        :param priority_fields: Fields whose matches are ranked higher, with an optional boost,
+                                e.g. ['FileName^3'] (default = None).
+        :param cursor: The cursor of the requested page, returned as 'next_cursor' with the previous page
+                       (default = None --> the page is requested by its number).
         :return: Returns an OpenSearch response.
         """
-        fields = self.get_all_fields(index_name)
+        if ALL_TEXT_FIELD in self.get_field_types(index_name):
+            fields = [ALL_TEXT_FIELD] + (priority_fields or [])
+        else:
+            fields = self.get_all_fields(index_name)
         query = {
             'size': self.search_size,
             "query": {
@@ -328,77 +1133,410 @@ class OpenSearchManager:
                 }
             }
         }
-        for field in fields:
+        ngram_fields = []
+        for field_entry in fields:
+            field, _, boost = field_entry.partition('^')
             data_type = self.get_datatype(field_name=field, index_name=index_name)
             if data_type == "text":
-                sub_query = {"wildcard": {field: {"value": "*" + search_text + "*"}}}
-                query['query']['bool']['should'].append(sub_query)
-
-        response = self._client.search(
-            body=query,
-            index=index_name,
-            from_=page * page_size,
-            size=page_size
-        )
-        return response
-
-    def advanced_search(self, index_name: str, search_info: dict, page: int = 0, page_size: int = 100) -> any:
+                ngram_field = self.get_ngram_field(index_name, field) if len(search_text) >= NGRAM_SIZE else None
+                if ngram_field is not None:
+                    ngram_fields.append(ngram_field + ('^' + boost if boost else ''))
+                else:
+                    sub_query = {"wildcard": {field: {"value": "*" + search_text + "*",
+                                                      "boost": float(boost) if boost else 1.0}}}
+                    query['query']['bool']['should'].append(sub_query)
+        if ngram_fields:
+            # a single query for all fields with a trigram sub-field
+            sub_query = {"multi_match": {"query": search_text, "type": "phrase", "fields": ngram_fields}}
+            query['query']['bool']['should'].append(sub_query)
+        if LONG_TAIL_FIELD in self.get_field_types(index_name):
+            # values of the long tail tags are only found if they are equal to the search text
+            query['query']['bool']['should'].append({"match": {LONG_TAIL_FIELD: search_text}})
+
+        return self._execute_paged_search(index_name, query, page, page_size, cursor)
+
+    def advanced_search(self, index_name: str, search_info: list[dict], page: int = 0, page_size: int = 100,
+                        cursor: str = None) -> any:
 
         """
     Function that performs an advanced search in OpenSearch.
 
     :param index_name: The name of the index in which the search should be performed.
-    :param search_info: A dictionary containing the different fields and operators for
-    the advanced search.
+    :param search_info: A list of the criteria of the advanced search, each containing the field, the operator,
+    the search content and the weight. A field can have several criteria, e.g. a lower and an upper bound.
     :param page: The page number of the search results.
     :param page_size: The number of search results to return per page.
-    :return: None (or specify the return type if applicable).
+    :param cursor: The cursor of the requested page, returned as 'next_cursor' with the previous page
+    (default = None --> the page is requested by its number).
+    :return: Returns an OpenSearch response.
     """
 
         print("Search_info: ", search_info)
+        query = self.build_advanced_query(index_name, search_info)
+        if query is None:
+            # the criteria contradict each other or require a field without values, no document can match
+            print("Advanced_query: no document can match the criteria")
+            return json.loads(json.dumps(EMPTY_RESPONSE))
+        print("Advanced_query:", query)
+
+        return self._execute_paged_search(index_name, query, page, page_size, cursor)
+
+    def build_advanced_query(self, index_name: str, search_info: list[dict]) -> any:
+        """
+        Compiles the criteria of an advanced search into a query, it is shared by the advanced search and the export.
+
+        :param index_name: The name of the index in which the search should be performed.
+        :param search_info: A list of the criteria of the advanced search, each containing the field, the operator,
+        the search content and the weight.
+        :return: The query, or None if no document can match the criteria (they contradict each other, or a field
+        without values has to match).
+        """
         sub_queries = []
-        for search_field in search_info:
-            print(self.field_exists(index_name, search_field))
-            if self.field_exists(index_name, search_field):
-                data_type = self.get_datatype(index_name, search_field)
-                search_content = search_info[search_field]['search_content']
-                operator = search_info[search_field]['operator']
-                weight = search_info[search_field]['weight']
-                sub_queries.append(self._get_sub_query(data_type, operator, search_field, weight, search_content))
+        # the datatypes come from the cached mapping, the presence of all fields is checked with at most one request
+        field_types = self.get_searchable_fields(index_name)
+        present_fields = self.get_present_fields(index_name, list(dict.fromkeys(
+            criterion['field'] for criterion in search_info)))
+        matches_all = False
+        for criterion in search_info:
+            search_field = criterion['field']
+            operator = criterion['operator']
+            if search_field not in present_fields:
+                if operator in NEGATIVE_OPERATORS:
+                    matches_all = True  # no document has a value for the field, so every document matches
+                    continue
+                print(f"Advanced_query: no document has a value for the field '{search_field}'")
+                return None
+            data_type = field_types[search_field] or ""
+            search_content = criterion['search_content']
+            weight = criterion['weight']
+            ngram_field = self.get_ngram_field(index_name, search_field)
+            keyword_field = self.get_keyword_field(index_name, search_field)
+            sub_queries.append(self._get_sub_query(data_type, operator, search_field, weight, search_content,
+                                                   ngram_field, keyword_field))
         if sub_queries:
-            query = self._get_query(sub_queries, self.search_size)
-        else:
-            query = {"query": {"exists": {"field": " "}}}
-        print("Advanced_query:", query)
+            return self._get_query(sub_queries, self.search_size)
+        if matches_all:
+            return {"query": {"match_all": {}}}
+        return {"query": {"exists": {"field": " "}}}
 
-        response = self._client.search(
-            body=query,
-            index=index_name,
-            from_=page * page_size,
-            size=page_size
-        )
+    def scan(self, index_name: str, query: dict, source_fields: list[str] = None, batch_size: int = 1000):
+        """
+        Iterates over all hits of a query in batches, e.g. to export them. The hits are read with a scroll in index
+        order, which does not need a unique sort field, so only one batch is kept in memory.
+
+        :param index_name: The name of the index in which the search should be performed.
+        :param query: The query, e.g. compiled by build_advanced_query.
+        :param source_fields: The fields of the documents that are returned (default = None --> all fields).
+        :param batch_size: The number of hits per request (default = 1000).
+        :return: A generator of the lists of hits.
+        """
+        body = dict(query, size=batch_size, sort=['_doc'])
+        if source_fields:
+            body['_source'] = source_fields
+        response = self._client.search(body=body, index=index_name, scroll=SCROLL_KEEP_ALIVE)
+        scroll_id = response.get('_scroll_id')
+        try:
+            while response['hits']['hits']:
+                yield response['hits']['hits']
+                response = self._client.scroll(scroll_id=scroll_id, scroll=SCROLL_KEEP_ALIVE)
+                scroll_id = response.get('_scroll_id', scroll_id)
+        finally:
+            # also release the scroll if the export was aborted (e.g. the download was cancelled)
+            if scroll_id:
+                try:
+                    self._client.clear_scroll(scroll_id=scroll_id)
+                except NotFoundError:
+                    pass
+
+    def _execute_paged_search(self, index_name: str, query: dict, page: int, page_size: int,
+                              cursor: str = None) -> dict:
+        """
+        Executes a search and returns a page of its results. The search runs in a point in time (PIT), so all pages
+        show the same documents while an import is running. The results are sorted with a tiebreaker, so the
+        response contains a cursor ('next_cursor') that carries the PIT and continues the search after the last hit
+        with search_after, deep pages cost the same as the first page. The PIT is closed with the last page.
+
+        :param index_name: The name of the index in which the search should be performed.
+        :param query: The query of the search.
+        :param page: The page number, the first page is requested by its number if no cursor is given (e.g. a page
+                     restored by the browser).
+        :param page_size: The number of search results per page.
+        :param cursor: The cursor returned with the previous page (default = None).
+        :return: The OpenSearch response with the additional key 'next_cursor' (None if there are no more hits).
+        """
+        state = self.decode_cursor(cursor)
+        query = dict(query, size=page_size, sort=self.get_page_sort(index_name))
+        if state is None:
+            pit_id = self.open_point_in_time(index_name)
+            query['from'] = page * page_size
+        else:
+            pit_id = state.get('pit') or self.open_point_in_time(index_name)
+            query['search_after'] = state['after']
+        try:
+            response = self._client.search(body=dict(query, pit={'id': pit_id, 'keep_alive': PIT_KEEP_ALIVE}))
+        except NotFoundError:
+            # the point in time expired, the search continues after the same hit in a new one
+            pit_id = self.open_point_in_time(index_name)
+            response = self._client.search(body=dict(query, pit={'id': pit_id, 'keep_alive': PIT_KEEP_ALIVE}))
+        pit_id = response.get('pit_id', pit_id)
+
+        hits = response['hits']['hits']
+        total = response['hits']['total']
+        if len(hits) < page_size or (total.get('relation', 'eq') == 'eq' and
+                                     page * page_size + len(hits) >= total['value']):
+            # there is no next page, so the point in time is not needed anymore
+            self.close_point_in_time(pit_id)
+            response['next_cursor'] = None
+        else:
+            response['next_cursor'] = self.encode_cursor(pit_id, hits[-1]['sort'])
         return response
 
+    def get_page_sort(self, index_name: str) -> list:
+        """
+        Get the sort of the paged searches of an index, the tiebreaker is the id field if the index has one.
+
+        :param index_name: The name of the index or alias.
+        :return: The sort of the search request.
+        """
+        tiebreaker = self.get_sortable_field(index_name, ID_FIELD) or '_id'
+        return [{'_score': 'desc'}, {tiebreaker: 'asc'}]
+
+    def open_point_in_time(self, index_name: str) -> str:
+        """
+        Opens a point in time of an index, searches in it see the documents of the moment it was opened.
+
+        :param index_name: The name of the index or alias.
+        :return: The id of the point in time.
+        """
+        response = self._client.create_point_in_time(index=index_name, params={'keep_alive': PIT_KEEP_ALIVE})
+        return response['pit_id']
+
+    def close_point_in_time(self, pit_id: str):
+        """
+        Closes a point in time, so the cluster can release the segments it keeps.
+
+        :param pit_id: The id of the point in time.
+        """
+        try:
+            self._client.delete_point_in_time(body={'pit_id': [pit_id]})
+        except NotFoundError:
+            pass  # the point in time already expired
+
+    @staticmethod
+    def encode_cursor(pit_id: any, search_after: list) -> str:
+        """
+        Encodes the position of a paged search into an opaque cursor.
+
+        :param pit_id: The id of the point in time.
+        :param search_after: The sort values of the last hit of the page.
+        :return: The URL-safe cursor.
+        """
+        state = json.dumps({'pit': pit_id, 'after': search_after}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(state.encode('utf-8')).decode('ascii')
+
     @staticmethod
-    def _get_query(sub_queries: list[tuple], search_size) -> dict:
+    def decode_cursor(cursor: any) -> any:
         """
-        Function that creates a query that can be used to search in OpenSearch.
+        Decodes a cursor created by encode_cursor.
+
+        :param cursor: The cursor.
+        :return: A dictionary containing the id of the point in time ('pit') and the sort values of the last hit
+                 ('after'), or None if there is no valid cursor.
+        """
+        if not cursor:
+            return None
+        try:
+            state = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except ValueError:
+            return None
+        return state if isinstance(state, dict) and isinstance(state.get('after'), list) else None
+
+    @staticmethod
+    def _get_query(sub_queries: list[tuple], search_size) -> any:
+        """
+        Function that compiles the subqueries into a query that can be used to search in OpenSearch.
+        Clauses in filter and must_not context do not influence the score, so their boost is removed and
+        OpenSearch can cache them. Duplicate clauses are removed, the ranges of a field are combined into one
+        range, and contradictory clauses are detected.
 
         :param sub_queries: A list of tuples that contains the subquery and either
-        the value 'must' or 'must_not'.
-        :return: Returns a query that can be used to search in OpenSearch.
+        the value 'must', 'filter' or 'must_not'.
+        :return: Returns a query that can be used to search in OpenSearch, or None if no document can match
+        the subqueries.
         """
+        clauses = {'must': [], 'filter': [], 'must_not': []}
+        for sub_query, functionality in sub_queries:
+            if functionality != 'must':
+                sub_query = OpenSearchManager._without_boost(sub_query)
+            if sub_query not in clauses[functionality]:
+                clauses[functionality].append(sub_query)
+
+        clauses['filter'] = OpenSearchManager._merge_ranges(clauses['filter'])
+        if clauses['filter'] is None or OpenSearchManager._is_contradictory(clauses):
+            return None
+
         # The default size is 10, now it goes to 100 for example!
         query = {'size': search_size, 'query': {'bool': {}}}
-        for sub_query, functionality in sub_queries:
-            if functionality not in query['query']['bool']:
-                query['query']['bool'][functionality] = [sub_query]
-            else:
-                query['query']['bool'][functionality].append(sub_query)
+        for functionality, functionality_clauses in clauses.items():
+            if functionality_clauses:
+                query['query']['bool'][functionality] = functionality_clauses
         return query
 
     @staticmethod
-    def _get_sub_query(data_type: str, operator: str, search_field: str, weight: str, search_content: any) -> tuple:
+    def _without_boost(sub_query: dict) -> dict:
+        """
+        Removes the boost of a subquery, e.g. {'term': {'FileSize': {'value': 5, 'boost': 1}}}
+        --> {'term': {'FileSize': {'value': 5}}}.
+
+        :param sub_query: The subquery.
+        :return: A copy of the subquery without boost.
+        """
+        (query_type, body), = sub_query.items()
+        return {query_type: {key: {name: value for name, value in parameters.items() if name != 'boost'}
+                             if isinstance(parameters, dict) else parameters
+                             for key, parameters in body.items() if key != 'boost'}}
+
+    @staticmethod
+    def _merge_ranges(filter_clauses: list[dict]) -> any:
+        """
+        Combines the range clauses of each field into a single range clause with the narrowest bounds.
+
+        :param filter_clauses: The clauses in filter context.
+        :return: The clauses with one range per field, or None if the bounds of a field exclude each other.
+        """
+        merged = []
+        ranges = {}  # field name -> bounds of the merged range clause
+        for clause in filter_clauses:
+            if 'range' not in clause:
+                merged.append(clause)
+                continue
+            (field_name, bounds), = clause['range'].items()
+            if field_name not in ranges:
+                ranges[field_name] = dict(bounds)
+                merged.append({'range': {field_name: ranges[field_name]}})
+                continue
+            field_bounds = ranges[field_name]
+            for operator, value in bounds.items():
+                if operator in LOWER_BOUNDS:
+                    OpenSearchManager._narrow_bound(field_bounds, operator, value, LOWER_BOUNDS, 1)
+                elif operator in UPPER_BOUNDS:
+                    OpenSearchManager._narrow_bound(field_bounds, operator, value, UPPER_BOUNDS, -1)
+                else:
+                    field_bounds[operator] = value
+
+        for field_bounds in ranges.values():
+            lower = next((operator for operator in LOWER_BOUNDS if operator in field_bounds), None)
+            upper = next((operator for operator in UPPER_BOUNDS if operator in field_bounds), None)
+            if lower is None or upper is None:
+                continue
+            comparison = OpenSearchManager._compare(field_bounds[lower], field_bounds[upper])
+            if comparison is not None and (comparison > 0 or (comparison == 0 and (lower == 'gt' or upper == 'lt'))):
+                return None
+        return merged
+
+    @staticmethod
+    def _narrow_bound(field_bounds: dict, operator: str, value: any, operators: tuple, direction: int):
+        """
+        Replaces the lower (or upper) bound of a range with the given bound if it is narrower.
+
+        :param field_bounds: The bounds of the range, they are modified.
+        :param operator: The operator of the new bound, e.g. 'gt'.
+        :param value: The value of the new bound.
+        :param operators: The exclusive and the inclusive operator of the bound, e.g. ('gt', 'gte').
+        :param direction: 1 for lower bounds (greater values are narrower), -1 for upper bounds.
+        """
+        exclusive, inclusive = operators
+        current_operator = exclusive if exclusive in field_bounds else inclusive if inclusive in field_bounds else None
+        if current_operator is None:
+            field_bounds[operator] = value
+            return
+        current_value = field_bounds[current_operator]
+        comparison = OpenSearchManager._compare(value, current_value)
+        if comparison is None:
+            field_bounds[operator] = value  # values that can not be compared are sent to OpenSearch unchanged
+            return
+        if comparison * direction < 0 or (comparison == 0 and current_operator == exclusive):
+            return  # the current bound is narrower
+        del field_bounds[current_operator]
+        field_bounds[operator] = value
+
+    @staticmethod
+    def _compare(first: any, second: any) -> any:
+        """
+        Compares two values of a range or term clause.
+
+        :param first: The first value.
+        :param second: The second value.
+        :return: A negative number if the first value is smaller, 0 if both are equal, a positive number if the
+        first value is greater, or None if the values can not be compared (e.g. dates in different formats).
+        """
+        try:
+            first, second = float(first), float(second)
+        except (TypeError, ValueError):
+            if not isinstance(first, str) or not isinstance(second, str) or len(first) != len(second):
+                return None
+        return (first > second) - (first < second)
+
+    @staticmethod
+    def _in_range(value: any, bounds: dict) -> bool:
+        """
+        Checks if a value can be within the bounds of a range.
+
+        :param value: The value.
+        :param bounds: The bounds of the range, e.g. {'gt': 5, 'lte': 10}.
+        :return: False if the value is outside the bounds, True otherwise (also if the values can not be compared).
+        """
+        for operator, bound in bounds.items():
+            comparison = OpenSearchManager._compare(value, bound)
+            if comparison is None:
+                continue
+            if (operator == 'gt' and comparison <= 0) or (operator == 'gte' and comparison < 0) or \
+                    (operator == 'lt' and comparison >= 0) or (operator == 'lte' and comparison > 0):
+                return False
+        return True
+
+    @staticmethod
+    def _is_contradictory(clauses: dict) -> bool:
+        """
+        Checks if the clauses of a query exclude each other, e.g. a field that has to exist and must not exist,
+        a field that has to be equal to two different values, or an equal value outside the range of the field.
+
+        :param clauses: A dictionary containing the clauses of 'must', 'filter' and 'must_not'.
+        :return: True if no document can match the clauses, False otherwise.
+        """
+        required = clauses['must'] + clauses['filter']
+        if any(OpenSearchManager._without_boost(clause) in clauses['must_not'] for clause in required):
+            return True
+
+        # a field that must not exist can not have a value
+        missing_fields = {clause['exists']['field'] for clause in clauses['must_not'] if 'exists' in clause}
+        for clause in required:
+            (query_type, body), = clause.items()
+            field_name = body['field'] if query_type == 'exists' else next(iter(body))
+            if field_name in missing_fields:
+                return True
+
+        # the metadata tags have a single value, so it can not be equal to two values or lie outside its range
+        terms = {}
+        ranges = {}
+        for clause in clauses['filter']:
+            if 'term' in clause:
+                (field_name, parameters), = clause['term'].items()
+                terms.setdefault(field_name, []).append(parameters.get('value'))
+            elif 'range' in clause:
+                (field_name, bounds), = clause['range'].items()
+                ranges[field_name] = bounds
+        for field_name, values in terms.items():
+            if any(OpenSearchManager._compare(value, values[0]) not in (0, None) for value in values[1:]):
+                return True
+            if field_name in ranges and not all(OpenSearchManager._in_range(value, ranges[field_name])
+                                                for value in values):
+                return True
+        return False
+
+    @staticmethod
+    def _get_sub_query(data_type: str, operator: str, search_field: str, weight: str, search_content: any,
+                       ngram_field: str = None, keyword_field: str = None) -> tuple:
         """Returns a subquery that can be used to create a complete query.
 
           Args:
@@ -406,37 +1544,63 @@ class OpenSearchManager:
               operator (str): The operator of the query.
               search_field (str): The field in which the search should be performed in this subquery.
               search_content (any): The content of the search.
+              ngram_field (str): The trigram sub-field of a text field, it is used for substring searches
+                  (default = None --> wildcard query).
+              keyword_field (str): The keyword sub-field of a text field, it is used for exact matches
+                  (default = None --> wildcard query).
 
           Returns:
-              tuple: A tuple consisting of a subquery and the value 'must' or 'must_not'.
+              tuple: A tuple consisting of a subquery and the value 'must', 'filter' or 'must_not'. Only criteria
+                  with a weight other than the default weight are scored ('must'), the others are executed in
+                  filter context.
 
           """
+        weighted = weight is not None and str(weight) != '' and float(weight) != DEFAULT_WEIGHT
+        positive = 'must' if weighted else 'filter'
         if operator == Operator.TAG_EXISTS.value or operator == Operator.FIELD_IS_NOT_EMPTY.value:
-            return {'exists': {'field': search_field, 'boost': weight}}, 'must'
+            return {'exists': {'field': search_field, 'boost': weight}}, positive
         elif operator == Operator.TAG_NOT_EXISTS.value or operator == Operator.FIELD_IS_EMPTY.value:
             return {'exists': {'field': search_field, 'boost': weight}}, 'must_not'
-        elif data_type == 'float' or data_type == 'date':
+        elif data_type in NUMERIC_TYPES or data_type == 'date':
             if operator == Operator.IS_EQUAL.value:
-                return {'term': {search_field: {'value': search_content, 'boost': weight}}}, 'must'
+                return {'term': {search_field: {'value': search_content, 'boost': weight}}}, positive
             elif operator == Operator.IS_GREATER_THAN.value:
-                return {'range': {search_field: {'gt': search_content, 'boost': weight}}}, 'must'
+                return {'range': {search_field: {'gt': search_content, 'boost': weight}}}, positive
             elif operator == Operator.IS_LESS_THAN.value:
-                return {'range': {search_field: {'lte': search_content, 'boost': weight}}}, 'must'
+                return {'range': {search_field: {'lte': search_content, 'boost': weight}}}, positive
             elif operator == Operator.IS_LESS_THAN_OR_EQUAL.value:
-                return {'range': {search_field: {'lt': search_content, 'boost': weight}}}, 'must'
+                return {'range': {search_field: {'lt': search_content, 'boost': weight}}}, positive
             elif operator == Operator.IS_GREATER_THAN_OR_EQUAL.value:
-                return {'range': {search_field: {'gte': search_content, 'boost': weight}}}, 'must'
+                return {'range': {search_field: {'gte': search_content, 'boost': weight}}}, positive
             elif operator == Operator.IS_NOT_EQUAL.value:
                 return {'term': {search_field: {'value': search_content, 'boost': weight}}}, 'must_not'
             else:
-                return {'term': {search_field: {'value': search_content, 'boost': weight}}}, 'must'
+                return {'term': {search_field: {'value': search_content, 'boost': weight}}}, positive
         elif data_type == 'text':
+            if operator in (Operator.IS_EQUAL.value, Operator.IS_NOT_EQUAL.value):
+                if keyword_field is not None:
+                    sub_query = {'term': {keyword_field: {'value': search_content, 'boost': weight}}}
+                else:
+                    # long values have no keyword sub-field, the closest match is the phrase of the analyzed value
+                    sub_query = {'match_phrase': {search_field: {'query': search_content, 'boost': weight}}}
+                return sub_query, 'must_not' if operator == Operator.IS_NOT_EQUAL.value else positive
+            if ngram_field is not None and len(search_content) >= NGRAM_SIZE and \
+                    operator in (Operator.CONTAINS.value, Operator.NOT_CONTAINS.value):
+                # the trigrams of the search content have to occur in a row, like the substring itself
+                sub_query = {'match_phrase': {ngram_field: {'query': search_content, 'boost': weight}}}
+                return sub_query, 'must_not' if operator == Operator.NOT_CONTAINS.value else positive
             if operator == Operator.CONTAINS.value:
-                return {"wildcard": {search_field: {"value": "*" + search_content + "*", 'boost': weight}}}, 'must'
+                return {"wildcard": {search_field: {"value": "*" + search_content + "*", 'boost': weight}}}, positive
             elif operator == Operator.NOT_CONTAINS.value:
                 return {"wildcard": {search_field: {"value": "*" + search_content + "*", 'boost': weight}}}, 'must_not'
             else:
-                return {"wildcard": {search_field: {"value": "*" + search_content + "*", 'boost': weight}}}, 'must'
+                return {"wildcard": {search_field: {"value": "*" + search_content + "*", 'boost': weight}}}, positive
+        elif data_type == LONG_TAIL_DATATYPE:
+            functionality = 'must_not' if operator in (Operator.IS_NOT_EQUAL.value, Operator.NOT_CONTAINS.value) \
+                else positive
+            if operator in (Operator.IS_EQUAL.value, Operator.IS_NOT_EQUAL.value):
+                return {'term': {search_field: {'value': search_content, 'boost': weight}}}, functionality
+            return {"wildcard": {search_field: {"value": "*" + search_content + "*", 'boost': weight}}}, functionality
 
     def get_latest_timestamp(self, index_name) -> any:
         """
@@ -446,7 +1610,7 @@ class OpenSearchManager:
               index_name (str): The name of the index to search for the timestamp.
 
           Returns:
-              str: The timestamp as a string.
+              str: The highest MdHTimestamp of the index as a string, or False if no file is stored.
 
           Raises:
               KeyError: If no data is stored for the specified index.
@@ -456,23 +1620,23 @@ class OpenSearchManager:
           """
 
         query = {
-            "size": 1,
-            "query": {
-                "exists": {
-                    "field": "timestamp"
-                },
-            },
-            "sort": [
-                {
-                    "timestamp": "desc"
+            "size": 0,
+            "aggs": {
+                "latest_timestamp": {
+                    "max": {
+                        "field": "MdHTimestamp",
+                        "format": "yyyy-MM-dd HH:mm:ss"
+                    }
                 }
-            ]
+            }
         }
         try:
             response = self._execute_search_query(query, index_name)
 
-            mdh_timestamp = response['hits']['hits'][0]['_source']['timestamp']
-            return mdh_timestamp.replace("T", " ")
+            latest_timestamp = response['aggregations']['latest_timestamp']
+            if latest_timestamp['value'] is None:  # no file with a MdHTimestamp is stored
+                return False
+            return latest_timestamp['value_as_string']
         except KeyError:
             print(f"No data for the index '{index_name}' is stored.")
             return False
@@ -484,6 +1648,86 @@ class OpenSearchManager:
         except RequestError:
             return False
 
+    def get_sync_state(self, index_name: str, file_type: str) -> any:
+        """
+        Retrieves the synchronisation state (high-watermark) of a file type that was stored by the last import.
+
+        Args:
+            index_name (str): The name of the index the files are imported into.
+            file_type (str): The file type (an empty string for all file types).
+
+        Returns:
+            dict: The stored sync state, or None if no state is stored.
+        """
+        try:
+            response = self._client.get(index=self.resolve_index(index_name) + SYNC_STATE_SUFFIX,
+                                        id=file_type or '_all_file_types')
+            return response['_source']
+        except NotFoundError:
+            return None
+
+    def has_sync_state(self, index_name: str) -> bool:
+        """
+        Checks if the sync state of any file type is stored, it is not stored for indices that were imported by older
+        versions.
+
+        Args:
+            index_name (str): The name of the index the files are imported into.
+
+        Returns:
+            bool: True if a sync state is stored, False otherwise.
+        """
+        query = {'query': {'bool': {'must_not': [{'ids': {'values': [GENERATION_ID]}}]}}}
+        try:
+            response = self._client.count(index=self.resolve_index(index_name) + SYNC_STATE_SUFFIX, body=query)
+            return response['count'] > 0
+        except NotFoundError:
+            return False
+
+    def update_sync_state(self, index_name: str, file_type: str, sync_state: dict):
+        """
+        Stores the synchronisation state (high-watermark) of a file type in the small sync state index.
+
+        Args:
+            index_name (str): The name of the index the files are imported into.
+            file_type (str): The file type (an empty string for all file types).
+            sync_state (dict): The sync state to be stored.
+        """
+        index_name = self.resolve_index(index_name)  # the sync state belongs to the physical index behind an alias
+        body = dict(sync_state, index_name=index_name, file_type=file_type)
+        self._client.index(index=index_name + SYNC_STATE_SUFFIX, id=file_type or '_all_file_types', body=body,
+                           refresh=True)
+
+    def get_index_generation(self, index_name: str) -> tuple:
+        """
+        Get the generation of an index, it changes whenever an import changed the index or the alias was swapped
+        to another index.
+
+        Args:
+            index_name (str): The name of the index or alias.
+
+        Returns:
+            tuple: The name of the physical index and the amount of imports that changed it.
+        """
+        physical_index = self.resolve_index(index_name)
+        try:
+            response = self._client.get(index=physical_index + SYNC_STATE_SUFFIX, id=GENERATION_ID)
+            return physical_index, response['_source'].get('generation', 0)
+        except NotFoundError:
+            return physical_index, 0
+
+    def bump_index_generation(self, index_name: str):
+        """
+        Increments the generation of an index after an import changed it, so caches of its search results are
+        invalidated.
+
+        Args:
+            index_name (str): The name of the index or alias the files were imported into.
+        """
+        body = {'script': {'source': 'ctx._source.generation += 1', 'lang': 'painless'}, 'upsert': {'generation': 1}}
+        self._client.update(index=self.resolve_index(index_name) + SYNC_STATE_SUFFIX, id=GENERATION_ID, body=body,
+                            refresh=True, retry_on_conflict=3)
+
     def get_last_import(self, index_name):
         """
         Retrieves the information of the last import from the specified index.
@@ -500,20 +1744,24 @@ class OpenSearchManager:
             IndexError: If an index error occurs while retrieving the last import.
             RequestError: If a request error occurs while retrieving the last import.
         """
-        query = {
-            "size": 1,
-            "query": {
-                "exists": {
-                    "field": "Version"
-                },
-            },
-            "sort": [
-                {
-                    "Version": "desc"
-                }
-            ]
-        }
         try:
+            # a text field is sorted by its keyword sub-field, it has no doc values itself
+            sort_field = self.get_sortable_field(index_name, "Version")
+            if sort_field is None:
+                return False
+            query = {
+                "size": 1,
+                "query": {
+                    "exists": {
+                        "field": "Version"
+                    },
+                },
+                "sort": [
+                    {
+                        sort_field: "desc"
+                    }
+                ]
+            }
             response = self._execute_search_query(query, index_name)
 
             last_import = response['hits']['hits'][0]['_source']
@@ -0,0 +1,121 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class SearchCache:
+    """
+    LRU cache of search responses in front of the OpenSearchManager. The index only changes when an import runs,
+    so the cached responses stay valid until the generation of the index changes. The generation (the physical
+    index behind the alias and a counter bumped by the import) is checked at most every few seconds, a new
+    generation clears the cache. Identical searches that run at the same time are sent to OpenSearch only once,
+    the other requests wait for its response.
+    """
+
+    def __init__(self, get_generation, max_entries: int = 256, check_seconds: float = 5):
+        """
+        Creates a new search cache.
+
+        :param get_generation: Function without parameters that returns the current generation of the index.
+        :param max_entries: Maximum amount of cached responses, the least recently used ones are evicted
+                            (default = 256, 0 --> nothing is cached, but identical searches are still combined).
+        :param check_seconds: Seconds between two checks of the generation (default = 5).
+        """
+        self._get_generation = get_generation
+        self.max_entries = max_entries
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> response, ordered from the least to the most recently used
+        self._pending = {}  # key -> future of the search that is currently running
+        self._generation = None
+        self._next_check = 0
+        self.statistics = {'hits': 0, 'misses': 0, 'coalesced': 0}
+
+    @staticmethod
+    def get_key(search_type: str, index_name: str, page: int, page_size: int, **parameters) -> str:
+        """
+        Get the cache key of a search, equal searches get the same key regardless of the order of their parameters.
+
+        :param search_type: The type of the search, e.g. 'simple' or 'advanced'.
+        :param index_name: The name of the index that is searched.
+        :param page: The page number of the search results.
+        :param page_size: The number of search results per page.
+        :param parameters: The other parameters of the search, e.g. the search text.
+        :return: The normalized key.
+        """
+        return json.dumps([search_type, index_name, int(page), int(page_size), parameters], sort_keys=True,
+                          default=str)
+
+    def get(self, key: str, search) -> any:
+        """
+        Get the response of a search from the cache, or execute the search and cache its response.
+        The returned response is shared by all callers and must not be modified. While the generation of the index
+        is unknown (e.g. OpenSearch was not reachable), the cache is bypassed.
+
+        :param key: The key of the search, see get_key.
+        :param search: Function without parameters that executes the search.
+        :return: The response of the search.
+        """
+        self._check_generation()
+        with self._lock:
+            generation = self._generation
+        if generation is None:
+            return search()  # it is unknown whether the cached responses are still valid
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.statistics['hits'] += 1
+                return self._entries[key]
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+                self.statistics['misses'] += 1
+            else:
+                self.statistics['coalesced'] += 1
+        if not owner:
+            return future.result()  # the same search is already running
+
+        try:
+            response = search()
+        except Exception as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._pending[key]
+            # the response of a search that ran while the generation changed may be outdated
+            if self.max_entries > 0 and generation == self._generation:
+                self._entries[key] = response
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        future.set_result(response)
+        return response
+
+    def _check_generation(self):
+        """ Clears the cache if the generation of the index changed, the generation is checked at most every
+        check_seconds """
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.check_seconds  # the other requests keep using the cache meanwhile
+        try:
+            generation = self._get_generation()
+        except Exception as e:
+            print(f"Error occurred while checking the generation of the index: {str(e)}")
+            generation = None  # the state of the index is unknown, so the cache is bypassed until the next check
+        with self._lock:
+            if generation != self._generation or generation is None:
+                self._entries.clear()
+                self._generation = generation
+
+    def clear(self):
+        """ Removes all cached responses """
+        with self._lock:
+            self._entries.clear()
+            self._next_check = 0
@@ -0,0 +1,70 @@
+# Smallest batch a page is split into to keep the parallel bulk workers busy, smaller requests cost more than they gain
+MIN_PARALLEL_DOCUMENTS = 100
+
+
+class AdaptiveBulkBatcher:
+    """
+    Splits documents into batches for the bulk API that are limited by the amount of documents and by the
+    size of the encoded request. The size limit adapts to the cluster: if a request was rejected as too large
+    (and therefore had to be split), the limit is halved, after accepted requests it grows back towards
+    the target size.
+    """
+
+    def __init__(self, entry_size, max_documents: int = 1000, target_bytes: int = 5 * 1024 * 1024,
+                 min_bytes: int = 64 * 1024):
+        """
+        Creates a new batcher.
+
+        :param entry_size: Function returning the amount of bytes a (document, id) tuple takes in a bulk request.
+        :param max_documents: Maximum amount of documents in a single batch (default = 1000).
+        :param target_bytes: Size of a bulk request in bytes the batches should get close to (default = 5 MB).
+        :param min_bytes: Lower bound the size limit can not fall below after rejected requests (default = 64 KB).
+        """
+        self._entry_size = entry_size
+        self.max_documents = max_documents
+        self.target_bytes = target_bytes
+        self.min_bytes = min(min_bytes, target_bytes)
+        self.byte_limit = target_bytes  # current size limit of a batch
+
+    def batches(self, data: list[(dict, id)], parallel: int = 1):
+        """
+        Splits the data into batches. A batch is closed as soon as it reaches the maximum amount of documents
+        or the next document would exceed the current size limit. A single document that is larger than the
+        limit is sent in a batch of its own.
+
+        :param data: A list of tuples containing a document and its id.
+        :param parallel: Amount of batches that are sent at the same time. The data is spread over at least this
+                         many batches (of at least MIN_PARALLEL_DOCUMENTS documents), so a page that fits into a
+                         single request still keeps all workers busy (default = 1).
+        :return: A generator yielding the batches as lists of tuples containing a document and its id.
+        """
+        max_documents = self.max_documents
+        if parallel > 1:
+            max_documents = min(max_documents, max(MIN_PARALLEL_DOCUMENTS, -(-len(data) // parallel)))
+        batch = []
+        batch_bytes = 0
+        for entry in data:
+            entry_bytes = self._entry_size(entry)
+            if batch and (len(batch) >= max_documents or batch_bytes + entry_bytes > self.byte_limit):
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append(entry)
+            batch_bytes += entry_bytes
+        if batch:
+            yield batch
+
+    def record_response(self, response: dict):
+        """
+        Adapts the size limit according to the response of a bulk request.
+
+        :param response: The response of a bulk request sent with one of the batches.
+        """
+        if response is None:
+            return
+        if response.get('split_requests', 0) > 0:
+            # the request was too large for the cluster, so shrink the following batches quickly
+            self.byte_limit = max(self.min_bytes, self.byte_limit // 2)
+        elif self.byte_limit < self.target_bytes:
+            # grow back slowly towards the target size
+            self.byte_limit = min(self.target_bytes, self.byte_limit + self.target_bytes // 8)
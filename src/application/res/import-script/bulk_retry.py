@@ -0,0 +1,292 @@
+import json
+import os
+import random
+import time
+
+from backend.bulk_serializer import encode_document
+
+# Errors that are caused by an overloaded or temporarily unavailable cluster, the request can succeed later
+RETRYABLE_ERRORS = {
+    'es_rejected_execution_exception',
+    'rejected_execution_exception',
+    'timeout_exception',
+    'process_cluster_event_timeout_exception',
+    'receive_timeout_transport_exception',
+    'unavailable_shards_exception',
+    'node_not_connected_exception',
+    'no_shard_available_action_exception',
+    'circuit_breaking_exception',
+    'cluster_block_exception',
+}
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+# Errors that mean the document already exists, they are not treated as failures
+IGNORED_ERRORS = {
+    'version_conflict_engine_exception',
+}
+
+IGNORED = 'ignored'
+RETRYABLE = 'retryable'
+PERMANENT = 'permanent'
+
+
+def classify_error(result: dict) -> str:
+    """
+    Classifies the error of a single item of a bulk response.
+
+    :param result: The result of the item, e.g. response['items'][0]['create'].
+    :return: 'ignored' if the document already exists, 'retryable' if the error is temporary,
+             'permanent' if resending the document can not succeed (e.g. mapping errors).
+    """
+    error_type = result['error'].get('type') if isinstance(result['error'], dict) else str(result['error'])
+    status = result.get('status')
+    if error_type in IGNORED_ERRORS:
+        return IGNORED
+    if error_type in RETRYABLE_ERRORS or status in RETRYABLE_STATUS:
+        return RETRYABLE
+    return PERMANENT
+
+
+def get_updated_ids(response: dict, chunk_data: list) -> list:
+    """
+    Get the ids of the documents that replaced an existing document (op_type 'index').
+
+    :param response: The bulk response.
+    :param chunk_data: The (document, id) tuples that were sent with the request, in the order of the items.
+    :return: The ids of the updated documents.
+    """
+    if not response:
+        return []
+    return [entry[1] for item, entry in zip(response['items'], chunk_data)
+            if next(iter(item.values())).get('result') == 'updated']
+
+
+class DeadLetterFile:
+    """
+    NDJSON file containing the documents that could not be imported, so they can be replayed by a later import.
+    Each line contains the index, the id, the error and the document itself.
+    """
+
+    def __init__(self, path: str):
+        """
+        Creates a new dead-letter file handler.
+
+        :param path: The path of the NDJSON file.
+        """
+        self.path = path
+
+    def write(self, index_name: str, entries: list[tuple[any, id, dict]]):
+        """
+        Appends failed documents to the file.
+
+        :param index_name: The name of the index the documents belong to.
+        :param entries: A list of tuples containing the document (dictionary or serialized bytes),
+                        its id and the error returned by OpenSearch.
+        """
+        if not entries:
+            return
+        with open(self.path, 'ab') as dead_letter_file:
+            for doc, id, error in entries:
+                if not isinstance(doc, bytes):
+                    doc = encode_document(doc)
+                header = encode_document({'_index': index_name, '_id': id, 'error': error})
+                # insert the serialized document into the header object without parsing it again
+                dead_letter_file.write(header[:-1] + b',"document":' + doc + b'}\n')
+
+    def read(self, index_name: str) -> tuple[list[(bytes, id)], list[bytes]]:
+        """
+        Reads the documents of an index from the file.
+
+        :param index_name: The name of the index.
+        :return: A tuple containing the documents of the index (serialized) with their ids,
+                 and the lines of all other indices.
+        """
+        documents = []
+        other_lines = []
+        try:
+            with open(self.path, 'rb') as dead_letter_file:
+                for line in dead_letter_file:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if entry.get('_index') == index_name:
+                        documents.append((encode_document(entry['document']), entry['_id']))
+                    else:
+                        other_lines.append(line)
+        except FileNotFoundError:
+            pass
+        return documents, other_lines
+
+    def get_size(self) -> int:
+        """
+        Get the size of the file, the lines appended afterwards can be read with read_lines.
+
+        :return: The size of the file in bytes, 0 if it does not exist.
+        """
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def read_lines(self, offset: int = 0) -> list[bytes]:
+        """
+        Reads the lines of the file starting at an offset.
+
+        :param offset: The position in bytes the lines are read from (default = 0).
+        :return: The NDJSON lines.
+        """
+        try:
+            with open(self.path, 'rb') as dead_letter_file:
+                dead_letter_file.seek(offset)
+                return [line for line in dead_letter_file if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def replace(self, lines: list[bytes]):
+        """
+        Replaces the content of the file with the given lines, the file is removed if no lines are left.
+
+        :param lines: The NDJSON lines to be kept.
+        """
+        if not lines:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'wb') as dead_letter_file:
+            dead_letter_file.writelines(lines)
+        os.replace(temporary_path, self.path)
+
+
+class BulkRetryHandler:
+    """
+    Retries the failed items of bulk requests. Temporary errors are resent in batches with exponential backoff
+    and jitter, documents with permanent errors (or that still fail after the last attempt) are written to a
+    dead-letter file.
+    """
+
+    def __init__(self, os_manager, index_name: str, dead_letter_file: DeadLetterFile, max_attempts: int = 3,
+                 backoff_seconds: float = 1.0, batch_size: int = 1000, op_type: str = 'create'):
+        """
+        Creates a new retry handler.
+
+        :param os_manager: Manager to handle the OpenSearch API.
+        :param index_name: Name of the index the documents are imported into.
+        :param dead_letter_file: File the permanently failed documents are written to.
+        :param max_attempts: Maximum amount of resends of a document (default = 3).
+        :param backoff_seconds: Base of the exponential backoff before each resend (default = 1 second).
+        :param batch_size: Maximum amount of documents resent with a single bulk request (default = 1000).
+        :param op_type: The bulk operation used for resending the documents (default = 'create').
+        """
+        self.os_manager = os_manager
+        self.index_name = index_name
+        self.dead_letter_file = dead_letter_file
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.batch_size = batch_size
+        self.op_type = op_type
+        self.statistics = {'retried': 0, 'dead_lettered': 0, 'ignored': 0}
+        self.updated_ids = set()  # ids of the resent documents that replaced an existing document
+
+    def handle(self, failed_imports: list[tuple[dict, list]]) -> set:
+        """
+        Handles the failed items of bulk requests.
+
+        :param failed_imports: A list of tuples containing a bulk response with errors and the
+                               (document, id) tuples that were sent with the request.
+        :return: The ids of the documents that were not indexed, because they already existed or were written to
+                 the dead-letter file.
+        """
+        pending = []  # (document, id) of the documents that will be resent, ids can be missing or repeated
+        rejected_ids = set()
+        for response, chunk_data in failed_imports:
+            self._collect(response, chunk_data, pending, rejected_ids)
+
+        attempt = 0
+        while pending and attempt < self.max_attempts:
+            self._wait(attempt)
+            attempt += 1
+            retry_data = pending
+            pending = []
+            for i in range(0, len(retry_data), self.batch_size):
+                chunk_data = retry_data[i:i + self.batch_size]
+                response = self.os_manager.perform_bulk(index_name=self.index_name, data=chunk_data,
+                                                       op_type=self.op_type)
+                self.statistics['retried'] += len(chunk_data)
+                self.updated_ids.update(get_updated_ids(response, chunk_data))
+                self._collect(response, chunk_data, pending, rejected_ids)
+
+        # documents that still fail after the last attempt are treated as permanently failed
+        self._dead_letter([(doc, id, {'type': 'retries_exhausted'}) for doc, id in pending])
+        rejected_ids.update(id for _, id in pending)
+        return rejected_ids
+
+    def _collect(self, response: dict, chunk_data: list, pending: list, rejected_ids: set):
+        """
+        Sorts the failed items of a bulk response into documents to be resent and permanently failed documents.
+
+        :param response: The bulk response.
+        :param chunk_data: The (document, id) tuples that were sent with the request, in the order of the items.
+        :param pending: List the (document, id) tuples to be resent are added to.
+        :param rejected_ids: Set the ids of the documents that are not indexed are added to.
+        """
+        if not response or not response.get('errors'):
+            return
+        dead_letters = []
+        # the items of a bulk response have the same order as the documents of the request
+        for item, entry in zip(response['items'], chunk_data):
+            result = next(iter(item.values()))
+            if 'error' not in result:
+                continue
+            classification = classify_error(result)
+            if classification != RETRYABLE:
+                rejected_ids.add(entry[1])
+            if classification == IGNORED:
+                self.statistics['ignored'] += 1
+            elif classification == RETRYABLE:
+                pending.append(entry)
+            else:
+                dead_letters.append((entry[0], entry[1], result['error']))
+        self._dead_letter(dead_letters)
+
+    def _dead_letter(self, entries: list[tuple[any, id, dict]]):
+        """ Writes permanently failed documents to the dead-letter file """
+        self.dead_letter_file.write(self.index_name, entries)
+        self.statistics['dead_lettered'] += len(entries)
+
+    def _wait(self, attempt: int):
+        """ Waits before a resend, using exponential backoff with full jitter """
+        time.sleep(random.uniform(0, self.backoff_seconds * 2 ** attempt))
+
+    def replay_dead_letters(self) -> list[(bytes, id)]:
+        """
+        Resends the documents of this index from the dead-letter file (e.g. after a mapping was fixed).
+        Documents that fail again are written back to the file. The replayed documents are only removed from the
+        file after all of them were handled, so an interrupted replay does not lose them.
+
+        :return: The (document, id) tuples of the documents that were indexed.
+        """
+        replayed_size = self.dead_letter_file.get_size()
+        documents, other_lines = self.dead_letter_file.read(self.index_name)
+        if not documents:
+            return []
+        print(f"Replaying {len(documents)} documents from the dead-letter file '{self.dead_letter_file.path}' ...")
+
+        failed_imports = []
+        for i in range(0, len(documents), self.batch_size):
+            chunk_data = documents[i:i + self.batch_size]
+            response = self.os_manager.perform_bulk(index_name=self.index_name, data=chunk_data,
+                                                       op_type=self.op_type)
+            self.updated_ids.update(get_updated_ids(response, chunk_data))
+            failed_imports.append((response, chunk_data))
+        rejected_ids = self.handle(failed_imports)
+
+        # keep the lines of the other indices and the documents that failed again (appended by handle)
+        self.dead_letter_file.replace(other_lines + self.dead_letter_file.read_lines(offset=replayed_size))
+        return [(doc, id) for doc, id in documents if id not in rejected_ids]
+
+    def print_statistics(self):
+        """ Prints the results of the retries """
+        print(f"--> Resent {self.statistics['retried']} documents, ignored {self.statistics['ignored']} "
+              f"existing documents, {self.statistics['dead_lettered']} documents written to "
+              f"'{self.dead_letter_file.path}'")
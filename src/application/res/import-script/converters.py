@@ -0,0 +1,198 @@
+from collections import Counter
+from datetime import datetime
+
+
+# Days of each month that are valid in every year, February 29 is checked by parsing the value
+MONTH_DAYS = ('31', '28', '31', '30', '31', '30', '31', '31', '30', '31', '30', '31')
+
+
+def convert_date(value: any) -> any:
+    """
+    Converts a MetaDataHub timestamp ('%Y-%m-%d %H:%M:%S') into the format stored in OpenSearch
+    ('%Y-%m-%dT%H:%M:%S'). Well-formed timestamps (digits of a valid date and time) only need the separator to be
+    replaced, other values are parsed.
+
+    :param value: The timestamp from the MetaDataHub.
+    :return: The converted timestamp, or None if the value can not be parsed.
+    """
+    if isinstance(value, str) and len(value) == 19 and value[10] == ' ' and value[4] == '-' \
+            and value[7] == '-' and value[13] == ':' and value[16] == ':' \
+            and value.isascii() \
+            and (value[:4] + value[5:7] + value[8:10] + value[11:13] + value[14:16] + value[17:]).isdigit() \
+            and '01' <= value[5:7] <= '12' and '01' <= value[8:10] <= MONTH_DAYS[int(value[5:7]) - 1] \
+            and value[11:13] <= '23' and value[14:16] <= '59' and value[17:] <= '59':
+        return value[:10] + 'T' + value[11:]
+    try:
+        return datetime.strptime(str(value), "%Y-%m-%d %H:%M:%S").strftime("%Y-%m-%dT%H:%M:%S")
+    except ValueError:
+        return None
+
+
+def convert_float(value: any) -> any:
+    """
+    Converts a numeric MetaDataHub value into a float.
+
+    :param value: The value from the MetaDataHub.
+    :return: The value as float, or None if the value is not a number.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def convert_integer(value: any) -> any:
+    """
+    Converts a numeric MetaDataHub value into an integer. Integers are parsed exactly, so large values
+    (e.g. file sizes above 2^53) keep their precision. Values with decimal places are not cut off, they are
+    skipped and counted as failed values, e.g. if later files have decimals the sample for the type inference missed.
+
+    :param value: The value from the MetaDataHub.
+    :return: The value as integer, or None if the value is not an integral number.
+    """
+    if not isinstance(value, float):  # int() would cut off the decimal places of a float
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            pass
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(number) if number.is_integer() else None
+
+
+def convert_text(value: any) -> str:
+    """
+    Converts a MetaDataHub value into a string.
+
+    :param value: The value from the MetaDataHub.
+    :return: The value as string.
+    """
+    return str(value)
+
+
+# Field that stores the values of the rarely used tags (the long tail) in a single flat_object field
+LONG_TAIL_FIELD = 'other_tags'
+
+# Converter functions for each OpenSearch datatype, all other datatypes are stored as text
+CONVERTERS = {
+    'date': convert_date,
+    'float': convert_float,
+    'double': convert_float,
+    'half_float': convert_float,
+    'scaled_float': convert_float,
+    'long': convert_integer,
+    'integer': convert_integer,
+    'short': convert_integer,
+    'byte': convert_integer,
+}
+
+
+class ConverterTable:
+    """
+    Precompiled table mapping the raw MetaDataHub tag names to their OpenSearch field names and converter functions.
+    The table is built once from the metadata tags, so converting a value needs a single dictionary lookup.
+    """
+
+    def __init__(self, metadata_tags: dict, long_tail_tags: list = None):
+        """
+        Creates a new converter table.
+
+        :param metadata_tags: A dictionary containing the OpenSearch datatypes of the metadata tags.
+        :param long_tail_tags: Tags that have no field of their own, their values are stored as text in the
+                               flat_object field 'other_tags' (default = None --> every tag has its own field).
+        """
+        self.metadata_tags = metadata_tags
+        self.long_tail_tags = list(long_tail_tags or [])
+        self._long_tail_tags = set(self.long_tail_tags)
+        self._table = {}  # raw tag name -> (field name, converter function, is a long tail tag)
+        self.failed_values = Counter()  # amount of values that could not be converted per field
+        for field_name in metadata_tags:
+            self._add(field_name, field_name)
+        for field_name in self.long_tail_tags:
+            self._add(field_name, field_name)
+
+    def _add(self, raw_name: str, field_name: str) -> any:
+        """
+        Adds an entry for a raw tag name to the table.
+
+        :param raw_name: The name of the tag in the MetaDataHub.
+        :param field_name: The name of the corresponding field in OpenSearch.
+        :return: The new entry, or None if the tag is not stored in OpenSearch.
+        """
+        if field_name in self.metadata_tags:
+            entry = (field_name, CONVERTERS.get(self.metadata_tags[field_name], convert_text), False)
+        elif field_name in self._long_tail_tags:
+            entry = (field_name, convert_text, True)
+        else:
+            entry = None
+        self._table[raw_name] = entry
+        return entry
+
+    def lookup(self, raw_name: str) -> any:
+        """
+        Get the field name and converter function of a raw MetaDataHub tag name.
+
+        :param raw_name: The name of the tag in the MetaDataHub.
+        :return: A tuple of field name, converter function and whether the tag belongs to the long tail,
+                 or None if the tag is not stored in OpenSearch.
+        """
+        try:
+            return self._table[raw_name]
+        except KeyError:
+            # Replace '.' with '_' to avoid parsing errors
+            return self._add(raw_name, str(raw_name).replace(".", "_"))
+
+    def convert_file(self, file_data: dict, current_time: str) -> (dict, id):
+        """
+        Converts the metadata of a single file into a document for OpenSearch.
+
+        :param file_data: A dictionary containing the metadata of a file from a MetaDataHub request.
+        :param current_time: The time of the import, stored in the 'timestamp' field.
+        :return: A tuple containing the document and its id (the value of the 'SourceFile' tag).
+        """
+        table = self._table
+        file_info = {}
+        long_tail_info = {}
+        id = None
+        for meta in file_data.get("metadata", []):
+            raw_name = meta.get("name")
+            entry = table[raw_name] if raw_name in table else self.lookup(raw_name)
+            if entry is None:  # the metadata tag does not exist in OpenSearch
+                continue
+
+            name, converter, long_tail = entry
+            raw_value = meta.get("value")
+            if name == "SourceFile":
+                id = str(raw_value)  # Set the ID to the value of the "SourceFile" tag
+
+            value = converter(raw_value)
+            if value is None and raw_value is not None:
+                self.failed_values[name] += 1
+            elif name and value:  # Check if both the name and value are valid
+                if long_tail:
+                    long_tail_info[name] = value
+                else:
+                    file_info[name] = value
+        if long_tail_info:
+            file_info[LONG_TAIL_FIELD] = long_tail_info
+        file_info['timestamp'] = current_time
+        return file_info, id
+
+    def convert(self, mdh_data: list[dict], current_time: str) -> list[(dict, id)]:
+        """
+        Converts the metadata of multiple files into documents for OpenSearch.
+
+        :param mdh_data: A list of dictionaries containing metadata-tags for each file of a MetaDataHub request.
+        :param current_time: The time of the import, stored in the 'timestamp' field.
+        :return: A list of tuples containing the documents and their ids.
+        """
+        convert_file = self.convert_file
+        return [convert_file(file_data, current_time) for file_data in mdh_data]
+
+    def print_failed_values(self):
+        """ Prints a summary of the values that could not be converted and were therefore skipped """
+        for field_name, amount in self.failed_values.most_common():
+            print(f"--> Skipped {amount} values of '{field_name}' that could not be converted "
+                  f"to '{self.metadata_tags[field_name]}'")
@@ -0,0 +1,126 @@
+import json
+from collections import Counter
+
+from backend.opensearch_api import NUMERIC_TYPES, LONG_TAIL_FIELD, LONG_TAIL_DATATYPE, INTERNAL_FIELDS
+
+TOP_VALUES = 10  # amount of most frequent values stored in the catalog per tag
+MAX_TRACKED_VALUES = 1000  # distinct values counted per tag before the rarest ones are dropped
+MAX_VALUE_LENGTH = 256  # longer values (e.g. descriptions) are not counted as top values
+
+
+class FieldStatistics:
+    """
+    Collects statistics of the metadata tags of the indexed documents: the amount of documents that have a value for
+    a tag, the minimum and maximum of numeric and date tags and the most frequent values of text and keyword tags.
+    The statistics of earlier imports (or of the pages committed before an import was interrupted) are added with
+    merge_catalog.
+    """
+
+    def __init__(self, metadata_tags: dict, long_tail_tags: list = None):
+        """
+        Creates a new, empty statistics collector.
+
+        :param metadata_tags: A dictionary containing the OpenSearch datatypes of the metadata tags.
+        :param long_tail_tags: Tags whose values are stored in the flat_object field (default = None).
+        """
+        self.metadata_tags = metadata_tags
+        self.long_tail_tags = list(long_tail_tags or [])
+        self._datatypes = dict(metadata_tags)
+        for tag in self.long_tail_tags:
+            self._datatypes[f"{LONG_TAIL_FIELD}.{tag}"] = LONG_TAIL_DATATYPE
+        self._fields = {}  # field name -> [document count, minimum, maximum, value counter or None]
+
+    def _get_field(self, field_name: str) -> list:
+        """ Get the statistics of a field, they are created on first use """
+        field = self._fields.get(field_name)
+        if field is None:
+            datatype = self._datatypes.get(field_name)
+            ranged = datatype in NUMERIC_TYPES or datatype == 'date'
+            field = [0, None, None, None if ranged else Counter()]
+            self._fields[field_name] = field
+        return field
+
+    def _add(self, field_name: str, value: any):
+        """ Adds a single value of a field """
+        field = self._get_field(field_name)
+        field[0] += 1
+        if field[3] is None:
+            if field[1] is None or value < field[1]:
+                field[1] = value
+            if field[2] is None or value > field[2]:
+                field[2] = value
+        elif not isinstance(value, str) or len(value) <= MAX_VALUE_LENGTH:
+            field[3][value] += 1
+
+    def add_documents(self, data: list[(any, id)]):
+        """
+        Adds the values of indexed documents.
+
+        :param data: A list of tuples containing a document (dictionary or serialized bytes) and its id.
+        """
+        add = self._add
+        for doc, _ in data:
+            if isinstance(doc, bytes):
+                doc = json.loads(doc)
+            for field_name, value in doc.items():
+                if field_name in INTERNAL_FIELDS:
+                    continue
+                if field_name == LONG_TAIL_FIELD:
+                    for tag, tag_value in value.items():
+                        add(f"{LONG_TAIL_FIELD}.{tag}", tag_value)
+                else:
+                    add(field_name, value)
+        self._prune()
+
+    def _prune(self):
+        """ Drops the rarest values of tags with many distinct values, so the memory of the counters is bounded """
+        for field in self._fields.values():
+            if field[3] is not None and len(field[3]) > MAX_TRACKED_VALUES:
+                field[3] = Counter(dict(field[3].most_common(MAX_TRACKED_VALUES // 2)))
+
+    def merge_catalog(self, catalog: dict):
+        """
+        Adds the statistics stored in the field catalog by earlier imports.
+
+        :param catalog: A dictionary containing the catalog entry of each field.
+        """
+        for field_name, entry in catalog.items():
+            values = Counter({value['value']: value['count'] for value in entry.get('top_values', [])})
+            self._merge_field(field_name, entry.get('doc_count', 0), entry.get('min'), entry.get('max'), values)
+        self._prune()
+
+    def _merge_field(self, field_name: str, count: int, minimum: any, maximum: any, values: Counter):
+        """ Adds the statistics of a single field """
+        field = self._get_field(field_name)
+        field[0] += count
+        if field[3] is None:
+            if minimum is not None and (field[1] is None or minimum < field[1]):
+                field[1] = minimum
+            if maximum is not None and (field[2] is None or maximum > field[2]):
+                field[2] = maximum
+        elif values:
+            field[3].update(values)
+
+    def get_catalog(self, updated: str) -> dict:
+        """
+        Get the catalog entries of all fields that got values.
+
+        :param updated: The time of the import.
+        :return: A dictionary containing the catalog entry of each field.
+        """
+        catalog = {}
+        for field_name, (count, minimum, maximum, values) in self._fields.items():
+            entry = {'field': field_name, 'type': self._datatypes.get(field_name, 'text'), 'doc_count': count,
+                     'updated': updated}
+            if values is None:
+                entry['min'] = minimum
+                entry['max'] = maximum
+            else:
+                entry['top_values'] = [{'value': value, 'count': value_count}
+                                       for value, value_count in values.most_common(TOP_VALUES)]
+            catalog[field_name] = entry
+        return catalog
+
+    def clear(self):
+        """ Removes all collected statistics """
+        self._fields = {}
@@ -1,29 +1,45 @@
 import time
+from contextlib import nullcontext
 from datetime import datetime
-from mdh_api import MetaDataHubManager
 import sys
-from import_control import ImportControl
+import json
 import os
 import configparser
 
 # Get the path to the parent directory
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# Add the parent directory to the sys.path list
+# Add the parent directory to the sys.path list, before the modules below import the backend
 sys.path.append(parent_dir)
+from mdh_api import MetaDataHubManager
+from import_control import ImportControl
+from import_stages import StagedImport
+from bulk_batching import AdaptiveBulkBatcher
+from converters import ConverterTable
+from transform_pool import TransformPool
+from bulk_retry import BulkRetryHandler, DeadLetterFile, get_updated_ids
+from utils import ImportCheckpoint
+from sync_state import SyncWatermark
+from type_inference import infer_numeric_types
+from field_catalog import FieldStatistics
 from backend.opensearch_api import OpenSearchManager
 from backend.configuration import get_config_values
+from backend.bulk_serializer import get_content_hash
 
+# Tags that always get fields of their own, they identify the files and are shown in the search results
+REQUIRED_TAGS = ['SourceFile', 'FileName', 'FileSize', 'FileType', 'FileInodeChangeDate', 'MdHTimestamp']
 
-def create_managers(localhost: bool = False):
+
+def create_managers(localhost: bool = False, bulk_workers: int = 1):
     """ This function creates the managers to handle the APIs to the MetaDataHub and the OpenSearch Node
 
     :param localhost: Boolean value that defines if the connection is local or on a Docker container (for testing).
+    :param bulk_workers: Amount of bulk requests that will be sent in parallel, the connection pool is sized accordingly.
     :return: Tuple containing MetaDataHubManager and OpenSearchManager objects.
     """
 
     mdh_manager = MetaDataHubManager(localhost=localhost)  # Create MetaDataHubManager instance
-    os_manager = OpenSearchManager(localhost=localhost)
+    os_manager = OpenSearchManager(localhost=localhost, pool_size=max(10, bulk_workers))
     return mdh_manager, os_manager
 
 
@@ -68,6 +84,25 @@ def extract_data_from_mdh(mdh_manager: MetaDataHubManager, latest_timestamp: str
     return mdh_data, files_amount
 
 
+def extract_data_pages_from_mdh(mdh_manager: MetaDataHubManager, latest_timestamp: str = False, page_size: int = 1000,
+                                limit: int = False, offset: int = 0, selected_tags: list = None,
+                                file_type: str = False):
+    """
+    Extract data from the MetaDataHub page by page, so only a single page is kept in memory at once.
+
+    :param mdh_manager: Manager to handle the MetaDataHub API.
+    :param latest_timestamp: Timestamp of the last executed import.
+    :param page_size: Amount of files that will be downloaded with a single request (default = 1000)
+    :param limit: Limit of files that will be downloaded from the MetaDataHub (default = False --> no limit)
+    :param offset: Amount of files that are skipped, e.g. because they were imported before an interruption
+                   (default = 0)
+    :return: A generator yielding a list of dictionaries containing all the metadata tags and their values
+             for each file of a page.
+    """
+    yield from mdh_manager.download_data_pages(timestamp=latest_timestamp, page_size=page_size, limit=limit,
+                                               offset=offset, selected_tags=selected_tags, file_type=file_type)
+
+
 def modify_metadata_tags(mdh_tags: list) -> dict:
     """
     Modify the mdh_datatypes dictionary for storage in OpenSearch.
@@ -94,90 +129,244 @@ def modify_metadata_tags(mdh_tags: list) -> dict:
     return modified_tags
 
 
-def modify_data(mdh_data: list[dict], metadata_tags: dict, current_time: str) -> list[(dict, id)]:
+def split_metadata_tags(metadata_tags: dict, explicit_tags: int, required_tags: list = None) -> tuple[dict, list]:
+    """
+    Splits the metadata tags into the most frequently used tags, which get fields of their own, and the rarely used
+    tags (the long tail), which are stored together in a single flat_object field.
+
+    :param metadata_tags: A dictionary containing the OpenSearch datatypes of the metadata tags, ordered by their
+                          frequency (the order of the MetaDataHub tag request).
+    :param explicit_tags: Amount of tags that get fields of their own (0 --> all tags).
+    :param required_tags: Tags that always get fields of their own, e.g. the tags shown in the search results
+                          (default = None).
+    :return: A tuple containing the datatypes of the explicit tags and the names of the long tail tags.
+    """
+    if not explicit_tags or len(metadata_tags) <= explicit_tags:
+        return metadata_tags, []
+    required_tags = set(required_tags or [])
+    explicit = {}
+    long_tail = []
+    for rank, (name, datatype) in enumerate(metadata_tags.items()):
+        if rank < explicit_tags or name in required_tags:
+            explicit[name] = datatype
+        else:
+            long_tail.append(name)
+    return explicit, long_tail
+
+
+def modify_data(mdh_data: list[dict], metadata_tags: dict, current_time: str,
+                converter_table: ConverterTable = None) -> list[(dict, id)]:
     """
     Reformat the mdh_data dictionary for storage in OpenSearch.
 
     :param mdh_data: A list of dictionaries containing metadata-tags for each file of a MetaDataHub request.
-    :param data_types: A dictionary containing the modified OpenSearch datatypes.
+    :param metadata_tags: A dictionary containing the modified OpenSearch datatypes.
+    :param current_time: The time of the import, stored in the 'timestamp' field of each file.
+    :param converter_table: Precompiled converter table for the metadata tags. Pass the same table for every page,
+                            so it is only built once (default = None --> a new table is built).
     :return: A list of tuples containing the modified metadata tags and their corresponding values,
              along with the file ID.
     """
-    modified_data = []  # Initialize the resulting list
-
-    for file_data in mdh_data:  # Iterate over each file's data in mdh_data
-        metadata = file_data.get("metadata", [])  # Get the metadata for the current file
-        file_info = {}  # Initialize the dictionary to store the modified metadata tags
+    if converter_table is None:
+        converter_table = ConverterTable(metadata_tags=metadata_tags)
 
-        id = None  # Initialize the file ID
+    return converter_table.convert(mdh_data=mdh_data, current_time=current_time)
 
-        for meta in metadata:  # Iterate over each metadata tag
-            # Get the name and replace '.' with '_' to avoid parsing errors
-            name = str(meta.get("name")).replace(".", "_")
-            value = meta.get("value")  # Get the corresponding value for the metadata tag
 
-            if name in metadata_tags:  # Check if the metadata tag exists in OpenSearch
-                if name == "SourceFile":
-                    id = str(value)  # Set the ID to the value of the "SourceFile" tag
-
-                if metadata_tags[name] == 'date':  # Check if the data type is 'date'
-                    # Parse the value as a datetime object
-                    date = datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
-                    # Format the datetime as a string for storage in OpenSearch
-                    value = date.strftime("%Y-%m-%dT%H:%M:%S")
-                elif metadata_tags[name] == 'float':  # Check if the data type is 'float'
-                    value = float(value)  # Convert the value to a float
-                else:
-                    value = str(value)
-
-                if name and value:  # Check if both the name and value are valid
-                    file_info[name] = value  # Store the modified metadata tag and its value in the file_info dictionary
-        file_info['timestamp'] = current_time
+def prepare_index(index_name: str, os_manager: OpenSearchManager, metadata_tags: dict, ngram_fields: bool = True,
+                  keyword_ignore_above: int = 256, field_parameters: dict = None, long_tail_tags: list = None):
+    """
+    Creates the index (if it does not exist yet) and adds the mapping for all metadata tags.
 
-        modified_data.append(
-            (file_info, id))  # Append the modified metadata and the ID as a tuple to the modified_data list
+    Args:
+        index_name (str): Name of the instance (equivalent to index name in OpenSearch Node).
+        os_manager (OpenSearchManager): Manager to handle the OpenSearch API.
+        metadata_tags (dict): Dictionary of metadata tags and their corresponding data types.
+        ngram_fields (bool): Add a trigram sub-field to new text fields for substring searches (default = True).
+        keyword_ignore_above (int): Maximum length of text values that are indexed in the keyword sub-field
+            (default = 256, 0 --> no keyword sub-field).
+        field_parameters (dict): Additional mapping parameters of single fields, e.g. the scaling factor of a
+            scaled_float field (default = None).
+        long_tail_tags (list): Tags that are stored in the flat_object field instead of fields of their own
+            (default = None).
+    """
+    # Create an index for the new data in OpenSearch
+    os_manager.create_index(index_name=index_name)
 
-    return modified_data
+    # Update the index mapping with the data types
+    os_manager.update_index(index_name=index_name, data_types=metadata_tags, ngram_fields=ngram_fields,
+                            keyword_ignore_above=keyword_ignore_above, field_parameters=field_parameters,
+                            long_tail_tags=long_tail_tags)
 
 
-def upload_data(index_name: str, os_manager: OpenSearchManager, metadata_tags: dict, data: list[(dict, id)],
-                files_amount: int) -> tuple[any, list[dict]]:
+def upload_data(index_name: str, os_manager: OpenSearchManager, data: list[(dict, id)],
+                files_amount: int, thread_count: int = 1, batcher: AdaptiveBulkBatcher = None,
+                op_type: str = 'create', updated_ids: set = None) -> tuple[any, list[dict]]:
     """
     Uploads the modified data from MetaDataHub to OpenSearch using the bulk API.
+    The index has to be prepared with prepare_index before.
 
     Args:
         index_name (str): Name of the instance (equivalent to index name in OpenSearch Node).
         os_manager (OpenSearchManager): Manager to handle the OpenSearch API.
-        metadata_tags (dict): Dictionary of metadata tags and their corresponding data types.
-        data (list[dict]): List of dictionaries containing metadata tags and their values for each file.
+        data (list): List of tuples containing a document (dictionary or serialized bytes) and its id for each file.
         files_amount (int): Total number of files (equal to the length of data).
+        thread_count (int): Amount of bulk requests that are sent in parallel (default = 1 --> sequential).
+        batcher (AdaptiveBulkBatcher): Batcher that splits the data into bulk requests. Pass the same batcher for
+            every call, so the batch size keeps adapting over the whole import (default = None --> new batcher).
+        op_type (str): The bulk operation, 'create' keeps existing documents, 'index' overwrites them
+            (default = 'create').
+        updated_ids (set): Set the ids of the documents that replaced an existing document are added to
+            (default = None --> they are not collected).
 
     Returns:
-        int: Number of successfully imported files.
+        list: List of all bulk requests that contained at least one failed import.
     """
+    if batcher is None:
+        batcher = create_bulk_batcher(index_name=index_name, os_manager=os_manager, op_type=op_type)
 
-    # Create an index for the new data in OpenSearch
-    os_manager.create_index(index_name=index_name)
-
-    # Update the index mapping with the data types
-    os_manager.update_index(index_name=index_name, data_types=metadata_tags)
+    # Split the data into chunks limited by amount of documents and bytes, one chunk per worker at least
+    chunks = batcher.batches(data[:files_amount], parallel=thread_count)
 
-    chunk_size = 1000  # Size of chunks the data will be split into
+    # Perform the bulk requests to store the new data in OpenSearch
+    if thread_count > 1:
+        responses = os_manager.perform_parallel_bulk(index_name=index_name, chunks=chunks,
+                                                     thread_count=thread_count, op_type=op_type)
+    else:
+        responses = ((os_manager.perform_bulk(index_name=index_name, data=chunk_data, op_type=op_type), chunk_data)
+                     for chunk_data in chunks)
 
     failed_imports = []
-    for i in range(0, files_amount, chunk_size):
-        # Split the data into chunks
-        chunk_data = data[i:i + chunk_size]
-
-        # Perform a bulk request to store the new data in OpenSearch
-        response = os_manager.perform_bulk(index_name=index_name, data=chunk_data)
-
+    for response, chunk_data in responses:
+        batcher.record_response(response)
+        if updated_ids is not None:
+            updated_ids.update(get_updated_ids(response, chunk_data))
         if response is not None and response['errors']:
             failed_imports.append((response, chunk_data))
 
     return failed_imports
 
 
+def create_bulk_batcher(index_name: str, os_manager: OpenSearchManager, max_documents: int = 1000,
+                        target_bytes: int = 5 * 1024 * 1024, op_type: str = 'create') -> AdaptiveBulkBatcher:
+    """
+    Creates a batcher that splits the modified data into bulk requests of a suitable size.
+
+    Args:
+        index_name (str): Name of the instance (equivalent to index name in OpenSearch Node).
+        os_manager (OpenSearchManager): Manager to handle the OpenSearch API.
+        max_documents (int): Maximum amount of documents in a single bulk request (default = 1000).
+        target_bytes (int): Size in bytes the bulk requests should get close to (default = 5 MB).
+        op_type (str): The bulk operation of the requests (default = 'create').
+
+    Returns:
+        AdaptiveBulkBatcher: The batcher.
+    """
+    def entry_size(entry: (dict, id)) -> int:
+        doc, id = entry
+        return os_manager.get_bulk_entry_size(index_name=index_name, doc=doc, id=id, op_type=op_type)
+
+    return AdaptiveBulkBatcher(entry_size=entry_size, max_documents=max_documents, target_bytes=target_bytes)
+
+
+def get_sync_watermark(os_manager: OpenSearchManager, index_name: str, file_type: str, latest_timestamp: any,
+                       overlap_seconds: int = 300) -> SyncWatermark:
+    """
+    Get the high-watermark of the last import of a file type.
+
+    Args:
+        os_manager (OpenSearchManager): Manager to handle the OpenSearch API.
+        index_name (str): Name of the instance (equivalent to index name in OpenSearch Node).
+        file_type (str): The file type.
+        latest_timestamp (any): The highest MdHTimestamp of an index that was imported by an older version (without
+            any sync state), it is used if no sync state of the file type is stored. False if all files of a file type
+            without sync state are imported.
+        overlap_seconds (int): Size of the overlap window in seconds (default = 300).
+
+    Returns:
+        SyncWatermark: The watermark of the file type.
+    """
+    sync_state = os_manager.get_sync_state(index_name=index_name, file_type=file_type)
+    if sync_state is None:
+        return SyncWatermark.from_timestamp(latest_timestamp, overlap_seconds=overlap_seconds)
+    return SyncWatermark(sync_state, overlap_seconds=overlap_seconds)
+
+
+def select_changed_documents(os_manager: OpenSearchManager, index_name: str,
+                             data: list[(bytes, id)]) -> list[(bytes, id)]:
+    """
+    Removes the documents whose content did not change since they were indexed. The content hashes of the indexed
+    documents are fetched with a single multi-get request, so unchanged documents are not rewritten.
+
+    Args:
+        os_manager (OpenSearchManager): Manager to handle the OpenSearch API.
+        index_name (str): Name of the instance (equivalent to index name in OpenSearch Node).
+        data (list): List of tuples containing a document (serialized with its content hash) and its id.
+
+    Returns:
+        list: The tuples of the documents that are new or changed.
+    """
+    if not data:
+        return data
+    indexed_hashes = os_manager.get_content_hashes(index_name=index_name, ids=[id for doc, id in data])
+    return [(doc, id) for doc, id in data if indexed_hashes.get(id) != get_content_hash(doc)]
+
+
+def get_last_file_info(data: list[(any, id)]) -> tuple[any, any]:
+    """
+    Get the MdHTimestamp and the SourceFile of the last file of a page, they are stored in the checkpoint.
+
+    Args:
+        data (list): List of tuples containing a document (dictionary or serialized bytes) and its id.
+
+    Returns:
+        tuple: The MdHTimestamp (or None if the tag is not imported) and the SourceFile of the last file.
+    """
+    if not data:
+        return None, None
+    doc, id = data[-1]
+    if isinstance(doc, bytes):
+        doc = json.loads(doc)
+    return doc.get('MdHTimestamp'), id
+
+
+def update_field_catalog(os_manager: OpenSearchManager, index_name: str, statistics: FieldStatistics,
+                         current_time: str, complete: bool = None):
+    """
+    Adds the statistics collected from the indexed files to the field catalog of the index.
+
+    :param os_manager: Manager to handle the OpenSearch API.
+    :param index_name: The name of the index the files are imported into.
+    :param statistics: The statistics of the imported files, they are cleared afterwards.
+    :param current_time: The time of the import.
+    :param complete: Whether the catalog covers all documents of the index (default = None --> unchanged).
+    """
+    statistics.merge_catalog(os_manager.get_field_catalog(index_name=index_name))
+    os_manager.update_field_catalog(index_name=index_name, catalog=statistics.get_catalog(updated=current_time),
+                                    complete=complete)
+    statistics.clear()
+
+
+def count_indexed_documents(statistics: FieldStatistics, checkpoint: ImportCheckpoint, data: list[(any, id)],
+                            updated_ids: set):
+    """
+    Adds the indexed documents to the field statistics. Documents that replaced an existing document (upsert mode)
+    are not counted again, the catalog is marked as incomplete instead, because the values of the replaced
+    documents are still counted.
+
+    :param statistics: The statistics of the imported files.
+    :param checkpoint: The checkpoint of the import, it records that the catalog is incomplete.
+    :param data: List of tuples containing the indexed documents and their ids.
+    :param updated_ids: The ids of the documents that replaced an existing document.
+    """
+    if updated_ids:
+        created_data = [(doc, id) for doc, id in data if id not in updated_ids]
+        if len(created_data) < len(data):
+            checkpoint.mark_field_catalog_incomplete()
+        data = created_data
+    statistics.add_documents(data)
+
+
 def print_import_pipeline_results(start_time: float, imported_files: int):
     """
     Prints the results of the import pipeline execution.
@@ -195,37 +384,39 @@ def print_import_pipeline_results(start_time: float, imported_files: int):
     print("---------------------- Import-Pipeline ----------------------")
 
 
-def handle_failed_imports(os_manager: OpenSearchManager, index_name: str, failed_imports: list[any]):
+def handle_failed_imports(os_manager: OpenSearchManager, index_name: str, failed_imports: list[any],
+                          retry_handler: BulkRetryHandler = None):
     """
-    Handle the failed imports of the import pipeline execution, by retrying the import
+    Handle the failed imports of the import pipeline execution. Temporary errors are retried in batches with
+    exponential backoff, documents that can not be imported are written to a dead-letter file.
 
     Args:
         os_manager (OpenSearchManager): Manager to handle the OpenSearch API.
         index_name (str): Name of the instance (equivalent to index name in OpenSearch Node).
         failed_imports (list): List of all bulk requests that contained at least one failed import
+        retry_handler (BulkRetryHandler): Handler used for the retries (default = None --> handler with default
+            settings and the dead-letter file 'dead_letter.ndjson').
 
+    Returns:
+        set: The ids of the documents that were not indexed (existing or dead-lettered documents).
     """
-    for response, chunk_data in failed_imports:
-        for item in response["items"]:
-            if "error" in item["create"]:
-                error = item["create"]["error"]["type"]
-                error_id = item["create"]["_id"]
-                # skip errors caused by a version conflict (file already exists)
-                if not error == "version_conflict_engine_exception":
-                    retry_data = []
-                    for file, id in chunk_data:
-                        if error_id == id:
-                            retry_data.append((file, id))
-                    response = os_manager.perform_bulk(index_name=index_name, data=retry_data)
+    if retry_handler is None:
+        retry_handler = BulkRetryHandler(os_manager=os_manager, index_name=index_name,
+                                         dead_letter_file=DeadLetterFile('dead_letter.ndjson'))
+    return retry_handler.handle(failed_imports)
 
 
-def execute_pipeline(import_control: ImportControl):
+def execute_pipeline(import_control: ImportControl, target_index: str = None):
     """
         This function executes the complete import-pipeline by executing 4 steps:
         1. connecting to the OpenSearch Node and the MetaDataHub
         2. Downloading the data from the MetaDataHub
         3. Modifying the data in a format that is readable for OpenSearch
         4. Uploading the modified data into the OpenSearch Node
+
+        :param import_control: Control to monitor the imports.
+        :param target_index: Index that is rebuilt with all files of the MetaDataHub, e.g. a new version of the
+                             index behind the alias (default = None --> the configured index is updated).
     """
 
     print("---------------------- Import-Pipeline ----------------------")
@@ -238,6 +429,10 @@ def execute_pipeline(import_control: ImportControl):
     limit = options['limit']
     localhost = options['localhost']
     only_new_data = options['only_new_data']
+    if target_index is not None:
+        # a rebuild imports all files into the new index
+        index_name = target_index
+        only_new_data = False
     only_selected_tags = options['only_selected_tags']
     if only_selected_tags:
         selected_tags = options['selected_tags']
@@ -245,68 +440,249 @@ def execute_pipeline(import_control: ImportControl):
         selected_tags = []
 
     file_types = options['file_types']
+    page_size = options['page_size']
+    queue_depth = options['queue_depth']
+    bulk_workers = options['bulk_workers']
+    bulk_max_documents = options['bulk_max_documents']
+    bulk_target_bytes = options['bulk_target_bytes']
+    transform_workers = options['transform_workers']
+    transform_min_batch = options['transform_min_batch']
+    retry_attempts = options['retry_attempts']
+    retry_backoff_seconds = options['retry_backoff_seconds']
+    dead_letter_file = options['dead_letter_file']
+    checkpoint_file = options['checkpoint_file']
+    sync_overlap_seconds = options['sync_overlap_seconds']
+    write_mode = options['write_mode']
+    bulk_load_mode = options['bulk_load_mode']
+    force_merge_segments = options['force_merge_segments']
+    ngram_fields = options['ngram_fields']
+    keyword_ignore_above = options['keyword_ignore_above']
+    type_inference_sample = options['type_inference_sample']
+    explicit_tags = options['explicit_tags']
+    field_catalog = options['field_catalog']
+
+    # in upsert mode changed documents overwrite the indexed ones, otherwise existing documents are kept
+    op_type = 'index' if write_mode == 'upsert' else 'create'
 
     # get current time
     current_time = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
 
     # create manager
-    mdh_manager, os_manager = create_managers(localhost=localhost)
+    mdh_manager, os_manager = create_managers(localhost=localhost, bulk_workers=bulk_workers)
 
     # get the current amount of files in os
     files_in_os = os_manager.count_files(index_name=index_name)
 
-    # get the date of the last import if only new data should be imported
-    if only_new_data:
+    # resume an interrupted import from its last committed page
+    checkpoint = ImportCheckpoint(index_name=index_name, path=checkpoint_file)
+    if checkpoint.resumed:
+        print(f"Resuming the interrupted import from the checkpoint '{checkpoint_file}' ...")
+
+    # an index imported by an older version has no sync state, its file types continue from the highest MdHTimestamp
+    # of the index, the file types without a sync state of any other index are imported from scratch
+    if only_new_data and not os_manager.has_sync_state(index_name=index_name):
         latest_timestamp = os_manager.get_latest_timestamp(index_name=index_name)
     else:
         latest_timestamp = False
+    latest_timestamp = checkpoint.get_legacy_timestamp(latest_timestamp)
 
     # get the current amount of fields (metadata tags) in os
     fields_in_os = os_manager.get_all_fields(index_name=index_name)
 
     # get the metadata tags and their datatypes either from the mdh itself (initial import) or from OpenSearch
+    field_parameters = {}
     if not fields_in_os is None:  # this is not the first (initial) import
-        metadata_tags = {}
-        for field in fields_in_os:
-            metadata_tags[field] = os_manager.get_datatype(index_name=index_name, field_name=field)
+        # all datatypes are read from the mapping fetched by get_all_fields
+        metadata_tags = os_manager.extract_metadata_dict(index_name=index_name)
+        long_tail_tags = os_manager.get_long_tail_tags(index_name=index_name)
     else:  # this is executed if it is the first import
         mdh_tags = extract_metadata_tags_from_mdh(mdh_manager=mdh_manager)
         metadata_tags = modify_metadata_tags(mdh_tags=mdh_tags)  # modify the datatypes so they fit in OpenSearch
+        # only the most frequent tags get fields of their own, the rest is stored in a single flat_object field
+        metadata_tags, long_tail_tags = split_metadata_tags(metadata_tags=metadata_tags, explicit_tags=explicit_tags,
+                                                            required_tags=REQUIRED_TAGS + selected_tags)
+        if type_inference_sample:
+            # pick the numeric datatypes (e.g. long for file sizes) from the values of sample files
+            sample_data, _ = extract_data_from_mdh(mdh_manager=mdh_manager, limit=type_inference_sample,
+                                                   selected_tags=selected_tags)
+            metadata_tags, field_parameters = infer_numeric_types(mdh_data=sample_data, metadata_tags=metadata_tags)
 
     limit = int(limit / len(file_types))
 
-    for file_type in file_types:
-        # extract the data from the mdh
-        mdh_data, files_amount = extract_data_from_mdh(mdh_manager=mdh_manager, limit=limit,
-                                                       latest_timestamp=latest_timestamp, selected_tags=selected_tags,
-                                                       file_type=file_type)
-
-        # get the amount of files that exist in the mdh core
-        files_in_mdh = mdh_manager.get_total_files_count()
-
-        # create a new import in the 'import.dictionary' file (monitoring purposes)
-        import_control.create_import(files_in_os=files_in_os, files_in_mdh=files_in_mdh)
-
-        # modify the data so it can be easily stored in OpenSearch
-        data = modify_data(mdh_data=mdh_data, metadata_tags=metadata_tags,
-                           current_time=current_time)
-
-        # Loading the data into OpenSearch
-        failed_imports = upload_data(index_name=index_name, os_manager=os_manager, metadata_tags=metadata_tags,
-                                     data=data,
-                                     files_amount=files_amount)
-
-        # wait for two seconds to avoid synchronization problems
-        time.sleep(2)
-
-        # handle the failed imports
-        handle_failed_imports(os_manager, index_name, failed_imports)
-
-        # files in os after import
-        imported_files = os_manager.count_files(index_name=index_name) - files_in_os
-
-        # update the import in the 'import.dictionary' file
-        import_control.update_import(imported_files=imported_files)
+    # the initial import and full imports load the index with refreshes and replicas disabled
+    bulk_load = bulk_load_mode and (fields_in_os is None or not only_new_data)
+
+    # create the index and its mapping once before uploading the pages
+    prepare_index(index_name=index_name, os_manager=os_manager, metadata_tags=metadata_tags, ngram_fields=ngram_fields,
+                  keyword_ignore_above=keyword_ignore_above, field_parameters=field_parameters,
+                  long_tail_tags=long_tail_tags)
+
+    # resend the documents that could not be imported by the last import
+    retry_handler = BulkRetryHandler(os_manager=os_manager, index_name=index_name,
+                                     dead_letter_file=DeadLetterFile(dead_letter_file), max_attempts=retry_attempts,
+                                     backoff_seconds=retry_backoff_seconds, batch_size=bulk_max_documents,
+                                     op_type=op_type)
+
+    # the statistics of the field catalog are collected from the documents that were indexed
+    statistics = FieldStatistics(metadata_tags=metadata_tags, long_tail_tags=long_tail_tags) if field_catalog \
+        else None
+    catalog_complete = False
+    if statistics is not None:
+        if checkpoint.resumed:
+            # the statistics of the pages committed before the import was interrupted
+            statistics.merge_catalog(checkpoint.get_field_statistics())
+        elif not only_new_data:
+            # all files are imported again, so the catalog starts from scratch
+            os_manager.delete_field_catalog(index_name=os_manager.resolve_index(index_name))
+        # only a catalog that counted every document of the index is complete, not one started by an incremental
+        # import of an existing index
+        catalog_complete = checkpoint.get_field_catalog_complete(
+            fields_in_os is None or not only_new_data or os_manager.is_field_catalog_complete(index_name=index_name))
+        # the documents that are loaded now are not counted until their file type is completed
+        os_manager.update_field_catalog(index_name=index_name, catalog={}, complete=False)
+
+    replayed_data = retry_handler.replay_dead_letters()
+    if statistics is not None:
+        count_indexed_documents(statistics=statistics, checkpoint=checkpoint, data=replayed_data,
+                                updated_ids=retry_handler.updated_ids)
+
+    # the converter table is built once and shared by all pages
+    converter_table = ConverterTable(metadata_tags=metadata_tags, long_tail_tags=long_tail_tags)
+
+    # the batcher is shared by all pages, so the size of the bulk requests adapts over the whole import
+    batcher = create_bulk_batcher(index_name=index_name, os_manager=os_manager, max_documents=bulk_max_documents,
+                                  target_bytes=bulk_target_bytes, op_type=op_type)
+
+    # the pages are modified either in this process or in worker processes for large pages
+    transform_pool = TransformPool(converter_table=converter_table, current_time=current_time,
+                                   worker_count=transform_workers, min_batch_size=transform_min_batch)
+
+    imported_files = 0
+    unchanged_files = 0
+    try:
+        if bulk_load:
+            load_context = os_manager.bulk_load_mode(index_name=index_name, max_num_segments=force_merge_segments)
+        else:
+            load_context = nullcontext()
+        with load_context:
+            for file_type in file_types:
+                if checkpoint.is_completed(file_type):
+                    continue  # all files of this type were imported before the import was interrupted
+
+                # continue after the last committed page of an interrupted import
+                offset = checkpoint.get_offset(file_type)
+                if limit and offset >= limit:
+                    if statistics is not None:
+                        update_field_catalog(os_manager=os_manager, index_name=index_name, statistics=statistics,
+                                             current_time=current_time)
+                    checkpoint.complete_file_type(file_type)
+                    continue
+
+                # get the high-watermark of the last import of this file type
+                watermark = get_sync_watermark(os_manager=os_manager, index_name=index_name, file_type=file_type,
+                                               latest_timestamp=latest_timestamp, overlap_seconds=sync_overlap_seconds)
+                if only_new_data:
+                    file_type_timestamp = checkpoint.get_latest_timestamp(file_type, watermark.get_filter_timestamp())
+                else:
+                    file_type_timestamp = False
+
+                # extract the data from the mdh page by page
+                pages = extract_data_pages_from_mdh(mdh_manager=mdh_manager, latest_timestamp=file_type_timestamp,
+                                                    page_size=page_size, limit=limit - offset if limit else limit,
+                                                    offset=offset, selected_tags=selected_tags, file_type=file_type)
+
+                import_created = False
+
+                def upload(data: list[(bytes, id)]):
+                    nonlocal import_created, unchanged_files
+                    if not import_created:
+                        # get the amount of files that exist in the mdh core
+                        files_in_mdh = mdh_manager.get_total_files_count()
+
+                        # create a new import in the 'import.dictionary' file (monitoring purposes)
+                        import_control.create_import(files_in_os=files_in_os, files_in_mdh=files_in_mdh)
+                        import_created = True
+
+                    # skip the files that were already imported by the last import inside the overlap window
+                    new_data = watermark.filter_new(data)
+
+                    # skip the files whose metadata did not change since they were indexed
+                    if op_type == 'index':
+                        changed_data = select_changed_documents(os_manager=os_manager, index_name=index_name,
+                                                                data=new_data)
+                        unchanged_files += len(new_data) - len(changed_data)
+                        new_data = changed_data
+
+                    # Loading the data into OpenSearch
+                    updated_ids = set()
+                    failed_imports = upload_data(index_name=index_name, os_manager=os_manager, data=new_data,
+                                                 files_amount=len(new_data), thread_count=bulk_workers, batcher=batcher,
+                                                 op_type=op_type, updated_ids=updated_ids)
+
+                    # handle the failed imports, so every document of the page is either indexed or dead-lettered
+                    rejected_ids = handle_failed_imports(os_manager, index_name, failed_imports,
+                                                         retry_handler=retry_handler)
+
+                    # count the documents that were indexed, the statistics are committed together with the page
+                    field_statistics = None
+                    if statistics is not None:
+                        count_indexed_documents(statistics=statistics, checkpoint=checkpoint,
+                                                data=[(doc, id) for doc, id in new_data if id not in rejected_ids],
+                                                updated_ids=updated_ids | retry_handler.updated_ids)
+                        field_statistics = statistics.get_catalog(updated=current_time)
+
+                    # the page is committed, an interrupted import continues with the next page
+                    last_mdh_timestamp, last_source_file = get_last_file_info(data)
+                    checkpoint.commit_page(file_type=file_type, files_amount=len(data),
+                                           last_mdh_timestamp=last_mdh_timestamp, last_source_file=last_source_file,
+                                           field_statistics=field_statistics)
+                    watermark.track_page(data)
+
+                # download, modify and upload the pages concurrently
+                staged_import = StagedImport(queue_depth=queue_depth)
+                # the documents are modified (and serialized once, so retries reuse the bytes) by the transform pool
+                staged_import.run(pages=pages, transform=transform_pool.transform, upload=upload)
+                staged_import.print_stage_times()
+
+                # store the new high-watermark for the next import
+                os_manager.update_sync_state(index_name=index_name, file_type=file_type,
+                                             sync_state=watermark.get_sync_state())
+                if statistics is not None:
+                    update_field_catalog(os_manager=os_manager, index_name=index_name, statistics=statistics,
+                                         current_time=current_time)
+                checkpoint.complete_file_type(file_type)
+
+                # wait for two seconds to avoid synchronization problems
+                time.sleep(2)
+                if bulk_load:
+                    os_manager.refresh_index(index_name=index_name)  # refreshes are disabled while bulk loading
+
+                # files in os after import
+                imported_files = os_manager.count_files(index_name=index_name) - files_in_os
+
+                # the search results cached by the web app are outdated now
+                os_manager.bump_index_generation(index_name=index_name)
+
+                # update the import in the 'import.dictionary' file
+                import_control.update_import(imported_files=imported_files)
+    finally:
+        transform_pool.close()
+
+    if statistics is not None:
+        # the searches read the presence of the fields from the catalog again, if it counted every document
+        # (upserts of existing documents may have marked it as incomplete)
+        catalog_complete = checkpoint.get_field_catalog_complete(catalog_complete)
+        update_field_catalog(os_manager=os_manager, index_name=index_name, statistics=statistics,
+                             current_time=current_time, complete=catalog_complete)
+
+    # the import finished, so the next import starts from scratch
+    checkpoint.clear()
+
+    # print the values that were skipped because they could not be converted and the results of the retries
+    converter_table.print_failed_values()
+    retry_handler.print_statistics()
+    if op_type == 'index':
+        print(f"--> Skipped {unchanged_files} unchanged files")
 
     # print the import results
     print_import_pipeline_results(start_time=start_time, imported_files=imported_files)
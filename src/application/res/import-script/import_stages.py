@@ -0,0 +1,135 @@
+import queue
+import threading
+import time
+
+
+class _EndOfStage:
+    """ Marker that is passed through a queue once a stage has processed all of its items """
+
+
+_END_OF_STAGE = _EndOfStage()
+
+
+class StagedImport:
+    """
+    Runs the download, transform and upload stage of the import pipeline concurrently.
+    The stages are connected by bounded queues, so page N+1 can be downloaded while page N is transformed
+    and page N-1 is uploaded, while never more than 'queue_depth' pages wait between two stages.
+    """
+
+    def __init__(self, queue_depth: int = 2):
+        """
+        Creates a new staged import.
+
+        :param queue_depth: Maximum amount of pages that may wait between two stages (default = 2)
+        """
+        self.queue_depth = max(1, queue_depth)
+        self.stage_times = {'download': 0.0, 'transform': 0.0, 'upload': 0.0}  # busy time of each stage in seconds
+        self._stop = threading.Event()  # set as soon as one of the stages failed
+        self._errors = []
+
+    def run(self, pages, transform, upload):
+        """
+        Executes the stages until all pages are uploaded.
+
+        :param pages: Iterable yielding the downloaded pages (e.g. a generator of the MetaDataHubManager).
+        :param transform: Function converting a downloaded page into data that can be uploaded.
+        :param upload: Function uploading a transformed page into OpenSearch.
+        :return: A dictionary containing the busy time of each stage in seconds.
+        """
+        downloaded_pages = queue.Queue(maxsize=self.queue_depth)
+        transformed_pages = queue.Queue(maxsize=self.queue_depth)
+
+        threads = [
+            threading.Thread(target=self._download_stage, args=(pages, downloaded_pages),
+                             name='import-download', daemon=True),
+            threading.Thread(target=self._transform_stage, args=(transform, downloaded_pages, transformed_pages),
+                             name='import-transform', daemon=True)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            # the upload stage runs in the calling thread
+            self._upload_stage(upload, transformed_pages)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+        return self.stage_times
+
+    def print_stage_times(self):
+        """ Prints the busy time of each stage, so the stage limiting the import can be identified """
+        for stage, seconds in self.stage_times.items():
+            print(f"--> Stage '{stage}' was busy for {seconds:.2f} seconds")
+
+    def _download_stage(self, pages, output_queue: queue.Queue):
+        """ Iterates over the downloaded pages and passes them to the transform stage """
+        try:
+            iterator = iter(pages)
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                try:
+                    page = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    self.stage_times['download'] += time.perf_counter() - start
+                self._put(output_queue, page)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(output_queue, _END_OF_STAGE)
+
+    def _transform_stage(self, transform, input_queue: queue.Queue, output_queue: queue.Queue):
+        """ Transforms the downloaded pages and passes them to the upload stage """
+        try:
+            for page in self._iterate(input_queue):
+                start = time.perf_counter()
+                transformed_page = transform(page)
+                self.stage_times['transform'] += time.perf_counter() - start
+                self._put(output_queue, transformed_page)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(output_queue, _END_OF_STAGE)
+
+    def _upload_stage(self, upload, input_queue: queue.Queue):
+        """ Uploads the transformed pages """
+        for page in self._iterate(input_queue):
+            start = time.perf_counter()
+            upload(page)
+            self.stage_times['upload'] += time.perf_counter() - start
+
+    def _iterate(self, input_queue: queue.Queue):
+        """ Yields the items of a queue until the previous stage is finished or the import was stopped """
+        while True:
+            try:
+                item = input_queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            if item is _END_OF_STAGE or self._stop.is_set():
+                return
+            yield item
+
+    def _put(self, output_queue: queue.Queue, item):
+        """ Puts an item into a queue without blocking forever if the next stage stopped consuming """
+        while True:
+            try:
+                output_queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    return
+
+    def _fail(self, error: BaseException):
+        """ Records the error of a stage and stops all other stages """
+        self._errors.append(error)
+        self._stop.set()
@@ -113,6 +113,8 @@ class MetaDataHubManager:
         if selected_tags:
             if "SourceFile" not in selected_tags:
                 selected_tags.append("SourceFile")
+            if "MdHTimestamp" not in selected_tags:  # needed for the high-watermark of incremental imports
+                selected_tags.append("MdHTimestamp")
 
         if file_type:
             t = FilterFunction(tag="FileType", value=file_type, operation="EQUAL", data_type="STR")
@@ -123,8 +125,8 @@ class MetaDataHubManager:
             SortFunction(tag="FileName", operation="ASC")
         ]
 
-        gql_query = GraphQLQuery(filter_functions=filter_functions, sort_functions=[]
-                                 , limit=limit, offset=offset, selected_tags=selected_tags)
+        gql_query = GraphQLQuery(filter_functions=filter_functions, sort_functions=sort_functions,
+                                 limit=limit, offset=offset, selected_tags=selected_tags)
 
         self._write_file(self.format_query(gql_query.generate_data_query()))
         return gql_query
@@ -162,6 +164,38 @@ class MetaDataHubManager:
         for core in mdh.core.main.get():
             self.data = mdh.core.main.execute(core, self._request_path_file)
 
+    def download_data_pages(self, timestamp: str = False, page_size: int = 1000, limit: int = False,
+                            offset: int = 0, selected_tags: list = None, file_type: str = False):
+        """ download the data page by page and yield the files of each page as soon as it arrives.
+        The pages are requested with a stable sort order (MdHTimestamp, FileName), so consecutive
+        offsets never skip or repeat files. Only the current page is kept in memory.
+
+        :param timestamp: timestamp of last data extraction. if given only data that was added after this date gets extracted (default = false --> no time filter)
+        :param page_size: amount of files that will be downloaded with a single request (default = 1000)
+        :param limit: limit that determines the total amount of files that will be extracted (default = false --> no limit)
+        :param offset: offset of the first page, e.g. to resume an interrupted download (default = 0)
+        :param selected_tags: list of tags that will extracted (default = None --> all possible tags get extracted)
+        :param file_type: type of file (e.g. xml, jpeg, ...). Only files of this type will be extracted (default = false --> all file types)
+        :return: generator yielding a list of dictionaries containing the metadata-tags of the files of each page
+        """
+        downloaded_files = 0
+        while not limit or downloaded_files < limit:
+            # do not request more files than the limit allows
+            current_page_size = page_size if not limit else min(page_size, limit - downloaded_files)
+
+            self.download_data(timestamp=timestamp, limit=current_page_size, offset=offset,
+                               selected_tags=selected_tags, file_type=file_type)
+            files = self.get_data()
+            if not files:  # no more files left in the core
+                break
+
+            downloaded_files += len(files)
+            offset += len(files)
+            yield files
+
+            if len(files) < current_page_size:  # the last page was not full, so the core is exhausted
+                break
+
     def get_instance_name(self) -> str:
         """ get the instance (core name) from the last request
 
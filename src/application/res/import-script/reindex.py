@@ -0,0 +1,165 @@
+import time
+import sys
+import os
+
+# Get the path to the parent directory
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the parent directory to the sys.path list, before the modules below import the backend
+sys.path.append(parent_dir)
+from import_control import ImportControl
+from import_pipeline import execute_pipeline
+from backend.opensearch_api import OpenSearchManager
+from backend.configuration import get_config_values
+
+
+def get_active_index(os_manager: OpenSearchManager, alias: str) -> any:
+    """
+    Get the index that currently serves the searches of an alias.
+
+    :param os_manager: Manager to handle the OpenSearch API.
+    :param alias: The configured index name, which is used as alias for the versioned indices.
+    :return: The name of the active index, the alias itself if it is still a physical index (created before
+             versioned indices were used), or None if nothing is imported yet.
+    """
+    indices = os_manager.get_alias_indices(alias)
+    if indices:
+        return indices[0]
+    if os_manager.index_exists(alias):
+        return alias
+    return None
+
+
+def copy_index(os_manager: OpenSearchManager, source_index: str, dest_index: str, slices: any = 'auto'):
+    """
+    Creates a new index with the current index settings and the fields of the source index, and copies all
+    documents into it with a sliced reindex.
+
+    :param os_manager: Manager to handle the OpenSearch API.
+    :param source_index: The name of the index the documents are copied from.
+    :param dest_index: The name of the new index.
+    :param slices: Amount of parallel slices of the reindex (default = 'auto' --> one slice per shard).
+    """
+    metadata_tags = os_manager.extract_metadata_dict(index_name=source_index)
+    os_manager.create_index(index_name=dest_index)
+    os_manager.update_index(index_name=dest_index, data_types=metadata_tags,
+                            field_parameters=os_manager.get_field_parameters(index_name=source_index),
+                            long_tail_tags=os_manager.get_long_tail_tags(index_name=source_index))
+    with os_manager.bulk_load_mode(index_name=dest_index):
+        response = os_manager.reindex(source_index=source_index, dest_index=dest_index, slices=slices)
+    print(f"--> Copied {response.get('created', 0)} documents from '{source_index}' to '{dest_index}'")
+
+    # the copy contains the same files, so the next import continues at the same high-watermark
+    os_manager.copy_sync_state(source_index=source_index, dest_index=dest_index)
+    os_manager.copy_field_catalog(source_index=source_index, dest_index=dest_index)
+
+
+def delete_old_versions(os_manager: OpenSearchManager, alias: str, keep_versions: int):
+    """
+    Deletes the oldest versions of an index, the newest complete versions are kept for a rollback. Incomplete
+    versions left by a failed rebuild are deleted as well.
+
+    :param os_manager: Manager to handle the OpenSearch API.
+    :param alias: The name of the alias.
+    :param keep_versions: Amount of complete versions that are kept, including the active one.
+    """
+    active_indices = os_manager.get_alias_indices(alias)
+    kept_versions = os_manager.get_index_versions(alias, complete_only=True)[-max(keep_versions, 1):]
+    for version in os_manager.get_index_versions(alias):
+        index_name = os_manager.get_versioned_index_name(alias, version)
+        if version not in kept_versions and index_name not in active_indices:
+            os_manager.delete_index(index_name=index_name)
+
+
+def rebuild_index():
+    """
+    Rebuilds the configured index as a new version behind an alias (blue/green). The new version is either imported
+    from the MetaDataHub or copied from the active version, while the active version keeps serving the searches.
+    Afterwards the alias is swapped to the new version with a single atomic request.
+    """
+    print("---------------------- Reindex ----------------------")
+    start_time = time.time()
+
+    # get config values
+    options = get_config_values()
+    alias = options['index_name']
+    source = options['reindex_source']
+    slices = options['reindex_slices']
+    slices = int(slices) if slices.isdigit() else slices
+    keep_versions = options['keep_index_versions']
+
+    os_manager = OpenSearchManager(localhost=options['localhost'])
+
+    if source not in ('index', 'mdh'):
+        raise ValueError(f"Unknown reindex source '{source}', use 'mdh' or 'index'.")
+
+    active_index = get_active_index(os_manager=os_manager, alias=alias)
+    if active_index is None and source == 'index':
+        raise ValueError(f"There is no index '{alias}' to copy the documents from.")
+    if active_index is not None and active_index != alias:
+        # the active version serves the searches, so it is complete (also if it was built by an older version)
+        os_manager.mark_version_complete(index_name=active_index)
+    versions = os_manager.get_index_versions(alias)
+    new_index = os_manager.get_versioned_index_name(alias, versions[-1] + 1 if versions else 1)
+    print(f"Rebuilding '{alias}' ({active_index or 'no active index'}) into '{new_index}' from '{source}' ...")
+
+    try:
+        if source == 'index':
+            copy_index(os_manager=os_manager, source_index=active_index, dest_index=new_index, slices=slices)
+        else:
+            execute_pipeline(ImportControl(), target_index=new_index)
+    except BaseException:
+        # a partial version must neither be kept for a rollback nor replace a complete one
+        print(f"--> Rebuilding '{new_index}' failed, the incomplete index is deleted")
+        if os_manager.index_exists(new_index):
+            os_manager.delete_index(index_name=new_index)
+        raise
+
+    # switch the searches to the new version
+    os_manager.mark_version_complete(index_name=new_index)
+    os_manager.swap_alias(alias=alias, index_name=new_index)
+    print(f"--> Alias '{alias}' points to '{new_index}'")
+    if active_index == alias:
+        # the physical index was deleted by the swap, its documents are part of the new version now
+        os_manager.delete_sync_state(index_name=alias)
+        os_manager.delete_field_catalog(index_name=alias)
+
+    delete_old_versions(os_manager=os_manager, alias=alias, keep_versions=keep_versions)
+    print("--> Reindex took ", "%s seconds" % (time.time() - start_time), " to execute!")
+
+
+def rollback_index():
+    """
+    Swaps the alias of the configured index back to the previous version.
+    """
+    options = get_config_values()
+    alias = options['index_name']
+    os_manager = OpenSearchManager(localhost=options['localhost'])
+
+    active_index = get_active_index(os_manager=os_manager, alias=alias)
+
+    # collect the complete versions that are older than the active one
+    complete_versions = set(os_manager.get_index_versions(alias, complete_only=True))
+    older_indices = []
+    for version in os_manager.get_index_versions(alias):
+        index_name = os_manager.get_versioned_index_name(alias, version)
+        if index_name == active_index:
+            break
+        if version in complete_versions:
+            older_indices.append(index_name)
+    else:
+        older_indices = []  # the active index is not a version of the alias
+
+    if not older_indices:
+        print(f"No version of '{alias}' older than '{active_index}' found.")
+        return
+    previous_index = older_indices[-1]
+    os_manager.swap_alias(alias=alias, index_name=previous_index)
+    print(f"--> Alias '{alias}' points to '{previous_index}'")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'rollback':
+        rollback_index()
+    else:
+        rebuild_index()
@@ -0,0 +1,124 @@
+import json
+from datetime import datetime, timedelta
+
+OPENSEARCH_FORMAT = "%Y-%m-%dT%H:%M:%S"  # format of the MdHTimestamp stored in OpenSearch
+MDH_FORMAT = "%Y-%m-%d %H:%M:%S"  # format of timestamps in MetaDataHub filters
+
+
+class SyncWatermark:
+    """
+    High-watermark of the incremental import of a file type, based on the highest MdHTimestamp that was indexed.
+    The next import requests all files newer than the watermark minus an overlap window, so files that were added
+    to the MetaDataHub while the last import was running are not missed. Files inside the overlap window that were
+    already indexed by the last import are remembered by their ids and MdHTimestamps, and skipped unless they were
+    changed (harvested again with a newer MdHTimestamp) since.
+    """
+
+    def __init__(self, sync_state: dict = None, overlap_seconds: int = 300):
+        """
+        Creates the watermark from the sync state stored by the last import.
+
+        :param sync_state: The stored sync state (default = None --> no file was imported yet).
+        :param overlap_seconds: Size of the overlap window in seconds (default = 300).
+        """
+        sync_state = sync_state or {}
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.watermark = sync_state.get('watermark')  # highest MdHTimestamp in OpenSearch format
+        # id -> MdHTimestamp of the files inside the overlap window that were indexed by the last import, the states
+        # of older versions only stored the ids, their files are at most as new as the watermark
+        self.skip_files = {id: self.watermark for id in sync_state.get('boundary_ids', [])}
+        self.skip_files.update((file['id'], file['MdHTimestamp']) for file in sync_state.get('boundary_files', []))
+        self._boundary = {}  # id -> MdHTimestamp of the newest imported files
+
+    @classmethod
+    def from_timestamp(cls, latest_timestamp: any, overlap_seconds: int = 300):
+        """
+        Creates a watermark from the latest timestamp of an index that has no sync state yet.
+
+        :param latest_timestamp: The highest MdHTimestamp of the index in MetaDataHub format, or False.
+        :param overlap_seconds: Size of the overlap window in seconds (default = 300).
+        :return: The watermark.
+        """
+        if not latest_timestamp:
+            return cls(overlap_seconds=overlap_seconds)
+        watermark = datetime.strptime(latest_timestamp, MDH_FORMAT).strftime(OPENSEARCH_FORMAT)
+        return cls({'watermark': watermark}, overlap_seconds=overlap_seconds)
+
+    def get_filter_timestamp(self) -> any:
+        """
+        Get the timestamp for the MdHTimestamp filter of the MetaDataHub request.
+
+        :return: The watermark minus the overlap window in MetaDataHub format, or False if all files are requested.
+        """
+        if not self.watermark:
+            return False
+        return (datetime.strptime(self.watermark, OPENSEARCH_FORMAT) - self.overlap).strftime(MDH_FORMAT)
+
+    def filter_new(self, data: list[(any, id)]) -> list[(any, id)]:
+        """
+        Removes the files that were already imported inside the overlap window. A file that was imported before is
+        kept if its MdHTimestamp is newer than the imported one, so the changed document is updated.
+
+        :param data: List of tuples containing a document (dictionary or serialized bytes) and its id.
+        :return: The tuples of the files that were not imported yet.
+        """
+        if not self.skip_files:
+            return data
+        return [(doc, id) for doc, id in data if id not in self.skip_files or not self._is_imported(doc, id)]
+
+    def _is_imported(self, doc: any, id: str) -> bool:
+        """ Checks if a file of the overlap window was imported with the same (or a newer) MdHTimestamp """
+        mdh_timestamp = _get_mdh_timestamp(doc)
+        imported_timestamp = self.skip_files[id]
+        return mdh_timestamp is None or imported_timestamp is None or mdh_timestamp <= imported_timestamp
+
+    def track_page(self, data: list[(any, id)]):
+        """
+        Moves the watermark to the newest file of an imported page. The pages are sorted by MdHTimestamp, so only
+        the files at the end of a page are read to find the files inside the overlap window.
+
+        :param data: List of tuples containing a document (dictionary or serialized bytes) and its id.
+        """
+        for doc, id in reversed(data):
+            mdh_timestamp = _get_mdh_timestamp(doc)
+            if mdh_timestamp is None:
+                continue
+            if self.watermark is None or mdh_timestamp > self.watermark:
+                self.watermark = mdh_timestamp
+                cutoff = self._get_cutoff()
+                self._boundary = {key: value for key, value in self._boundary.items() if value >= cutoff}
+            if mdh_timestamp < self._get_cutoff():
+                break
+            self._boundary[id] = mdh_timestamp
+
+    def _get_cutoff(self) -> str:
+        """ Get the beginning of the overlap window in OpenSearch format """
+        return (datetime.strptime(self.watermark, OPENSEARCH_FORMAT) - self.overlap).strftime(OPENSEARCH_FORMAT)
+
+    def get_sync_state(self) -> dict:
+        """
+        Get the sync state that is stored for the next import.
+
+        :return: Dictionary containing the watermark and the ids and MdHTimestamps of the files inside the overlap
+                 window.
+        """
+        boundary = {}
+        if self.watermark is not None:
+            # files of the last import stay in the state while they are inside the window
+            cutoff = self._get_cutoff()
+            boundary = {id: mdh_timestamp for id, mdh_timestamp in self.skip_files.items()
+                        if mdh_timestamp is not None and mdh_timestamp >= cutoff}
+        boundary.update(self._boundary)
+        return {
+            'watermark': self.watermark,
+            'boundary_files': [{'id': id, 'MdHTimestamp': mdh_timestamp}
+                               for id, mdh_timestamp in sorted(boundary.items())],
+            'updated_at': datetime.now().strftime(OPENSEARCH_FORMAT)
+        }
+
+
+def _get_mdh_timestamp(doc: any) -> any:
+    """ Get the MdHTimestamp of a document (dictionary or serialized bytes) """
+    if isinstance(doc, bytes):
+        doc = json.loads(doc)
+    return doc.get('MdHTimestamp')
@@ -0,0 +1,109 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from converters import ConverterTable
+from backend.bulk_serializer import encode_documents_with_hash
+
+# State of a worker process, initialized once per process by _init_worker
+_worker_converter_table = None
+_worker_current_time = None
+
+
+def _init_worker(metadata_tags: dict, current_time: str, long_tail_tags: list = None):
+    """
+    Initializes a worker process by building its own converter table.
+
+    :param metadata_tags: A dictionary containing the OpenSearch datatypes of the metadata tags.
+    :param current_time: The time of the import, stored in the 'timestamp' field.
+    :param long_tail_tags: Tags whose values are stored in the flat_object field (default = None).
+    """
+    global _worker_converter_table, _worker_current_time
+    _worker_converter_table = ConverterTable(metadata_tags=metadata_tags, long_tail_tags=long_tail_tags)
+    _worker_current_time = current_time
+
+
+def _transform_shard(mdh_data: list[dict]) -> tuple[list[(bytes, id)], dict]:
+    """
+    Converts a shard of a page in a worker process and serializes the documents (including their content hash),
+    so only bytes are sent back.
+
+    :param mdh_data: A list of dictionaries containing metadata-tags for each file of a MetaDataHub request.
+    :return: A tuple containing the serialized documents with their ids and the amount of values
+             per field that could not be converted.
+    """
+    data = _worker_converter_table.convert(mdh_data=mdh_data, current_time=_worker_current_time)
+    failed_values = dict(_worker_converter_table.failed_values)
+    _worker_converter_table.failed_values.clear()
+    return encode_documents_with_hash(data), failed_values
+
+
+class TransformPool:
+    """
+    Transform stage of the import pipeline that converts the downloaded pages in several worker processes.
+    Each page is split into shards that are converted and serialized in parallel. Small pages are converted
+    in the current process, because sending them to the workers would take longer than converting them.
+    """
+
+    def __init__(self, converter_table: ConverterTable, current_time: str, worker_count: int = 1,
+                 min_batch_size: int = 500):
+        """
+        Creates a new transform pool. The worker processes are started with the first page that is large enough.
+
+        :param converter_table: The converter table used in the current process, it also collects the amount of
+                                values that could not be converted by the workers.
+        :param current_time: The time of the import, stored in the 'timestamp' field.
+        :param worker_count: Amount of worker processes (default = 1 --> no worker processes).
+        :param min_batch_size: Minimum amount of files of a page to be converted by the workers (default = 500).
+        """
+        self.converter_table = converter_table
+        self.current_time = current_time
+        self.worker_count = worker_count
+        self.min_batch_size = min_batch_size
+        self._executor = None
+
+    def transform(self, mdh_data: list[dict]) -> list[(bytes, id)]:
+        """
+        Converts a page into serialized documents (including their content hash) that are ready to be indexed.
+
+        :param mdh_data: A list of dictionaries containing metadata-tags for each file of a MetaDataHub request.
+        :return: A list of tuples containing the serialized documents and their ids, in the order of the page.
+        """
+        if self.worker_count <= 1 or len(mdh_data) < self.min_batch_size:
+            data = self.converter_table.convert(mdh_data=mdh_data, current_time=self.current_time)
+            return encode_documents_with_hash(data)
+
+        shard_size = -(-len(mdh_data) // self.worker_count)  # ceil division, one shard per worker
+        shards = [mdh_data[i:i + shard_size] for i in range(0, len(mdh_data), shard_size)]
+
+        encoded_data = []
+        for encoded_shard, failed_values in self._get_executor().map(_transform_shard, shards):
+            encoded_data.extend(encoded_shard)
+            self.converter_table.failed_values.update(failed_values)
+        return encoded_data
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Get the process pool, it is created on first use.
+
+        :return: The process pool.
+        """
+        if self._executor is None:
+            # spawn the workers instead of forking, since the pipeline already runs other threads
+            self._executor = ProcessPoolExecutor(max_workers=self.worker_count,
+                                                 mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=_init_worker,
+                                                 initargs=(self.converter_table.metadata_tags, self.current_time,
+                                                           self.converter_table.long_tail_tags))
+        return self._executor
+
+    def close(self):
+        """ Shuts down the worker processes """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
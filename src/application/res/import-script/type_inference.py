@@ -0,0 +1,123 @@
+from decimal import Decimal, InvalidOperation
+
+# Limits of the OpenSearch integer types
+SHORT_LIMIT = 2 ** 15
+INTEGER_LIMIT = 2 ** 31
+LONG_LIMIT = 2 ** 63
+
+# Integer tags whose values are bounded by their meaning, they get the given (smaller) type. All other integer tags
+# are mapped to long, because the sample (the oldest files) says nothing about the values of later files, e.g. the
+# FileSize of a video, and values that do not fit into the type are rejected by OpenSearch
+BOUNDED_INTEGER_TAGS = {
+    'Orientation': 'short',
+    'BitsPerSample': 'short',
+    'ColorComponents': 'short',
+    'ResolutionUnit': 'short',
+    'ExposureProgram': 'short',
+    'MeteringMode': 'short',
+    'Flash': 'short',
+    'WhiteBalance': 'short',
+    'Rotation': 'short',
+    'ImageWidth': 'integer',
+    'ImageHeight': 'integer',
+    'ISO': 'integer',
+    'Pages': 'integer',
+}
+
+MAX_SCALED_DECIMALS = 3  # values with up to 3 decimal places are stored as scaled_float
+MAX_SAFE_INTEGER = 2 ** 53  # largest integer that is stored exactly by a double
+
+# Significant decimal digits and largest value that half_float and float represent
+HALF_FLOAT_DIGITS, HALF_FLOAT_MAX = 3, 65504
+FLOAT_DIGITS, FLOAT_MAX = 6, 3.4e38
+
+
+def _parse_number(value: any) -> any:
+    """
+    Parses a numeric MetaDataHub value exactly.
+
+    :param value: The value from the MetaDataHub.
+    :return: The value as Decimal, or None if the value is not a finite number.
+    """
+    try:
+        number = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        return None
+    return number if number.is_finite() else None
+
+
+def _significant_digits(number: Decimal) -> int:
+    """ Get the amount of significant decimal digits of a number, e.g. 3 for 0.00125 """
+    return len(number.normalize().as_tuple().digits)
+
+
+def infer_numeric_type(values: list, integer_type: str = 'long') -> tuple[str, dict]:
+    """
+    Picks the smallest OpenSearch numeric datatype that can store the observed values of a tag.
+
+    :param values: Sample values of a numeric tag from the MetaDataHub.
+    :param integer_type: The smallest integer type that is used for the tag, 'short' or 'integer' only for tags
+                         whose values are bounded (default = 'long').
+    :return: A tuple containing the datatype ('short', 'integer', 'long', 'scaled_float', 'half_float', 'float' or
+             'double') and the additional mapping parameters of the datatype (e.g. the scaling factor).
+    """
+    numbers = [number for number in map(_parse_number, values) if number is not None]
+    if not numbers:
+        return 'double', {}  # nothing observed, use the type that loses the least precision
+
+    max_abs = max(abs(number) for number in numbers)
+    decimals = max(max(-number.normalize().as_tuple().exponent, 0) for number in numbers)
+
+    if decimals == 0:  # all values are integers
+        if integer_type == 'short' and max_abs < SHORT_LIMIT:
+            return 'short', {}
+        if integer_type in ('short', 'integer') and max_abs < INTEGER_LIMIT:
+            return 'integer', {}
+        if max_abs < LONG_LIMIT:
+            return 'long', {}
+        return 'double', {}
+
+    if decimals <= MAX_SCALED_DECIMALS and max_abs * 10 ** decimals < MAX_SAFE_INTEGER:
+        return 'scaled_float', {'scaling_factor': 10 ** decimals}
+    digits = max(_significant_digits(number) for number in numbers)
+    if digits <= HALF_FLOAT_DIGITS and max_abs <= HALF_FLOAT_MAX:
+        return 'half_float', {}
+    if digits <= FLOAT_DIGITS and max_abs <= FLOAT_MAX:
+        return 'float', {}
+    return 'double', {}
+
+
+def collect_numeric_values(mdh_data: list[dict], metadata_tags: dict) -> dict:
+    """
+    Collects the values of the numeric tags from sample files.
+
+    :param mdh_data: A list of dictionaries containing metadata-tags for each file of a MetaDataHub request.
+    :param metadata_tags: A dictionary containing the OpenSearch datatypes of the metadata tags.
+    :return: A dictionary containing the list of observed values of each numeric tag.
+    """
+    values = {field_name: [] for field_name, datatype in metadata_tags.items() if datatype == 'float'}
+    for file_data in mdh_data:
+        for meta in file_data.get("metadata", []):
+            field_name = str(meta.get("name")).replace(".", "_")
+            if field_name in values and meta.get("value") is not None:
+                values[field_name].append(meta.get("value"))
+    return values
+
+
+def infer_numeric_types(mdh_data: list[dict], metadata_tags: dict) -> tuple[dict, dict]:
+    """
+    Replaces the generic 'float' datatype of the numeric tags by the datatype that fits the sampled values.
+
+    :param mdh_data: Sample files from the MetaDataHub.
+    :param metadata_tags: A dictionary containing the OpenSearch datatypes of the metadata tags.
+    :return: A tuple containing the metadata tags with the inferred datatypes and a dictionary with the additional
+             mapping parameters of the tags that need them (e.g. {'ExposureTime': {'scaling_factor': 1000}}).
+    """
+    inferred_tags = dict(metadata_tags)
+    field_parameters = {}
+    for field_name, values in collect_numeric_values(mdh_data, metadata_tags).items():
+        datatype, parameters = infer_numeric_type(values, BOUNDED_INTEGER_TAGS.get(field_name, 'long'))
+        inferred_tags[field_name] = datatype
+        if parameters:
+            field_parameters[field_name] = parameters
+    return inferred_tags, field_parameters
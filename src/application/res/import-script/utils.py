@@ -1,18 +1,158 @@
 import json
+import os
 
 
 # Function to retrieve the last imported entry's identifier or timestamp from the recovery file
-def get_last_imported_entry():
+def get_last_imported_entry(path: str = 'recovery.json'):
     try:
-        with open('recovery.json', 'r') as file:
+        with open(path, 'r') as file:
             data = json.load(file)
             return data['last_imported_entry']
-    except FileNotFoundError:
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
         return None
 
 
 # Function to update the last imported entry in the recovery file
-def update_last_imported_entry(entry):
+def update_last_imported_entry(entry, path: str = 'recovery.json'):
     data = {'last_imported_entry': entry}
-    with open('recovery.json', 'w') as file:
+    # write to a temporary file first, so a crash while writing never leaves a broken recovery file
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w') as file:
         json.dump(data, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+# Function to remove the recovery file after an import finished successfully
+def clear_last_imported_entry(path: str = 'recovery.json'):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class ImportCheckpoint:
+    """
+    Durable checkpoint of a running import that is stored in the recovery file after each committed page.
+    It records per file type how many files were imported (the offset of the next page) and the MdHTimestamp and
+    SourceFile of the last imported file, so an interrupted import resumes with the next page. The field statistics
+    of the committed pages that are not stored in the field catalog yet are recorded as well.
+    """
+
+    def __init__(self, index_name: str, path: str = 'recovery.json'):
+        """
+        Loads the checkpoint of an interrupted import of the index or starts a new one.
+
+        :param index_name: The name of the index the data is imported into.
+        :param path: The path of the recovery file (default = 'recovery.json').
+        """
+        self.path = path
+        entry = get_last_imported_entry(path)
+        if entry is not None and entry.get('index_name') == index_name:
+            self.entry = entry
+            self.resumed = True
+        else:
+            self.entry = {'index_name': index_name, 'file_types': {}}
+            self.resumed = False
+
+    def get_latest_timestamp(self, file_type: str, latest_timestamp: any) -> any:
+        """
+        Get the timestamp filter of a file type. If the import of the file type is resumed, the filter of the
+        interrupted import is returned, because the offsets only apply to that filter.
+
+        :param file_type: The file type.
+        :param latest_timestamp: The timestamp filter of the new import.
+        :return: The timestamp filter to be used, or False if all data is imported.
+        """
+        return self._get_file_type(file_type).setdefault('latest_timestamp', latest_timestamp)
+
+    def get_legacy_timestamp(self, latest_timestamp: any) -> any:
+        """
+        Get the highest MdHTimestamp of an index without any stored sync state. If the import is resumed, the value
+        of the interrupted import is returned, because the sync states of its completed file types are stored already.
+
+        :param latest_timestamp: The highest MdHTimestamp of the index, or False if a sync state is stored.
+        :return: The value to be used.
+        """
+        return self.entry.setdefault('legacy_timestamp', latest_timestamp)
+
+    def get_field_catalog_complete(self, complete: bool) -> bool:
+        """
+        Get whether the field catalog covers all documents of the index. If the import is resumed, the value of the
+        interrupted import is returned, because its catalog was marked as incomplete while it was running.
+
+        :param complete: Whether the catalog of the new import covers all documents.
+        :return: The value to be used.
+        """
+        return self.entry.setdefault('field_catalog_complete', complete)
+
+    def mark_field_catalog_incomplete(self):
+        """
+        Records that the field catalog does not cover all documents anymore, e.g. because existing documents were
+        replaced and their old values are still counted. It is stored with the next committed page.
+        """
+        self.entry['field_catalog_complete'] = False
+
+    def get_field_statistics(self) -> dict:
+        """
+        Get the field statistics of the committed pages that are not stored in the field catalog yet.
+
+        :return: A dictionary containing the catalog entry of each field.
+        """
+        return self.entry.get('field_statistics', {})
+
+    def _get_file_type(self, file_type: str) -> dict:
+        """ Get the checkpoint of a single file type """
+        return self.entry['file_types'].setdefault(file_type or '', {'offset': 0, 'completed': False})
+
+    def get_offset(self, file_type: str) -> int:
+        """
+        Get the amount of files of a file type that were already imported.
+
+        :param file_type: The file type.
+        :return: The offset of the next page.
+        """
+        return self._get_file_type(file_type)['offset']
+
+    def is_completed(self, file_type: str) -> bool:
+        """
+        Checks if all files of a file type were already imported.
+
+        :param file_type: The file type.
+        :return: True, if the file type was completed before the import was interrupted.
+        """
+        return self._get_file_type(file_type)['completed']
+
+    def commit_page(self, file_type: str, files_amount: int, last_mdh_timestamp: str = None,
+                    last_source_file: str = None, field_statistics: dict = None):
+        """
+        Records a page whose documents were all indexed (or written to the dead-letter file).
+
+        :param file_type: The file type of the page.
+        :param files_amount: The amount of files of the page.
+        :param last_mdh_timestamp: The MdHTimestamp of the last file of the page.
+        :param last_source_file: The SourceFile of the last file of the page.
+        :param field_statistics: The field statistics of the committed pages, including this page (default = None).
+        """
+        checkpoint = self._get_file_type(file_type)
+        checkpoint['offset'] += files_amount
+        if last_mdh_timestamp is not None:
+            checkpoint['MdHTimestamp'] = last_mdh_timestamp
+        if last_source_file is not None:
+            checkpoint['SourceFile'] = last_source_file
+        if field_statistics is not None:
+            self.entry['field_statistics'] = field_statistics
+        update_last_imported_entry(self.entry, self.path)
+
+    def complete_file_type(self, file_type: str):
+        """
+        Records that all files of a file type were imported, their field statistics are stored in the field catalog.
+
+        :param file_type: The file type.
+        """
+        self._get_file_type(file_type)['completed'] = True
+        self.entry.pop('field_statistics', None)
+        update_last_imported_entry(self.entry, self.path)
+
+    def clear(self):
+        """ Removes the checkpoint after the import finished successfully """
+        clear_last_imported_entry(self.path)
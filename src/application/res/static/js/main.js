@@ -1,4 +1,5 @@
 let myDict;  // Declare dict
+let fieldCatalog;  // Statistics of the fields, maintained by the import
 var rowIdx;  // Declare rowIdx
 $(document).ready(function () {
 
@@ -25,6 +26,7 @@ $(document).ready(function () {
             return;
         } else {
             $("#currentPage").val(parseInt($("#currentPage").val()) - 1);
+            $("#cursor").val(getPageCursor('cursors', parseInt($("#currentPage").val())));
             $("#advancedSearchForm").submit();
         }
     });
@@ -33,6 +35,7 @@ $(document).ready(function () {
             return;
         } else {
             $("#currentPage").val(parseInt($("#currentPage").val()) + 1);
+            $("#cursor").val(getPageCursor('cursors', parseInt($("#currentPage").val())));
             $("#advancedSearchForm").submit();
         }
     });
@@ -42,6 +45,7 @@ $(document).ready(function () {
             return;
         } else {
             $("#currentPageSS").val(parseInt($("#currentPageSS").val()) - 1);
+            $("#cursorSS").val(getPageCursor('cursorsSS', parseInt($("#currentPageSS").val())));
             $("#simpleSearchForm").submit();
         }
     });
@@ -50,12 +54,14 @@ $(document).ready(function () {
             return;
         } else {
             $("#currentPageSS").val(parseInt($("#currentPageSS").val()) + 1);
+            $("#cursorSS").val(getPageCursor('cursorsSS', parseInt($("#currentPageSS").val())));
             $("#simpleSearchForm").submit();
         }
     });
 
     rowIdx = 0;
     myDict = JSON.parse($("#datatypesDict").val());  // Parse the JSON string back to a JavaScript object
+    fieldCatalog = JSON.parse($("#fieldCatalog").val() || "{}");
 
     populateAdvancedSearchFormFromSession();
     populateSimpleSearch();
@@ -197,11 +203,24 @@ $(document).ready(function () {
     $('#simpleSearchSubmitButton').on('click', function(event) {
         event.preventDefault();
         $('#currentPageSS').val(0);
+        $('#cursorSS').val("");
+        sessionStorage.removeItem('cursorsSS');  // a new search starts without cursors
         $('#simpleSearchForm').trigger('submit');
     });
+    // export all results of the advanced search, the form is sent to the export endpoint without leaving the page
+    $('.exportButton').on('click', function(event) {
+        event.preventDefault();
+        var form = $('#advancedSearchForm');
+        var action = form.attr('action');
+        form.attr('action', $(this).data('action'));
+        form[0].submit();
+        form.attr('action', action || '');
+    });
     $('#advancedSearchSubmitButton').on('click', function(event) {
         event.preventDefault();
         $('#currentPage').val(0);
+        $('#cursor').val("");
+        sessionStorage.removeItem('cursors');  // a new search starts without cursors
         $('#advancedSearchForm').trigger('submit');
     });
     
@@ -310,6 +329,7 @@ function populateAdvancedSearchFormFromSession() {
     if (currentPage > 0) {
         $("#currentPagePagNeg").removeClass("disabled");
     }
+    storePageCursor('cursors', parseInt(currentPage) + 1, $("#nextCursor").val());
 
 }
 
@@ -322,7 +342,24 @@ function populateSimpleSearch() {
     if (currentPage > 0) {
         $("#currentPagePagNegSS").removeClass("disabled");
     }
+    storePageCursor('cursorsSS', parseInt(currentPage) + 1, $("#nextCursorSS").val());
+
+}
 
+// The cursor of each page of the current search is kept in the session storage, it continues the search after the
+// last hit of the previous page. Pages without a cursor are requested by their number.
+function getPageCursor(storageKey, page) {
+    var cursors = JSON.parse(sessionStorage.getItem(storageKey) || "[]");
+    return cursors[page] || "";
+}
+
+function storePageCursor(storageKey, page, cursor) {
+    if (!cursor) {
+        return;
+    }
+    var cursors = JSON.parse(sessionStorage.getItem(storageKey) || "[]");
+    cursors[page] = cursor;
+    sessionStorage.setItem(storageKey, JSON.stringify(cursors));
 }
 
 function showDetails(button) {
@@ -349,11 +386,17 @@ function updateConditionOptions(rowIdxLocal, vall) {
     console.log(rowIdxLocal);
     console.log(vall);
 
+    var numberConditions = ['tag_exists', 'tag_not_exists', 'field_is_empty', 'field_is_not_empty', 'is_equal', 'is_not_equal', 'is_greater', 'is_smaller', 'is_greater_or_equal', 'is_smaller_or_equal'];
     var conditionOptions = {
-        'text': ['tag_exists', 'tag_not_exists', 'field_is_empty', 'field_is_not_empty', 'contains', 'not_contains'],
-        'float': ['tag_exists', 'tag_not_exists', 'field_is_empty', 'field_is_not_empty', 'is_equal', 'is_not_equal', 'is_greater', 'is_smaller', 'is_greater_or_equal', 'is_smaller_or_equal'],
+        'text': ['tag_exists', 'tag_not_exists', 'field_is_empty', 'field_is_not_empty', 'contains', 'not_contains', 'is_equal', 'is_not_equal'],
         'date': ['tag_exists', 'tag_not_exists', 'field_is_empty', 'field_is_not_empty', 'is_equal', 'is_not_equal', 'is_greater', 'is_smaller', 'is_greater_or_equal', 'is_smaller_or_equal'],
+        // tags of the long tail are stored as keywords in a flat_object field
+        'keyword': ['tag_exists', 'tag_not_exists', 'field_is_empty', 'field_is_not_empty', 'contains', 'not_contains', 'is_equal', 'is_not_equal'],
     };
+    // all numeric datatypes support the same conditions
+    ['float', 'double', 'half_float', 'scaled_float', 'long', 'integer', 'short', 'byte'].forEach(function (dataType) {
+        conditionOptions[dataType] = numberConditions;
+    });
 
     // Get the selected data type from the metadata tag value
     var selectedDataType = myDict[vall];
@@ -382,6 +425,25 @@ function updateConditionOptions(rowIdxLocal, vall) {
         }
 
     });
+
+    updateValueHint(rowIdxLocal, vall);
+}
+
+function updateValueHint(rowIdxLocal, vall) {
+    // Show the range or the most frequent values of the selected metadata tag as placeholder of the value field
+    var entry = fieldCatalog[vall];
+    var hint = "";
+    if (entry && entry.top_values) {
+        hint = "e.g. " + entry.top_values.slice(0, 3).map(function (topValue) {
+            return topValue.value;
+        }).join(", ");
+    } else if (entry && entry.min !== undefined && entry.min !== null) {
+        hint = entry.min + " - " + entry.max;
+    }
+    if (entry) {
+        hint += (hint ? " " : "") + "(" + entry.doc_count + " files)";
+    }
+    $("#entry-" + rowIdxLocal + "-value").attr("placeholder", hint);
 }
 
 function updateValueField(rowIdxLocal, vall) {
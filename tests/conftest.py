@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Add the directory of the web app (backend package) and the import-script directory to the sys.path list, the
+# modules of the import script are imported by their names like the import pipeline does
+RES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'application', 'res')
+sys.path.append(RES_DIR)
+sys.path.append(os.path.join(RES_DIR, 'import-script'))
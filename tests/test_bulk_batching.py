@@ -0,0 +1,30 @@
+from bulk_batching import AdaptiveBulkBatcher
+
+
+def create_data(amount: int) -> list:
+    return [(b'{"FileName":"file.jpg"}', str(i)) for i in range(amount)]
+
+
+def create_batcher(**parameters) -> AdaptiveBulkBatcher:
+    return AdaptiveBulkBatcher(entry_size=lambda entry: len(entry[0]), **parameters)
+
+
+def test_batches_are_limited_by_documents_and_bytes():
+    assert [len(batch) for batch in create_batcher(max_documents=400).batches(create_data(1000))] == [400, 400, 200]
+    batcher = create_batcher(max_documents=1000, target_bytes=23 * 100, min_bytes=0)
+    assert [len(batch) for batch in batcher.batches(create_data(250))] == [100, 100, 50]
+
+
+def test_page_is_spread_over_the_parallel_workers():
+    batcher = create_batcher(max_documents=1000)
+    assert [len(batch) for batch in batcher.batches(create_data(1000), parallel=4)] == [250, 250, 250, 250]
+    # small pages are not split into tiny requests
+    assert [len(batch) for batch in batcher.batches(create_data(150), parallel=4)] == [100, 50]
+
+
+def test_byte_limit_adapts_to_split_requests():
+    batcher = create_batcher(target_bytes=1024 * 1024, min_bytes=64 * 1024)
+    batcher.record_response({'errors': False, 'split_requests': 1})
+    assert batcher.byte_limit == 512 * 1024
+    batcher.record_response({'errors': False})
+    assert batcher.byte_limit == 640 * 1024
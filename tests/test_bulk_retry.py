@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from bulk_retry import BulkRetryHandler, DeadLetterFile
+
+RETRYABLE_ERROR = {'type': 'es_rejected_execution_exception'}
+MAPPING_ERROR = {'type': 'mapper_parsing_exception'}
+
+
+class BulkManager:
+    """ Manager whose bulk requests fail with the given errors (by document) and records the sent documents """
+
+    def __init__(self, errors: dict = None):
+        self.errors = errors or {}
+        self.sent = []
+
+    def perform_bulk(self, index_name, data, op_type):
+        self.sent.append([doc for doc, _ in data])
+        return create_response(data, [self.errors.get(doc) for doc, _ in data])
+
+
+def create_response(data: list, errors: list) -> dict:
+    items = [{'create': {'_id': id, 'error': error} if error else {'_id': id, 'result': 'created'}}
+             for (_, id), error in zip(data, errors)]
+    return {'errors': any(errors), 'items': items}
+
+
+def create_handler(os_manager, path: str) -> BulkRetryHandler:
+    return BulkRetryHandler(os_manager=os_manager, index_name='amoscore', dead_letter_file=DeadLetterFile(path),
+                            backoff_seconds=0)
+
+
+def test_documents_with_repeated_ids_are_all_resent(tmp_path):
+    os_manager = BulkManager()
+    handler = create_handler(os_manager, str(tmp_path / 'dead_letter.ndjson'))
+    data = [(b'{"a":1}', None), (b'{"a":2}', None), (b'{"a":3}', 'x'), (b'{"a":4}', 'x')]
+    rejected_ids = handler.handle([(create_response(data, [RETRYABLE_ERROR] * 4), data)])
+    assert rejected_ids == set()
+    assert os_manager.sent == [[doc for doc, _ in data]]
+
+
+def test_replay_keeps_the_documents_that_fail_again(tmp_path):
+    path = str(tmp_path / 'dead_letter.ndjson')
+    DeadLetterFile(path).write('amoscore', [(b'{"a":1}', '1', MAPPING_ERROR), (b'{"a":2}', '2', MAPPING_ERROR)])
+    DeadLetterFile(path).write('other', [(b'{"a":3}', '3', MAPPING_ERROR)])
+
+    handler = create_handler(BulkManager(errors={b'{"a":2}': MAPPING_ERROR}), path)
+    assert handler.replay_dead_letters() == [(b'{"a":1}', '1')]
+    with open(path, 'rb') as dead_letter_file:
+        entries = [json.loads(line) for line in dead_letter_file]
+    assert [(entry['_index'], entry['_id']) for entry in entries] == [('other', '3'), ('amoscore', '2')]
+
+
+def test_interrupted_replay_keeps_the_dead_letters(tmp_path):
+    path = str(tmp_path / 'dead_letter.ndjson')
+    DeadLetterFile(path).write('amoscore', [(b'{"a":1}', '1', MAPPING_ERROR)])
+
+    class FailingManager:
+        def perform_bulk(self, index_name, data, op_type):
+            raise ConnectionError("cluster unavailable")
+
+    handler = create_handler(FailingManager(), path)
+    with pytest.raises(ConnectionError):
+        handler.replay_dead_letters()
+    assert DeadLetterFile(path).read('amoscore')[0] == [(b'{"a":1}', '1')]
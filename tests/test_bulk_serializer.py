@@ -0,0 +1,33 @@
+import json
+
+from backend.bulk_serializer import encode_document_with_hash, encode_documents_with_hash, get_content_hash
+
+
+def test_hash_is_appended_last():
+    encoded = encode_document_with_hash({"FileName": "a.jpg", "timestamp": "2023-07-01T02:00:00"})
+    doc = json.loads(encoded)
+    assert list(doc) == ["FileName", "timestamp", "content_hash"]
+    assert get_content_hash(encoded) == doc["content_hash"]
+
+
+def test_hash_ignores_the_import_time():
+    first = encode_document_with_hash({"FileName": "a.jpg", "timestamp": "2023-07-01T02:00:00"})
+    second = encode_document_with_hash({"FileName": "a.jpg", "timestamp": "2023-07-02T02:00:00"})
+    assert get_content_hash(first) == get_content_hash(second)
+
+
+def test_hash_changes_with_the_content():
+    first = encode_document_with_hash({"FileName": "a.jpg", "FileSize": 1})
+    second = encode_document_with_hash({"FileName": "a.jpg", "FileSize": 2})
+    assert get_content_hash(first) != get_content_hash(second)
+
+
+def test_empty_document():
+    encoded = encode_document_with_hash({})
+    assert json.loads(encoded) == {"content_hash": get_content_hash(encoded)}
+
+
+def test_encode_documents_with_hash():
+    (encoded, id), = encode_documents_with_hash([({"FileName": "ä.jpg"}, "/ä.jpg")])
+    assert id == "/ä.jpg"
+    assert json.loads(encoded)["FileName"] == "ä.jpg"
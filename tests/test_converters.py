@@ -0,0 +1,57 @@
+from converters import ConverterTable, convert_date, convert_integer, LONG_TAIL_FIELD
+
+CURRENT_TIME = "2023-07-01T02:00:00"
+
+
+def create_file(**tags) -> dict:
+    """ Creates a file as returned by a MetaDataHub request """
+    return {"metadata": [{"name": name, "value": value} for name, value in tags.items()]}
+
+
+def test_convert_date():
+    assert convert_date("2023-05-31 10:11:12") == "2023-05-31T10:11:12"
+    assert convert_date("2024-02-29 23:59:59") == "2024-02-29T23:59:59"  # leap day, parsed
+    assert convert_date("2023-02-29 23:59:59") is None
+    assert convert_date("2023-04-31 10:11:12") is None
+    assert convert_date("2023-05-17 24:00:00") is None
+    assert convert_date("abcd-ef-gh ij:kl:mn") is None
+    assert convert_date(None) is None
+
+
+def test_convert_integer():
+    assert convert_integer("12") == 12
+    assert convert_integer(" 7 ") == 7
+    assert convert_integer("1e3") == 1000
+    assert convert_integer(4.0) == 4
+    assert convert_integer(str(2 ** 60 + 1)) == 2 ** 60 + 1  # parsed exactly, not via float
+    assert convert_integer("2.5") is None
+    assert convert_integer(3.7) is None
+    assert convert_integer(float("inf")) is None
+    assert convert_integer("x") is None
+
+
+def test_convert():
+    table = ConverterTable(metadata_tags={"SourceFile": "text", "FileSize": "long", "FileModifyDate": "date",
+                                          "ExposureTime": "float"})
+    mdh_file = create_file(SourceFile="/a.jpg", FileSize="2048", FileModifyDate="2023-05-17 10:11:12",
+                           ExposureTime="0.01", Unknown="x")
+    data = table.convert(mdh_data=[mdh_file], current_time=CURRENT_TIME)
+    assert data == [({"SourceFile": "/a.jpg", "FileSize": 2048, "FileModifyDate": "2023-05-17T10:11:12",
+                      "ExposureTime": 0.01, "timestamp": CURRENT_TIME}, "/a.jpg")]
+
+
+def test_convert_counts_failed_values():
+    table = ConverterTable(metadata_tags={"SourceFile": "text", "FileSize": "long"})
+    data = table.convert(mdh_data=[create_file(SourceFile="/a.jpg", FileSize="2.5"),
+                                   create_file(SourceFile="/b.jpg", FileSize="abc")],
+                         current_time=CURRENT_TIME)
+    assert all("FileSize" not in doc for doc, _ in data)
+    assert table.failed_values["FileSize"] == 2
+
+
+def test_convert_long_tail():
+    table = ConverterTable(metadata_tags={"SourceFile": "text"}, long_tail_tags=["XMP_Creator"])
+    (doc, id), = table.convert(mdh_data=[create_file(SourceFile="/a.jpg", XMP_Creator="Jane")],
+                               current_time=CURRENT_TIME)
+    assert id == "/a.jpg"
+    assert doc[LONG_TAIL_FIELD] == {"XMP_Creator": "Jane"}
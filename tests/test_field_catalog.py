@@ -0,0 +1,70 @@
+import json
+
+from field_catalog import FieldStatistics, TOP_VALUES
+from bulk_retry import get_updated_ids
+from utils import ImportCheckpoint
+
+METADATA_TAGS = {'FileSize': 'long', 'FileType': 'text'}
+
+
+def test_statistics_of_indexed_documents():
+    statistics = FieldStatistics(metadata_tags=METADATA_TAGS, long_tail_tags=['XMP_Creator'])
+    statistics.add_documents([
+        (json.dumps({'FileSize': 5, 'FileType': 'JPEG', 'timestamp': 'now', 'content_hash': 'abc'}).encode(), 'a'),
+        ({'FileSize': 7, 'FileType': 'JPEG', 'other_tags': {'XMP_Creator': 'Jane'}}, 'b'),
+    ])
+    catalog = statistics.get_catalog(updated='now')
+    assert set(catalog) == {'FileSize', 'FileType', 'other_tags.XMP_Creator'}  # the internal fields are skipped
+    assert catalog['FileSize']['min'] == 5 and catalog['FileSize']['max'] == 7
+    assert catalog['FileType']['top_values'] == [{'value': 'JPEG', 'count': 2}]
+    assert catalog['other_tags.XMP_Creator']['type'] == 'keyword'
+
+
+def test_merge_catalog():
+    statistics = FieldStatistics(metadata_tags=METADATA_TAGS)
+    statistics.add_documents([({'FileSize': 5, 'FileType': 'PNG'}, 'a')])
+    statistics.merge_catalog({'FileSize': {'doc_count': 3, 'min': 1, 'max': 4},
+                              'FileType': {'doc_count': 3, 'top_values': [{'value': 'PNG', 'count': 3}]}})
+    catalog = statistics.get_catalog(updated='now')
+    assert (catalog['FileSize']['doc_count'], catalog['FileSize']['min'], catalog['FileSize']['max']) == (4, 1, 5)
+    assert catalog['FileType']['top_values'] == [{'value': 'PNG', 'count': 4}]
+
+
+def test_top_values_are_limited():
+    statistics = FieldStatistics(metadata_tags=METADATA_TAGS)
+    statistics.add_documents([({'FileType': f'type {i % 20}'}, str(i)) for i in range(100)])
+    assert len(statistics.get_catalog(updated='now')['FileType']['top_values']) == TOP_VALUES
+
+
+def test_checkpoint_keeps_the_statistics_of_committed_pages(tmp_path):
+    path = str(tmp_path / 'recovery.json')
+    checkpoint = ImportCheckpoint(index_name='amoscore', path=path)
+    assert checkpoint.get_field_catalog_complete(True) is True
+    checkpoint.commit_page(file_type='jpg', files_amount=1, field_statistics={'FileSize': {'doc_count': 1}})
+
+    resumed = ImportCheckpoint(index_name='amoscore', path=path)
+    assert resumed.resumed and resumed.get_offset('jpg') == 1
+    assert resumed.get_field_statistics() == {'FileSize': {'doc_count': 1}}
+    assert resumed.get_field_catalog_complete(False) is True  # the value of the interrupted import is kept
+    resumed.complete_file_type('jpg')  # the statistics are stored in the catalog now
+    assert ImportCheckpoint(index_name='amoscore', path=path).get_field_statistics() == {}
+
+
+def test_updated_documents_are_not_counted_again(tmp_path):
+    data = [({'FileType': 'JPEG'}, 'a'), ({'FileType': 'PNG'}, 'b')]
+    response = {'errors': False, 'items': [{'index': {'_id': 'a', 'result': 'created'}},
+                                           {'index': {'_id': 'b', 'result': 'updated'}}]}
+    updated_ids = set(get_updated_ids(response, data))
+    assert updated_ids == {'b'}
+
+    path = str(tmp_path / 'recovery.json')
+    checkpoint = ImportCheckpoint(index_name='amoscore', path=path)
+    assert checkpoint.get_field_catalog_complete(True) is True
+    statistics = FieldStatistics(metadata_tags=METADATA_TAGS)
+    statistics.add_documents([(doc, id) for doc, id in data if id not in updated_ids])
+    checkpoint.mark_field_catalog_incomplete()
+    checkpoint.commit_page(file_type='jpg', files_amount=2, field_statistics=statistics.get_catalog(updated='now'))
+
+    assert statistics.get_catalog(updated='now')['FileType']['top_values'] == [{'value': 'JPEG', 'count': 1}]
+    resumed = ImportCheckpoint(index_name='amoscore', path=path)
+    assert resumed.get_field_catalog_complete(True) is False
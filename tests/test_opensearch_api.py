@@ -0,0 +1,126 @@
+import pytest
+
+from backend.opensearch_api import OpenSearchManager
+
+
+@pytest.fixture
+def os_manager():
+    """ Manager without a client, the mapping of the index is replaced by fixed fields """
+    os_manager = OpenSearchManager.__new__(OpenSearchManager)
+    os_manager.search_size = 10
+    os_manager.get_searchable_fields = lambda index_name: {'FileSize': 'long', 'FileName': 'text'}
+    os_manager.get_present_fields = lambda index_name, field_names: {'FileSize'}
+    os_manager.get_ngram_field = lambda index_name, field_name: None
+    os_manager.get_keyword_field = lambda index_name, field_name: None
+    return os_manager
+
+
+def criterion(field: str, operator: str, search_content: any = '', weight: any = 1) -> dict:
+    return {'field': field, 'operator': operator, 'search_content': search_content, 'weight': weight}
+
+
+def test_ranges_of_a_field_are_merged(os_manager):
+    query = os_manager.build_advanced_query('index', [criterion('FileSize', 'is_greater', 5),
+                                                      criterion('FileSize', 'is_greater_or_equal', 10),
+                                                      criterion('FileSize', 'is_greater', 3)])
+    assert query['query']['bool'] == {'filter': [{'range': {'FileSize': {'gte': 10}}}]}
+
+
+def test_weighted_criteria_are_scored(os_manager):
+    query = os_manager.build_advanced_query('index', [criterion('FileSize', 'is_equal', 5, weight=2)])
+    assert query['query']['bool'] == {'must': [{'term': {'FileSize': {'value': 5, 'boost': 2}}}]}
+
+
+@pytest.mark.parametrize('criteria', [
+    [criterion('FileSize', 'is_greater', 30), criterion('FileSize', 'is_greater_or_equal', 40),
+     criterion('FileSize', 'is_smaller', 20)],
+    [criterion('FileSize', 'is_equal', 3), criterion('FileSize', 'is_equal', 4)],
+    [criterion('FileSize', 'tag_exists'), criterion('FileSize', 'tag_not_exists')],
+    [criterion('FileSize', 'is_equal', 3), criterion('FileSize', 'is_not_equal', 3)],
+])
+def test_contradictory_criteria(os_manager, criteria):
+    assert os_manager.build_advanced_query('index', criteria) is None
+
+
+def test_criteria_of_fields_without_values(os_manager):
+    # FileName has no values, so no document contains the text, but every document does not contain it
+    assert os_manager.build_advanced_query('index', [criterion('FileName', 'contains', 'a')]) is None
+    assert os_manager.build_advanced_query('index', [criterion('FileName', 'not_contains', 'a')]) == \
+        {'query': {'match_all': {}}}
+
+
+def test_cursor_round_trip():
+    cursor = OpenSearchManager.encode_cursor('pit-id', [1.5, '/a.jpg'])
+    assert OpenSearchManager.decode_cursor(cursor) == {'pit': 'pit-id', 'after': [1.5, '/a.jpg']}
+
+
+@pytest.mark.parametrize('cursor', [None, '', 'not base64!', 'bnVsbA==', 'eyJwaXQiOiJwIn0='])
+def test_invalid_cursors(cursor):
+    assert OpenSearchManager.decode_cursor(cursor) is None
+
+
+class PagingClient:
+    """ Client that pages through numbered hits inside a point in time and records the requests """
+
+    def __init__(self, hits: int):
+        self.hits = [{'_id': str(i), 'sort': [1.0, str(i)]} for i in range(hits)]
+        self.requests = []
+
+    def create_point_in_time(self, index, params):
+        self.requests.append('open')
+        return {'pit_id': 'pit'}
+
+    def delete_point_in_time(self, body):
+        self.requests.append('close')
+
+    def search(self, body):
+        assert body['pit']['id'] == 'pit'
+        start = int(body['search_after'][1]) + 1 if 'search_after' in body else body['from']
+        self.requests.append(start)
+        return {'hits': {'total': {'value': len(self.hits), 'relation': 'eq'},
+                         'hits': self.hits[start:start + body['size']]}}
+
+
+@pytest.mark.parametrize('hits, requests', [(25, ['open', 0, 10, 20, 'close']), (20, ['open', 0, 10, 'close'])])
+def test_pages_share_a_point_in_time(hits, requests):
+    os_manager = OpenSearchManager.__new__(OpenSearchManager)
+    os_manager._client = PagingClient(hits)
+    os_manager.get_field_types = lambda index_name: {'file_id': 'keyword'}
+    page = 0
+    cursor = None
+    ids = []
+    while True:
+        response = os_manager._execute_paged_search('index', {'query': {'match_all': {}}}, page, 10, cursor)
+        ids += [hit['_id'] for hit in response['hits']['hits']]
+        cursor = response['next_cursor']
+        if cursor is None:
+            break
+        assert OpenSearchManager.decode_cursor(cursor)['pit'] == 'pit'
+        page += 1
+    assert ids == [str(i) for i in range(hits)]
+    assert os_manager._client.requests == requests
+
+
+@pytest.mark.parametrize('field_types, tiebreaker', [({'file_id': 'keyword'}, 'file_id'), ({}, '_id')])
+def test_pages_are_sorted_by_the_id_field(field_types, tiebreaker):
+    os_manager = OpenSearchManager.__new__(OpenSearchManager)
+    os_manager.get_field_types = lambda index_name: field_types
+    assert os_manager.get_page_sort('index') == [{'_score': 'desc'}, {tiebreaker: 'asc'}]
+
+
+class IndicesClient:
+    """ Client with versioned indices, a failed rebuild left 'amoscore_v3' without the complete flag """
+
+    class indices:
+        @staticmethod
+        def get(index):
+            complete = {'mappings': {'_meta': {'version_complete': True}}}
+            return {'amoscore_v1': complete, 'amoscore_v2': complete, 'amoscore_v3': {'mappings': {}},
+                    'amoscore_v10': complete, 'amoscore_vx': complete}
+
+
+def test_incomplete_versions_are_not_counted():
+    os_manager = OpenSearchManager.__new__(OpenSearchManager)
+    os_manager._client = IndicesClient()
+    assert os_manager.get_index_versions('amoscore') == [1, 2, 3, 10]
+    assert os_manager.get_index_versions('amoscore', complete_only=True) == [1, 2, 10]
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from backend.search_cache import SearchCache
+
+
+class CountingSearch:
+    """ Search function that returns the number of the call """
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+def test_get_key_ignores_the_order_of_the_parameters():
+    assert SearchCache.get_key('simple', 'index', 0, 10, a=1, b=2) == \
+        SearchCache.get_key('simple', 'index', 0, 10, b=2, a=1)
+    assert SearchCache.get_key('simple', 'index', 0, 10, a=1) != SearchCache.get_key('simple', 'index', 1, 10, a=1)
+
+
+def test_cached_until_the_generation_changes():
+    generation = ['index_v1', 1]
+    cache = SearchCache(lambda: tuple(generation), check_seconds=0)
+    search = CountingSearch()
+    assert cache.get('key', search) == 1
+    assert cache.get('key', search) == 1
+    generation[1] = 2  # an import changed the index
+    assert cache.get('key', search) == 2
+    assert cache.statistics['hits'] == 1
+
+
+def test_bypassed_while_the_generation_is_unknown():
+    def get_generation():
+        raise ConnectionError("OpenSearch is not reachable")
+
+    cache = SearchCache(get_generation, check_seconds=0)
+    search = CountingSearch()
+    assert cache.get('key', search) == 1
+    assert cache.get('key', search) == 2
+    assert cache.statistics['hits'] == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = SearchCache(lambda: 1, max_entries=2, check_seconds=60)
+    search = CountingSearch()
+    cache.get('a', search)
+    cache.get('b', search)
+    cache.get('a', search)
+    cache.get('c', search)  # evicts 'b'
+    assert cache.get('a', search) == 1
+    assert cache.get('b', search) == 4
+
+
+def test_identical_searches_are_combined():
+    cache = SearchCache(lambda: 1, check_seconds=60)
+    started = threading.Event()
+    release = threading.Event()
+    search = CountingSearch()
+
+    def slow_search():
+        started.set()
+        release.wait(5)
+        return search()
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.get('key', slow_search)))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=lambda: results.append(cache.get('key', slow_search)))
+    second.start()
+    while cache.statistics['coalesced'] == 0:
+        time.sleep(0.001)  # wait until the second request waits for the running search
+    release.set()
+    first.join()
+    second.join()
+    assert results == [1, 1]
+    assert search.calls == 1
+
+
+def test_failed_searches_are_not_cached():
+    cache = SearchCache(lambda: 1, check_seconds=60)
+
+    def failing_search():
+        raise ValueError("search failed")
+
+    with pytest.raises(ValueError):
+        cache.get('key', failing_search)
+    assert cache.get('key', CountingSearch()) == 1
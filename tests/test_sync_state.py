@@ -0,0 +1,65 @@
+import json
+
+from sync_state import SyncWatermark
+
+
+def create_page(*timestamps) -> list:
+    """ Creates a page of serialized documents sorted by their MdHTimestamp, the ids are numbered """
+    return [(json.dumps({"MdHTimestamp": timestamp}).encode(), str(i)) for i, timestamp in enumerate(timestamps)]
+
+
+def test_without_sync_state():
+    watermark = SyncWatermark.from_timestamp(False)
+    assert watermark.get_filter_timestamp() is False
+    page = create_page("2023-07-01T10:00:00")
+    assert watermark.filter_new(page) == page
+
+
+def test_from_timestamp():
+    watermark = SyncWatermark.from_timestamp("2023-07-01 10:00:00", overlap_seconds=300)
+    assert watermark.get_filter_timestamp() == "2023-07-01 09:55:00"
+
+
+def test_track_page_keeps_the_files_inside_the_overlap_window():
+    watermark = SyncWatermark(overlap_seconds=300)
+    watermark.track_page(create_page("2023-07-01T09:00:00", "2023-07-01T09:56:00", "2023-07-01T10:00:00"))
+    sync_state = watermark.get_sync_state()
+    assert sync_state['watermark'] == "2023-07-01T10:00:00"
+    assert sync_state['boundary_files'] == [{'id': "1", 'MdHTimestamp': "2023-07-01T09:56:00"},
+                                            {'id': "2", 'MdHTimestamp': "2023-07-01T10:00:00"}]
+
+
+def test_next_import_skips_the_boundary_files_of_a_legacy_sync_state():
+    watermark = SyncWatermark({'watermark': "2023-07-01T10:00:00", 'boundary_ids': ["1", "2"]}, overlap_seconds=300)
+    assert watermark.get_filter_timestamp() == "2023-07-01 09:55:00"
+    page = create_page("2023-07-01T09:56:00", "2023-07-01T10:00:00", "2023-07-01T10:00:00", "2023-07-01T10:01:00")
+    assert [id for _, id in watermark.filter_new(page)] == ["0", "3"]
+
+
+def test_next_import_skips_the_boundary_files():
+    watermark = SyncWatermark(overlap_seconds=300)
+    watermark.track_page(create_page("2023-07-01T09:56:00", "2023-07-01T10:00:00"))
+    watermark = SyncWatermark(watermark.get_sync_state(), overlap_seconds=300)
+    page = create_page("2023-07-01T09:56:00", "2023-07-01T10:00:00", "2023-07-01T10:01:00")
+    assert [id for _, id in watermark.filter_new(page)] == ["2"]
+
+
+def test_changed_boundary_file_is_imported_again():
+    sync_state = {'watermark': "2023-07-01T10:00:00",
+                  'boundary_files': [{'id': "0", 'MdHTimestamp': "2023-07-01T09:58:00"}]}
+    watermark = SyncWatermark(sync_state, overlap_seconds=300)
+    page = create_page("2023-07-01T10:01:00")  # the file "0" was harvested again
+    assert watermark.filter_new(page) == page
+    watermark.track_page(page)
+    assert watermark.get_sync_state()['boundary_files'] == [{'id': "0", 'MdHTimestamp': "2023-07-01T10:01:00"}]
+
+
+def test_boundary_files_are_kept_while_they_are_inside_the_window():
+    sync_state = {'watermark': "2023-07-01T10:00:00",
+                  'boundary_files': [{'id': "a", 'MdHTimestamp': "2023-07-01T09:58:00"}]}
+    watermark = SyncWatermark(sync_state, overlap_seconds=300)
+    assert watermark.get_sync_state()['boundary_files'] == sync_state['boundary_files']
+    watermark.track_page(create_page("2023-07-01T10:02:00"))
+    assert [file['id'] for file in watermark.get_sync_state()['boundary_files']] == ["0", "a"]
+    watermark.track_page(create_page("2023-07-01T11:00:00"))
+    assert [file['id'] for file in watermark.get_sync_state()['boundary_files']] == ["0"]
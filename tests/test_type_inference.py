@@ -0,0 +1,43 @@
+from type_inference import infer_numeric_type, infer_numeric_types
+
+
+def test_integers():
+    assert infer_numeric_type(["0", "1", "1"]) == ('long', {})
+    assert infer_numeric_type(["1", str(2 ** 40)]) == ('long', {})
+    assert infer_numeric_type([str(2 ** 64)]) == ('double', {})
+
+
+def test_bounded_integers():
+    assert infer_numeric_type(["1", "6", "8"], integer_type='short') == ('short', {})
+    assert infer_numeric_type(["6000"], integer_type='integer') == ('integer', {})
+    assert infer_numeric_type([str(2 ** 15)], integer_type='short') == ('integer', {})
+    assert infer_numeric_type([str(2 ** 40)], integer_type='integer') == ('long', {})
+
+
+def test_decimals():
+    assert infer_numeric_type(["0.5", "0.125"]) == ('scaled_float', {'scaling_factor': 1000})
+    assert infer_numeric_type(["0.00012"]) == ('half_float', {})
+    assert infer_numeric_type(["3.14159"]) == ('float', {})
+    assert infer_numeric_type(["3.14159265358979"]) == ('double', {})
+
+
+def test_without_values():
+    assert infer_numeric_type([]) == ('double', {})
+    assert infer_numeric_type(["abc", None]) == ('double', {})
+
+
+def test_infer_numeric_types():
+    mdh_data = [{"metadata": [{"name": "FileSize", "value": "5000000000"}, {"name": "FNumber", "value": "2.8"},
+                              {"name": "FileName", "value": "a.jpg"}]}]
+    metadata_tags = {"FileSize": "float", "FNumber": "float", "FileName": "text"}
+    tags, parameters = infer_numeric_types(mdh_data=mdh_data, metadata_tags=metadata_tags)
+    assert tags == {"FileSize": "long", "FNumber": "scaled_float", "FileName": "text"}
+    assert parameters == {"FNumber": {'scaling_factor': 10}}
+
+
+def test_small_sampled_file_sizes_are_mapped_to_long():
+    mdh_data = [{"metadata": [{"name": "FileSize", "value": str(size)}, {"name": "Orientation", "value": "1"}]}
+                for size in (120, 2048, 4096)]
+    metadata_tags = {"FileSize": "float", "Orientation": "float"}
+    tags, _ = infer_numeric_types(mdh_data=mdh_data, metadata_tags=metadata_tags)
+    assert tags == {"FileSize": "long", "Orientation": "short"}